@@ -0,0 +1,253 @@
+"""
+LAB03 - Benchmark de Análise e Visualização
+Mede tempo e memória de cada etapa com datasets sintéticos de 10k a 10M PRs
+
+Uso:
+    python benchmark.py                                  (10k, 100k, 1M, 10M)
+    python benchmark.py --sizes 10000 100000 --skip-plots
+    python benchmark.py --compare antes.json depois.json
+"""
+
+import argparse
+import contextlib
+import gc
+import io
+import json
+import multiprocessing
+import os
+import platform
+import queue as queue_module
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
+
+DEFAULT_SIZES = [10_000, 100_000, 1_000_000, 10_000_000]
+RESULTS_DIR = 'benchmark_results'
+
+
+def _status_mb(field):
+    # Linha 'VmHWM:   123456 kB' de /proc/self/status; None fora do Linux
+    try:
+        with open('/proc/self/status', encoding='ascii') as f:
+            for line in f:
+                if line.startswith(field + ':'):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return None
+
+
+def reset_peak_rss():
+    """Zera o pico de RSS (VmHWM) do processo; False se o sistema não permite."""
+    try:
+        with open('/proc/self/clear_refs', 'w', encoding='ascii') as f:
+            f.write('5')
+        return True
+    except OSError:
+        return False
+
+
+def current_rss_mb():
+    return _status_mb('VmRSS')
+
+
+def peak_rss_mb():
+    peak = _status_mb('VmHWM')
+    if peak is not None:
+        return peak
+    # ru_maxrss é informado em KB no Linux e em bytes no macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+def run_stage(name, func, trace_memory):
+    # Pico por etapa: o high-water mark do processo é zerado antes de cada uma.
+    # Sem /proc/self/clear_refs (macOS) o pico é o do processo até aqui.
+    gc.collect()
+    per_stage = reset_peak_rss()
+    start_rss = current_rss_mb()
+    if trace_memory:
+        tracemalloc.start()
+    wall, cpu = time.perf_counter(), time.process_time()
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        value = func()
+
+    result = {
+        'stage': name,
+        'wall_seconds': time.perf_counter() - wall,
+        'cpu_seconds': time.process_time() - cpu,
+        'peak_rss_mb': peak_rss_mb(),
+        'peak_rss_per_stage': per_stage
+    }
+    if start_rss is not None:
+        result['start_rss_mb'] = start_rss
+        result['rss_growth_mb'] = result['peak_rss_mb'] - start_rss
+    if trace_memory:
+        result['traced_peak_mb'] = tracemalloc.get_traced_memory()[1] / (1024 * 1024)
+        tracemalloc.stop()
+    return result, value
+
+
+def write_dataset(n_prs, num_repos, work_dir):
+    # Gerado no processo principal: a memória da geração não entra no processo medido
+    from test import generate_synthetic_dataset
+
+    dataset_file = os.path.join(work_dir, f'synthetic_{n_prs}.csv')
+    df = generate_synthetic_dataset(n_prs, num_repos=num_repos, heavy_tailed=True)
+    df.to_csv(dataset_file, index=False)
+    return dataset_file
+
+
+def benchmark_size(dataset_file, skip_plots, trace_memory, work_dir, queue):
+    # Executado em um processo novo por tamanho: o pico de RSS não se mistura entre tamanhos
+    from src.PRAnalyzer import PRAnalyzer
+    from src.PRVisualizer import PRVisualizer
+
+    stages = []
+
+    result, analyzer = run_stage('analyzer_load', lambda: PRAnalyzer(dataset_file), trace_memory)
+    stages.append(result)
+    result, _ = run_stage('run_all_analyses', analyzer.run_all_analyses, trace_memory)
+    stages.append(result)
+    result, _ = run_stage('generate_report',
+                          lambda: analyzer.generate_report(os.path.join(work_dir, 'report.txt')),
+                          trace_memory)
+    stages.append(result)
+    del analyzer
+
+    if not skip_plots:
+        result, visualizer = run_stage('visualizer_load', lambda: PRVisualizer(dataset_file),
+                                       trace_memory)
+        stages.append(result)
+        result, _ = run_stage('generate_all_plots',
+                              lambda: visualizer.generate_all_plots(os.path.join(work_dir, 'plots')),
+                              trace_memory)
+        stages.append(result)
+
+    queue.put(stages)
+
+
+def git_commit():
+    try:
+        return subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'],
+                                       cwd=os.path.dirname(os.path.abspath(__file__)),
+                                       stderr=subprocess.DEVNULL, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+
+
+def environment():
+    import matplotlib
+    import numpy as np
+    import pandas as pd
+    import scipy
+
+    return {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'numpy': np.__version__,
+        'pandas': pd.__version__,
+        'scipy': scipy.__version__,
+        'matplotlib': matplotlib.__version__
+    }
+
+
+def compare(baseline_file, candidate_file):
+    with open(baseline_file, encoding='utf-8') as f:
+        baseline = json.load(f)
+    with open(candidate_file, encoding='utf-8') as f:
+        candidate = json.load(f)
+
+    print(f"{'PRs':>10}  {'Etapa':<20} {'Antes (s)':>10} {'Depois (s)':>10} {'Razão':>7}"
+          f" {'RSS antes':>10} {'RSS depois':>10}")
+    before = {(r['n_prs'], s['stage']): s for r in baseline['results'] for s in r['stages']}
+    for run in candidate['results']:
+        for stage in run['stages']:
+            old = before.get((run['n_prs'], stage['stage']))
+            if old is None:
+                continue
+            ratio = stage['wall_seconds'] / old['wall_seconds'] if old['wall_seconds'] else float('nan')
+            print(f"{run['n_prs']:>10}  {stage['stage']:<20} {old['wall_seconds']:>10.3f} "
+                  f"{stage['wall_seconds']:>10.3f} {ratio:>6.2f}x "
+                  f"{old['peak_rss_mb']:>9.0f}M {stage['peak_rss_mb']:>9.0f}M")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark de PRAnalyzer e PRVisualizer')
+    parser.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_SIZES,
+                        help='Quantidades de PRs sintéticos')
+    parser.add_argument('--repos', type=int, default=200, help='Número de repositórios [200]')
+    parser.add_argument('--skip-plots', action='store_true', help='Não medir os gráficos')
+    parser.add_argument('--trace-memory', action='store_true',
+                        help='Também mede o pico com tracemalloc (mais lento)')
+    parser.add_argument('--output', help='Arquivo JSON de saída')
+    parser.add_argument('--compare', nargs=2, metavar=('ANTES', 'DEPOIS'),
+                        help='Compara dois resultados salvos')
+    args = parser.parse_args()
+
+    if args.compare:
+        compare(*args.compare)
+        return
+
+    print("=" * 80)
+    print("LAB03 - BENCHMARK (Dados Sintéticos)")
+    print("=" * 80)
+
+    commit = git_commit()
+    report = {
+        'commit': commit,
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'environment': environment(),
+        'results': []
+    }
+
+    context = multiprocessing.get_context('spawn')
+    with tempfile.TemporaryDirectory(prefix='lab03_bench_') as work_dir:
+        for n_prs in args.sizes:
+            print(f"\n[{n_prs:,} PRs, {args.repos} repositórios]")
+            dataset_file = write_dataset(n_prs, args.repos, work_dir)
+            gc.collect()
+            run = {'n_prs': n_prs, 'num_repos': args.repos,
+                   'setup': {'stage': 'setup', 'dataset_mb': os.path.getsize(dataset_file) / (1024 * 1024)}}
+
+            queue = context.Queue()
+            process = context.Process(target=benchmark_size,
+                                      args=(dataset_file, args.skip_plots,
+                                            args.trace_memory, work_dir, queue))
+            process.start()
+            while True:
+                try:
+                    run['stages'] = queue.get(timeout=1)
+                    break
+                except queue_module.Empty:
+                    if not process.is_alive():
+                        raise RuntimeError(f"Benchmark de {n_prs} PRs falhou "
+                                           f"(código {process.exitcode})")
+            process.join()
+            os.remove(dataset_file)
+
+            for stage in run['stages']:
+                print(f"  • {stage['stage']:<20} {stage['wall_seconds']:>9.3f}s "
+                      f"(CPU {stage['cpu_seconds']:.3f}s, pico RSS {stage['peak_rss_mb']:.0f} MB, "
+                      f"+{stage.get('rss_growth_mb', float('nan')):.0f} MB na etapa)")
+            report['results'].append(run)
+
+    output = args.output or os.path.join(
+        RESULTS_DIR, f"benchmark_{commit}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json")
+    os.makedirs(os.path.dirname(output) or '.', exist_ok=True)
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+
+    print(f"\n✅ Resultados salvos em {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -3,6 +3,7 @@ LAB03 - Script Principal
 Executa coleta e análise de PRs do GitHub
 """
 
+import json
 import os
 import sys
 from datetime import datetime
@@ -10,9 +11,13 @@ from datetime import datetime
 # Adicionar src ao path
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
 
+from src.CollectorProfiler import CollectorProfiler
+from src.FailureLedger import FailureLedger
 from src.GitHubPRCollector import GitHubPRCollector
 from src.PRAnalyzer import PRAnalyzer
 from src.PRVisualizer import PRVisualizer
+from src.ResultCache import json_default
+from src.ReviewerGraph import ReviewerGraph
 
 
 def main():
@@ -21,12 +26,14 @@ def main():
     print("=" * 80)
     
     # 1. CONFIGURAÇÃO
-    token = input("\nDigite seu token do GitHub: ").strip()
-    if not token:
+    # Vários tokens separados por vírgula são usados em rodízio pelo coletor
+    tokens = [t.strip() for t in input("\nDigite seu token do GitHub (ou vários, separados por vírgula): ").split(',')]
+    tokens = [t for t in tokens if t]
+    if not tokens:
         print("❌ Token obrigatório!")
         return
     
-    print("\n✓ Token configurado!")
+    print(f"\n✓ {len(tokens)} token(s) configurado(s)!")
     
     # 2. PARÂMETROS
     print("\n" + "-" * 80)
@@ -51,7 +58,11 @@ def main():
     print("ETAPA 1: Coletando Repositórios")
     print("=" * 80)
     
-    collector = GitHubPRCollector(token)
+    # LAB03_PROFILE=1 grava um perfil (flame graph) da coleta em output/data
+    profiler = CollectorProfiler() if os.environ.get('LAB03_PROFILE') == '1' else None
+    ledger_file = f'output/data/failures_{timestamp}.jsonl'
+    collector = GitHubPRCollector(tokens, profiler=profiler, ledger=FailureLedger(ledger_file),
+                                  keep_interactions=True)
     
     # Buscar repositórios populares
     popular = collector.get_popular_repositories(limit=50)
@@ -66,20 +77,37 @@ def main():
     print("=" * 80)
     
     all_prs = []
-    for i, repo in enumerate(filtered[:num_repos], 1):
-        print(f"\n[{i}/{num_repos}] {repo['owner']}/{repo['name']}")
-        try:
-            prs = collector.collect_prs_from_repo(
-                repo['owner'], 
-                repo['name'], 
-                max_prs=prs_per_repo
-            )
-            all_prs.extend(prs)
-        except Exception as e:
-            print(f"  ✗ Erro: {e}")
+    if os.environ.get('LAB03_PIPELINE') == '1':
+        # LAB03_PIPELINE=1: listagem e enriquecimento em paralelo, retomável de output/data/work_queue
+        # (só pela mesma execução: mesmos repositórios e max_prs)
+        all_prs = collector.collect_prs_pipeline(filtered[:num_repos], max_prs=prs_per_repo)
+    else:
+        for i, repo in enumerate(filtered[:num_repos], 1):
+            print(f"\n[{i}/{num_repos}] {repo['owner']}/{repo['name']}")
+            try:
+                prs = collector.collect_prs_from_repo(
+                    repo['owner'], 
+                    repo['name'], 
+                    max_prs=prs_per_repo
+                )
+                all_prs.extend(prs)
+            except Exception as e:
+                print(f"  ✗ Erro: {e}")
     
     dataset_file = f'output/data/dataset_{timestamp}.csv'
     collector.save_dataset(all_prs, dataset_file)
+    interactions_file = f'output/data/interactions_{timestamp}.csv'
+    collector.save_interactions(all_prs, interactions_file)
+    
+    collector.ledger.print_summary()
+    collector.ledger.save_summary(f'output/data/collection_summary_{timestamp}.json')
+    if collector.ledger.pending():
+        print(f"Para refazer só as falhas: python retry_failures.py {ledger_file} <saida.csv>")
+    
+    if profiler is not None:
+        profiler.print_summary()
+        profile_file = profiler.save(f'output/data/collector_profile_{timestamp}')
+        print(f"Perfil salvo em {profile_file} (flamegraph.pl / speedscope)")
     
     # Verificar se coletou PRs
     if len(all_prs) == 0:
@@ -100,18 +128,34 @@ def main():
     
     analyzer = PRAnalyzer(dataset_file)
     results = analyzer.run_all_analyses()
+    analyzer.run_merge_model()
+    stratified = analyzer.run_stratified_analyses()
+    stratified_file = f'output/data/stratified_{timestamp}.json'
+    with open(stratified_file, 'w') as f:
+        json.dump(stratified, f, indent=2, default=json_default)
+    print(f"Análises por repositório salvas em {stratified_file}")
     
     report_file = f'output/analysis_{timestamp}.txt'
     analyzer.generate_report(report_file)
     
+    graph = ReviewerGraph(interactions_file)
+    graph.run_graph_analysis()
+    graph_files = graph.save('output/data', prefix=f'reviewer_graph_{timestamp}')
+    
     # 7. VISUALIZAÇÕES
     print("\n" + "=" * 80)
     print("ETAPA 4: Gerando Gráficos")
     print("=" * 80)
     
     visualizer = PRVisualizer(dataset_file)
+    # Tendências calculadas sobre o DataFrame do visualizador, sem reler o dataset
+    trends = visualizer.trend_analyzer()
+    trends.run_trend_analysis()
+    trend_files = trends.save('output/data', prefix=f'trends_{timestamp}')
     plot_dir = f'output/plots/{timestamp}'
-    visualizer.generate_all_plots(plot_dir)
+    visualizer.generate_all_plots(plot_dir, trends)
+    interactive_dir = f'output/interactive/{timestamp}'
+    visualizer.export_interactive(interactive_dir, trends)
     
     # 8. RESUMO
     print("\n" + "=" * 80)
@@ -121,7 +165,10 @@ def main():
     print(f"   • Repositórios: {repos_file}")
     print(f"   • Dataset: {dataset_file}")
     print(f"   • Análise: {report_file}")
+    print(f"   • Tendências: {trend_files['bucketed']}")
+    print(f"   • Grafo de revisão: {graph_files['repositories']}")
     print(f"   • Gráficos: {plot_dir}/")
+    print(f"   • Dashboard interativo: {interactive_dir}/dashboard.html")
     print("\n" + "=" * 80 + "\n")
 
 
@@ -0,0 +1,44 @@
+"""
+LAB03 - Consolidação de Datasets
+Mescla vários datasets/checkpoints de coleta em um único arquivo sem PRs duplicados.
+Em caso de duplicata vence o arquivo listado por último (ou o maior updated_at/collected_at).
+
+Uso:
+    python merge_datasets.py output/data/merged.csv output/data/dataset_*.csv
+    python merge_datasets.py output/data/merged.parquet output/data/*.csv   (requer pyarrow)
+"""
+
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
+
+from src.DatasetMerger import DatasetMerger
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Mescla e deduplica datasets de PRs')
+    parser.add_argument('output', help='Arquivo de saída (.csv ou .parquet)')
+    parser.add_argument('inputs', nargs='+', help='Datasets de entrada, do mais antigo ao mais recente')
+    parser.add_argument('--partitions', type=int, default=64,
+                        help='Número de partições em disco [64]')
+    parser.add_argument('--chunksize', type=int, default=200_000,
+                        help='Linhas lidas por bloco [200000]')
+    args = parser.parse_args()
+
+    inputs = [path for path in args.inputs if os.path.abspath(path) != os.path.abspath(args.output)]
+    if not inputs:
+        print("❌ Nenhum arquivo de entrada!")
+        return
+
+    print("=" * 80)
+    print("LAB03 - Consolidação de Datasets")
+    print("=" * 80 + "\n")
+
+    merger = DatasetMerger(num_partitions=args.partitions, chunksize=args.chunksize)
+    merger.merge(inputs, args.output)
+
+
+if __name__ == "__main__":
+    main()
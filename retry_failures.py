@@ -0,0 +1,48 @@
+"""
+LAB03 - Reprocessamento de Falhas da Coleta
+Refaz apenas os PRs e páginas registrados no ledger de falhas de uma coleta anterior
+
+Uso:
+    python retry_failures.py output/data/failures_<timestamp>.jsonl output/data/recovered.csv
+    python merge_datasets.py output/data/merged.csv output/data/dataset_<timestamp>.csv output/data/recovered.csv
+"""
+
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
+
+from src.FailureLedger import FailureLedger
+from src.GitHubPRCollector import GitHubPRCollector
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Refaz as falhas registradas de uma coleta')
+    parser.add_argument('ledger', help='Arquivo de falhas (failures_*.jsonl)')
+    parser.add_argument('output', help='Dataset com os PRs recuperados (.csv)')
+    parser.add_argument('--tokens', default=os.environ.get('GITHUB_TOKEN', ''),
+                        help='Tokens do GitHub separados por vírgula [$GITHUB_TOKEN]')
+    args = parser.parse_args()
+
+    tokens = [t.strip() for t in args.tokens.split(',') if t.strip()]
+    if not tokens:
+        print("❌ Token obrigatório! (--tokens ou GITHUB_TOKEN)")
+        return
+    if not os.path.exists(args.ledger):
+        print(f"❌ Ledger não encontrado: {args.ledger}")
+        return
+
+    print("=" * 80)
+    print("LAB03 - Reprocessamento de Falhas")
+    print("=" * 80)
+
+    ledger = FailureLedger(args.ledger)
+    collector = GitHubPRCollector(tokens, ledger=ledger)
+    records = collector.retry_failures()
+    collector.save_dataset(records, args.output)
+    ledger.print_summary()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,153 @@
+import json
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+
+# Folhas atribuídas a cada categoria do resumo; o restante é tempo próprio das etapas (Python)
+CATEGORIES = {
+    'dns_connect': 'rede',
+    'tls': 'rede',
+    'ttfb': 'rede',
+    'body': 'rede',
+    'json_decode': 'parsing',
+    'timestamp_parse': 'parsing',
+    'sleep': 'sleep',
+    'row_assembly': 'montagem',
+}
+
+
+class CollectorProfiler:
+    """
+    Perfilador de parede para o coletor. Cada thread mantém sua pilha de etapas;
+    o tempo próprio de cada pilha é acumulado e pode ser salvo no formato "folded"
+    (uma linha "a;b;c microssegundos" por pilha), aceito por flamegraph.pl e speedscope.
+    """
+
+    def __init__(self):
+        self.samples = defaultdict(float)
+        self.lock = threading.Lock()
+        self.local = threading.local()
+
+    def _stack(self):
+        if not hasattr(self.local, 'stack'):
+            self.local.stack = [threading.current_thread().name]
+            self.local.child_time = [0.0]
+        return self.local.stack
+
+    @contextmanager
+    def span(self, name):
+        stack = self._stack()
+        stack.append(name)
+        self.local.child_time.append(0.0)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            path = ';'.join(stack)
+            children = self.local.child_time.pop()
+            stack.pop()
+            self.local.child_time[-1] += elapsed
+            with self.lock:
+                self.samples[path] += max(0.0, elapsed - children)
+
+    def add(self, name, seconds):
+        """Registra uma folha medida fora de span() (ex.: fases da conexão HTTP)."""
+        stack = self._stack()
+        self.local.child_time[-1] += seconds
+        with self.lock:
+            self.samples[';'.join(stack + [name])] += seconds
+
+    def summary(self):
+        totals = defaultdict(float)
+        for path, seconds in self.samples.items():
+            totals[path.rsplit(';', 1)[-1]] += seconds
+        categories = defaultdict(float)
+        for leaf, seconds in totals.items():
+            categories[CATEGORIES.get(leaf, 'python')] += seconds
+        return {'total_seconds': sum(totals.values()),
+                'categories': dict(categories),
+                'leaves': dict(sorted(totals.items(), key=lambda item: -item[1]))}
+
+    def print_summary(self):
+        summary = self.summary()
+        total = summary['total_seconds'] or 1
+        print("\nPerfil da coleta (tempo de parede):")
+        for category, seconds in sorted(summary['categories'].items(), key=lambda item: -item[1]):
+            print(f"  {category:<10} {seconds:>10.2f}s ({seconds / total * 100:5.1f}%)")
+        for leaf in ('dns_connect', 'tls', 'ttfb', 'body', 'json_decode', 'sleep', 'row_assembly'):
+            if leaf in summary['leaves']:
+                print(f"    - {leaf:<14} {summary['leaves'][leaf]:>10.2f}s")
+
+    def write_folded(self, filename):
+        with self.lock:
+            samples = sorted(self.samples.items())
+        with open(filename, 'w', encoding='utf-8') as f:
+            for path, seconds in samples:
+                micros = int(round(seconds * 1e6))
+                if micros:
+                    f.write(f"{path} {micros}\n")
+        return filename
+
+    def save(self, base_path):
+        """Salva <base>.folded (flame graph) e <base>.json (resumo por categoria)."""
+        self.write_folded(f"{base_path}.folded")
+        with open(f"{base_path}.json", 'w', encoding='utf-8') as f:
+            json.dump(self.summary(), f, indent=2)
+        return f"{base_path}.folded"
+
+
+def _timed_connection(base, profiler):
+    # Em HTTPS, connect() = _new_conn() (DNS + TCP) + handshake TLS
+    class TimedConnection(base):
+        def _new_conn(self):
+            start = time.perf_counter()
+            try:
+                return super()._new_conn()
+            finally:
+                self._tcp_seconds = time.perf_counter() - start
+                profiler.add('dns_connect', self._tcp_seconds)
+
+        def connect(self):
+            self._tcp_seconds = 0.0
+            start = time.perf_counter()
+            try:
+                super().connect()
+            finally:
+                tls = time.perf_counter() - start - self._tcp_seconds
+                if tls > 0 and isinstance(self, HTTPSConnection):
+                    profiler.add('tls', tls)
+
+        def getresponse(self, *args, **kwargs):
+            # Do fim do envio até os cabeçalhos da resposta
+            start = time.perf_counter()
+            try:
+                return super().getresponse(*args, **kwargs)
+            finally:
+                profiler.add('ttfb', time.perf_counter() - start)
+
+    return TimedConnection
+
+
+class ProfiledAdapter(HTTPAdapter):
+    """HTTPAdapter cujas conexões registram DNS/conexão, TLS e TTFB no perfilador."""
+
+    def __init__(self, profiler, **kwargs):
+        self.profiler = profiler
+        super().__init__(**kwargs)
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+
+        class TimedHTTPPool(HTTPConnectionPool):
+            ConnectionCls = _timed_connection(HTTPConnection, self.profiler)
+
+        class TimedHTTPSPool(HTTPSConnectionPool):
+            ConnectionCls = _timed_connection(HTTPSConnection, self.profiler)
+
+        self.poolmanager.pool_classes_by_scheme = {'http': TimedHTTPPool, 'https': TimedHTTPSPool}
@@ -0,0 +1,100 @@
+import warnings
+
+import numpy as np
+import pandas as pd
+
+from src.TimeFeatures import DURATION_FEATURES, add_time_features
+
+# dtype compacto de cada coluna conhecida do dataset; as demais usam a inferência padrão
+COLUMN_DTYPES = {
+    'repo_owner': 'category',
+    'repo_name': 'category',
+    'pr_number': np.int32,
+    'status': 'category',
+    'files_changed': np.int32,
+    'additions': np.int32,
+    'deletions': np.int32,
+    'total_lines_changed': np.int32,
+    'body_length': np.int32,
+    'num_reviews': np.int32,
+    'num_comments': np.int32,
+    'num_participants': np.int32,
+    'time_to_close_hours': np.float32,
+    'time_to_first_review_hours': np.float32,
+}
+
+INTEGER_COLUMNS = [column for column, dtype in COLUMN_DTYPES.items() if dtype is np.int32]
+# Mensagens do pandas quando uma coluna int32 tem NA ou valores fracionários
+INTEGER_DTYPE_ERRORS = ('Integer column has NA values', 'cannot safely convert passed user dtype')
+
+
+def dataset_columns(path):
+    if path.endswith('.parquet'):
+        import pyarrow.parquet as pq
+
+        return pq.read_schema(path).names
+    return pd.read_csv(path, nrows=0).columns.tolist()
+
+
+def _plan(available, columns):
+    """Colunas a ler: as pedidas que existem, mais os timestamps de durações ausentes."""
+    read = [column for column in columns if column in available]
+    for feature, start, end in DURATION_FEATURES:
+        if feature in columns and feature not in available:
+            read += [source for source in (start, end) if source in available and source not in read]
+    return read
+
+
+def _read_csv(path, read, memory_map):
+    dtypes = {column: COLUMN_DTYPES[column] for column in read if column in COLUMN_DTYPES}
+    try:
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore', RuntimeWarning)
+            return pd.read_csv(path, usecols=read, dtype=dtypes, memory_map=memory_map)
+    except ValueError as e:
+        # Contagens com valores ausentes (ex.: datasets mesclados de versões antigas)
+        # não cabem em int32: essas colunas passam a float32, com NaN. Qualquer outro
+        # erro (arquivo malformado, texto numa coluna numérica) é propagado
+        if not str(e).startswith(INTEGER_DTYPE_ERRORS):
+            raise
+        dtypes.update({column: np.float32 for column in INTEGER_COLUMNS if column in dtypes})
+        return pd.read_csv(path, usecols=read, dtype=dtypes, memory_map=memory_map)
+
+
+def _read_parquet(path, read, memory_map):
+    import pyarrow.parquet as pq
+
+    df = pq.read_table(path, columns=read, memory_map=memory_map).to_pandas()
+    for column in read:
+        dtype = COLUMN_DTYPES.get(column)
+        if dtype is None:
+            continue
+        if dtype is np.int32 and df[column].isna().any():
+            dtype = np.float32
+        df[column] = df[column].astype(dtype)
+    return df
+
+
+def load_dataset(path, columns=None, memory_map=False):
+    """
+    Carrega o dataset (CSV ou Parquet) lendo só as colunas pedidas, com dtypes compactos:
+    contagens em int32, durações em float32 e identificadores/status como categorias.
+    Durações pedidas mas ausentes no arquivo são derivadas dos timestamps, que são
+    descartados em seguida se não tiverem sido pedidos. memory_map mapeia o arquivo em
+    memória em vez de lê-lo por buffers.
+    """
+    available = dataset_columns(path)
+    columns = list(columns) if columns is not None else available
+    read = _plan(available, columns)
+
+    if path.endswith('.parquet'):
+        df = _read_parquet(path, read, memory_map)
+    else:
+        df = _read_csv(path, read, memory_map)
+
+    df = add_time_features(df)
+    for feature, _, _ in DURATION_FEATURES:
+        if feature in df.columns and df[feature].dtype != np.float32:
+            df[feature] = df[feature].astype(np.float32)
+
+    return df[[column for column in columns if column in df.columns]]
@@ -0,0 +1,120 @@
+import os
+import shutil
+import tempfile
+
+import pandas as pd
+
+from src.PRRecord import DATASET_COLUMNS
+
+PR_KEY = ['repo_owner', 'repo_name', 'pr_number']
+STRING_COLUMNS = ['repo_owner', 'repo_name', 'status', 'created_at', 'closed_at', 'first_review_at']
+FLOAT_COLUMNS = ['time_to_close_hours', 'time_to_first_review_hours']
+SEQUENCE = '_merge_seq'
+# Se presentes, decidem qual duplicata vence antes da ordem dos arquivos (ISO-8601)
+PRECEDENCE_COLUMNS = ['updated_at', 'collected_at']
+
+
+class DatasetMerger:
+    """
+    Combina vários datasets de coleta (dataset_*.csv, checkpoint_*_repos.csv...)
+    em um único arquivo sem duplicatas pela chave (repo_owner, repo_name, pr_number).
+    Vence a linha com maior updated_at/collected_at, quando essas colunas existem;
+    no empate ou na falta delas, a do arquivo passado por último (ordem de input_files).
+
+    As linhas são lidas em blocos e distribuídas por hash da chave em partições no
+    disco; cada partição cabe em memória e é deduplicada isoladamente. O custo é
+    linear no total de linhas e a memória é limitada pelo tamanho do bloco e da
+    maior partição.
+    """
+
+    def __init__(self, num_partitions=64, chunksize=200_000, work_dir=None):
+        self.num_partitions = num_partitions
+        self.chunksize = chunksize
+        self.work_dir = work_dir
+
+    @staticmethod
+    def _dtypes(columns):
+        dtypes = {}
+        for column in columns:
+            if column in FLOAT_COLUMNS:
+                dtypes[column] = 'float64'
+            elif column in DATASET_COLUMNS and column not in STRING_COLUMNS or column == SEQUENCE:
+                dtypes[column] = 'Int64'
+            else:
+                dtypes[column] = 'string'
+        return dtypes
+
+    def _columns(self, input_files):
+        columns = list(DATASET_COLUMNS)
+        for path in input_files:
+            for column in pd.read_csv(path, nrows=0).columns:
+                if column not in columns:
+                    columns.append(column)
+        return columns
+
+    def _partition(self, input_files, columns, partition_dir):
+        """Primeira passada: espalha as linhas pelas partições, com número de sequência."""
+        paths = [os.path.join(partition_dir, f"part_{i:04d}.csv") for i in range(self.num_partitions)]
+        sequence = 0
+        total = 0
+
+        for path in input_files:
+            for chunk in pd.read_csv(path, chunksize=self.chunksize, dtype=str):
+                chunk = chunk.reindex(columns=columns)
+                chunk[SEQUENCE] = range(sequence, sequence + len(chunk))
+                sequence += len(chunk)
+
+                partition = pd.util.hash_pandas_object(chunk[PR_KEY], index=False) % self.num_partitions
+                for part, rows in chunk.groupby(partition.to_numpy()):
+                    rows.to_csv(paths[part], mode='a', index=False,
+                                header=not os.path.exists(paths[part]))
+            total = sequence
+            print(f"  • {path}: {total} linhas lidas até agora")
+
+        return [path for path in paths if os.path.exists(path)], total
+
+    def merge(self, input_files, output_file):
+        print(f"Mesclando {len(input_files)} arquivos em {output_file}...")
+
+        columns = self._columns(input_files)
+        dtypes = self._dtypes(columns + [SEQUENCE])
+        precedence = [column for column in PRECEDENCE_COLUMNS if column in columns] + [SEQUENCE]
+        partition_dir = tempfile.mkdtemp(prefix='merge_', dir=self.work_dir)
+        parquet = output_file.endswith('.parquet')
+        writer = None
+
+        try:
+            partitions, total = self._partition(input_files, columns, partition_dir)
+
+            if os.path.exists(output_file):
+                os.remove(output_file)
+
+            unique = 0
+            for path in partitions:
+                # Segunda passada: índice de hash da partição, mantendo a linha mais recente
+                part = pd.read_csv(path, dtype=dtypes)
+                part = part.sort_values(precedence, na_position='first')
+                part = part.drop_duplicates(subset=PR_KEY, keep='last')
+                part = part.sort_values(PR_KEY).drop(columns=SEQUENCE)
+                unique += len(part)
+
+                if parquet:
+                    import pyarrow as pa
+                    import pyarrow.parquet as pq
+
+                    table = pa.Table.from_pandas(part, preserve_index=False)
+                    if writer is None:
+                        writer = pq.ParquetWriter(output_file, table.schema)
+                    writer.write_table(table.cast(writer.schema))
+                else:
+                    part.to_csv(output_file, mode='a', index=False,
+                                header=not os.path.exists(output_file))
+        finally:
+            if writer is not None:
+                writer.close()
+            shutil.rmtree(partition_dir, ignore_errors=True)
+
+        print(f"\nDataset consolidado salvo em {output_file}")
+        print(f"  - Linhas lidas: {total}")
+        print(f"  - PRs únicos: {unique} ({total - unique} duplicatas removidas)")
+        return unique
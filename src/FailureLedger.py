@@ -0,0 +1,127 @@
+import json
+import os
+import threading
+from collections import Counter
+from datetime import datetime
+
+
+class RequestFailed(Exception):
+    """Chamada à API sem resposta utilizável (status diferente de 200, erro de rede ou JSON inválido)."""
+
+    def __init__(self, endpoint, status=None, error=None):
+        self.endpoint = endpoint
+        self.status = status
+        self.error = error or f"HTTP {status}"
+        super().__init__(f"{endpoint}: {self.error}")
+
+
+class FailureLedger:
+    """
+    Registro das falhas e descartes da coleta.
+
+    Falhas (PR ou página de listagem que não pôde ser obtida) são anexadas a um
+    arquivo JSONL com repositório, PR/página, endpoint, status e classe do erro, além
+    do que for preciso para refazê-las sem listar o repositório de novo. Uma falha
+    resolvida recebe uma linha de resolução; pending() devolve só as não resolvidas.
+    Descartes por filtro (PR aberto, sem revisões...) são apenas contados.
+    """
+
+    def __init__(self, path=None):
+        self.path = path
+        self.lock = threading.Lock()
+        self.entries = {}
+        self.skips = Counter()
+        self.num_failures = 0
+        if path and os.path.exists(path):
+            self._load()
+
+    @staticmethod
+    def _key(entry):
+        # A mesma página numa ordenação diferente (created/updated) é outra falha
+        return (entry['repo_owner'], entry['repo_name'], entry.get('pr_number'), entry.get('page'),
+                entry.get('sort'))
+
+    def _load(self):
+        with open(self.path, encoding='utf-8') as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    continue
+                if entry.get('resolved'):
+                    self.entries.pop(self._key(entry), None)
+                else:
+                    self.entries[self._key(entry)] = entry
+
+    def _append(self, entry):
+        if self.path:
+            with open(self.path, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(entry) + '\n')
+
+    def failure(self, owner, repo, error, pr_number=None, page=None, item=None, sort=None, attempt=1):
+        entry = {
+            'repo_owner': owner,
+            'repo_name': repo,
+            'pr_number': pr_number,
+            'page': page,
+            'endpoint': getattr(error, 'endpoint', 'internal'),
+            'status': getattr(error, 'status', None),
+            'error': getattr(error, 'error', None) or type(error).__name__,
+            'message': str(error)[:200],
+            'attempt': attempt,
+            'timestamp': datetime.now().isoformat(timespec='seconds')
+        }
+        if item is not None:
+            entry['item'] = item
+        if sort is not None:
+            entry['sort'] = sort
+        with self.lock:
+            self.entries[self._key(entry)] = entry
+            self.num_failures += 1
+            self._append(entry)
+
+    def resolve(self, entry):
+        resolved = {'repo_owner': entry['repo_owner'], 'repo_name': entry['repo_name'],
+                    'pr_number': entry.get('pr_number'), 'page': entry.get('page'), 'resolved': True}
+        if entry.get('sort') is not None:
+            resolved['sort'] = entry['sort']
+        with self.lock:
+            self.entries.pop(self._key(resolved), None)
+            self._append(resolved)
+
+    def skip(self, owner, repo, reason, count=1):
+        if count:
+            with self.lock:
+                self.skips[(f"{owner}/{repo}", reason)] += count
+
+    def pending(self):
+        with self.lock:
+            return list(self.entries.values())
+
+    def summary(self):
+        with self.lock:
+            failures = Counter(f"{entry['endpoint']} ({entry['error']})" for entry in self.entries.values())
+            skips = Counter()
+            for (_, reason), count in self.skips.items():
+                skips[reason] += count
+            return {'pending_failures': len(self.entries),
+                    'failures_this_run': self.num_failures,
+                    'failures_by_cause': dict(failures.most_common()),
+                    'skips_by_reason': dict(skips.most_common()),
+                    'skips_by_repo': {f"{repo} / {reason}": count
+                                      for (repo, reason), count in sorted(self.skips.items())}}
+
+    def print_summary(self):
+        summary = self.summary()
+        print("\nContabilidade da coleta:")
+        print(f"  - Falhas pendentes: {summary['pending_failures']}")
+        for cause, count in summary['failures_by_cause'].items():
+            print(f"      {cause}: {count}")
+        print(f"  - PRs descartados por filtro: {sum(summary['skips_by_reason'].values())}")
+        for reason, count in summary['skips_by_reason'].items():
+            print(f"      {reason}: {count}")
+
+    def save_summary(self, filename):
+        with open(filename, 'w', encoding='utf-8') as f:
+            json.dump(self.summary(), f, indent=2)
+        return filename
@@ -1,18 +1,150 @@
 import requests
 import pandas as pd
+import json
+import os
+import threading
 import time
-from datetime import datetime, timedelta
+from collections import defaultdict, deque
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
+from datetime import date, timedelta
+
+import numpy as np
+
+from src.CollectorProfiler import ProfiledAdapter
+from src.FailureLedger import FailureLedger, RequestFailed
+from src.PRRecord import PRRecord
+from src.TimeFeatures import parse_timestamps, to_epoch
+from src.TokenPool import TokenPool, mask
+from src.WorkQueue import WorkQueue
+
+# A busca do GitHub devolve no máximo 1.000 resultados por consulta
+SEARCH_CAP = 1000
+# Limite da Search API autenticada: 30 requisições por minuto
+SEARCH_INTERVAL = 60 / 30
+FIRST_REPO_DATE = date(2008, 1, 1)
+
+
+class RateLimiter:
+    """Espaça as chamadas de várias threads por um intervalo mínimo comum."""
+    
+    def __init__(self, interval):
+        self.interval = interval
+        self.lock = threading.Lock()
+        self.next_call = 0.0
+    
+    def wait(self):
+        with self.lock:
+            now = time.monotonic()
+            delay = max(0.0, self.next_call - now)
+            self.next_call = max(now, self.next_call) + self.interval
+        if delay:
+            time.sleep(delay)
+    
+    def pause_until(self, timestamp):
+        with self.lock:
+            self.next_call = max(self.next_call, time.monotonic() + max(0, timestamp - time.time()))
+
 
 class GitHubPRCollector:
-    def __init__(self, token):
+    def __init__(self, token, profiler=None, ledger=None, keep_interactions=False):
+        # token pode ser uma string ou uma lista de tokens, usados em rodízio
         self.token = token
+        self.tokens = TokenPool(token)
         self.headers = {
-            'Authorization': f'token {token}',
             'Accept': 'application/vnd.github.v3+json'
         }
         self.base_url = 'https://api.github.com'
+        # O limite da Search API é por token: com N tokens o intervalo cai N vezes
+        self.search_limiter = RateLimiter(SEARCH_INTERVAL / len(self.tokens.tokens))
+        
+        # Falhas e descartes da coleta; sem arquivo, ficam só em memória
+        self.ledger = ledger if ledger is not None else FailureLedger()
+        
+        # Guarda nos registros as arestas autor -> revisor/comentarista (ReviewerGraph)
+        self.keep_interactions = keep_interactions
+        
+        # Sessão única: reaproveita conexões HTTPS entre chamadas
+        self.profiler = profiler
+        self.session = requests.Session()
+        if profiler is not None:
+            self.session.mount('https://', ProfiledAdapter(profiler))
+            self.session.mount('http://', ProfiledAdapter(profiler))
+    
+    def _span(self, name):
+        return self.profiler.span(name) if self.profiler is not None else nullcontext()
+    
+    def _send(self, url, endpoint, token, params=None, headers=None):
+        headers = dict(self.headers, **(headers or {}), Authorization=f'token {token}')
+        if self.profiler is None:
+            return self.session.get(url, headers=headers, params=params)
+        
+        # Com perfil, o corpo é lido à parte para separar TTFB de transferência
+        with self.profiler.span(f"GET {endpoint}"):
+            response = self.session.get(url, headers=headers, params=params, stream=True)
+            with self.profiler.span('body'):
+                response.content
+        return response
+    
+    def _get(self, url, endpoint, params=None, headers=None):
+        """
+        GET autenticado com o token de maior cota restante. Se a resposta indicar limite
+        de requisições, o token é afastado até o reset e a chamada é repetida com outro;
+        só quando todos estão esgotados a coleta espera pelo reset mais próximo.
+        """
+        resource = 'search' if endpoint.startswith('search') else 'core'
+        limited = 0
+        while True:
+            token, delay = self.tokens.acquire(resource)
+            if token is None:
+                print(f"Todos os tokens sem cota ({resource}); aguardando {delay:.0f}s...")
+                self._sleep(delay)
+                continue
+            
+            response = self._send(url, endpoint, token, params, headers)
+            if not self.tokens.update(token, response, resource):
+                return response
+            
+            limited += 1
+            if limited > 2 * len(self.tokens.tokens):
+                return response
+            print(f"Token {mask(token)} atingiu o limite ({resource}); trocando de token")
+    
+    def _json(self, response):
+        with self._span('json_decode'):
+            return response.json()
+    
+    def _fetch(self, url, endpoint, params=None):
+        """GET + JSON; qualquer resposta inutilizável vira RequestFailed com endpoint e causa."""
+        return self._fetch_conditional(url, endpoint, params)[0]
+    
+    def _fetch_conditional(self, url, endpoint, params=None, etag=None):
+        """
+        _fetch com If-None-Match: retorna (json, ETag da resposta), ou (None, etag) se a
+        API responder 304 (conteúdo inalterado; respostas 304 não consomem cota).
+        """
+        headers = {'If-None-Match': etag} if etag else None
+        try:
+            response = self._get(url, endpoint, params, headers)
+        except requests.RequestException as e:
+            raise RequestFailed(endpoint, error=type(e).__name__) from e
+        if etag and response.status_code == 304:
+            return None, etag
+        if response.status_code != 200:
+            raise RequestFailed(endpoint, response.status_code)
+        try:
+            return self._json(response), response.headers.get('ETag')
+        except ValueError as e:
+            raise RequestFailed(endpoint, response.status_code, type(e).__name__) from e
+    
+    def _sleep(self, seconds):
+        with self._span('sleep'):
+            time.sleep(seconds)
     
     def get_popular_repositories(self, limit=200):
+        if limit > SEARCH_CAP:
+            return self.discover_repositories(max_repos=limit)
+        
         repos = []
         page = 1
         per_page = 100
@@ -29,10 +161,10 @@ class GitHubPRCollector:
                 'page': page
             }
             
-            response = requests.get(url, headers=self.headers, params=params)
+            response = self._get(url, 'search/repositories', params)
             
             if response.status_code == 200:
-                data = response.json()
+                data = self._json(response)
                 repos.extend(data['items'])
                 print(f"Coletados {len(repos)} repositórios...")
                 
@@ -40,17 +172,111 @@ class GitHubPRCollector:
                     break
                     
                 page += 1
-                time.sleep(2)
+                self._sleep(2)
             else:
                 print(f"Erro ao coletar repositórios: {response.status_code}")
                 break
         
         return repos[:limit]
     
+    def _search(self, query, page=1, per_page=100, sort='stars'):
+        url = f"{self.base_url}/search/repositories"
+        params = {'q': query, 'sort': sort, 'order': 'desc', 'per_page': per_page, 'page': page}
+        
+        for _ in range(3):
+            with self._span('sleep'):
+                self.search_limiter.wait()
+            response = self._get(url, 'search/repositories', params)
+            if response.status_code == 200:
+                return self._json(response)
+            if response.status_code in (403, 429):
+                reset = int(response.headers.get('X-RateLimit-Reset', time.time() + 60))
+                self.search_limiter.pause_until(reset)
+                continue
+            break
+        
+        print(f"Erro na busca '{query}' (página {page}): {response.status_code}")
+        return {'total_count': 0, 'items': []}
+    
+    def _split_query(self, star_range, date_range):
+        lo, hi = star_range
+        if lo < hi:
+            mid = (lo + hi) // 2
+            return [((lo, mid), date_range), ((mid + 1, hi), date_range)]
+        
+        # Faixa de uma única contagem de estrelas: divide pela data de criação
+        start, end = date_range
+        if start >= end:
+            return []
+        mid = start + (end - start) // 2
+        return [(star_range, (start, mid)), (star_range, (mid + timedelta(days=1), end))]
+    
+    @staticmethod
+    def _range_query(star_range, date_range):
+        lo, hi = star_range
+        query = f"stars:{lo}..{hi}" if lo < hi else f"stars:{lo}"
+        if date_range != (FIRST_REPO_DATE, date.today()):
+            query += f" created:{date_range[0].isoformat()}..{date_range[1].isoformat()}"
+        return query
+    
+    def discover_repositories(self, min_stars=1001, max_repos=None, max_workers=4):
+        """
+        Enumera repositórios além do limite de 1.000 resultados da busca, dividindo
+        a consulta em faixas disjuntas de estrelas (e de data de criação, quando uma
+        única contagem de estrelas excede o limite). As faixas são contadas e
+        paginadas em paralelo sob o limite de requisições da Search API.
+        min_stars é inclusivo: o padrão 1001 seleciona o mesmo 'stars:>1000' da busca simples.
+        """
+        top = self._search(f"stars:>={min_stars}", per_page=1)
+        if not top['items']:
+            return []
+        max_stars = top['items'][0]['stargazers_count']
+        
+        print(f"Descobrindo repositórios com {min_stars}..{max_stars} estrelas...")
+        
+        leaves = []
+        frontier = [((min_stars, max_stars), (FIRST_REPO_DATE, date.today()))]
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            while frontier:
+                queries = [self._range_query(*item) for item in frontier]
+                counts = list(executor.map(
+                    lambda query: self._search(query, per_page=1)['total_count'], queries))
+                
+                next_frontier = []
+                for item, query, count in zip(frontier, queries, counts):
+                    if count <= SEARCH_CAP:
+                        if count:
+                            leaves.append((item[0][1], query, count))
+                        continue
+                    parts = self._split_query(*item)
+                    if parts:
+                        next_frontier.extend(parts)
+                    else:
+                        print(f"  ! Faixa indivisível com {count} resultados: {query}")
+                        leaves.append((item[0][1], query, SEARCH_CAP))
+                frontier = next_frontier
+            
+            print(f"{len(leaves)} faixas com até {SEARCH_CAP} resultados cada")
+            
+            # Faixas com mais estrelas primeiro, para respeitar max_repos
+            leaves.sort(key=lambda leaf: leaf[0], reverse=True)
+            repos = {}
+            for _, query, count in leaves:
+                pages = range(1, (min(count, SEARCH_CAP) + 99) // 100 + 1)
+                for data in executor.map(lambda page: self._search(query, page=page), pages):
+                    for item in data['items']:
+                        repos.setdefault(item['id'], item)
+                print(f"Descobertos {len(repos)} repositórios únicos...")
+                if max_repos and len(repos) >= max_repos:
+                    break
+        
+        ranked = sorted(repos.values(), key=lambda repo: repo['stargazers_count'], reverse=True)
+        return ranked[:max_repos] if max_repos else ranked
+    
     def count_prs(self, owner, repo):
         url = f"{self.base_url}/repos/{owner}/{repo}/pulls"
         params = {'state': 'closed', 'per_page': 1}
-        response = requests.get(url, headers=self.headers, params=params)
+        response = self._get(url, 'pulls/count', params)
         
         if response.status_code == 200:
             if 'Link' in response.headers:
@@ -82,24 +308,170 @@ class GitHubPRCollector:
             else:
                 print(f"✗ {owner}/{name}: {pr_count} PRs (< {min_prs})")
             
-            time.sleep(1)
+            self._sleep(1)
         
         return filtered
     
-    def get_pr_reviews(self, owner, repo, pr_number):
+    def get_pr_reviews(self, owner, repo, pr_number, strict=False):
         url = f"{self.base_url}/repos/{owner}/{repo}/pulls/{pr_number}/reviews"
-        response = requests.get(url, headers=self.headers)
-        return response.json() if response.status_code == 200 else []
+        try:
+            return self._fetch(url, 'pulls/reviews')
+        except RequestFailed:
+            if strict:
+                raise
+            return []
     
-    def get_pr_comments(self, owner, repo, pr_number):
+    def get_pr_comments(self, owner, repo, pr_number, strict=False):
         url = f"{self.base_url}/repos/{owner}/{repo}/pulls/{pr_number}/comments"
-        response = requests.get(url, headers=self.headers)
-        return response.json() if response.status_code == 200 else []
+        try:
+            return self._fetch(url, 'pulls/comments')
+        except RequestFailed:
+            if strict:
+                raise
+            return []
     
-    def get_issue_comments(self, owner, repo, pr_number):
+    def get_issue_comments(self, owner, repo, pr_number, strict=False):
         url = f"{self.base_url}/repos/{owner}/{repo}/issues/{pr_number}/comments"
-        response = requests.get(url, headers=self.headers)
-        return response.json() if response.status_code == 200 else []
+        try:
+            return self._fetch(url, 'issues/comments')
+        except RequestFailed:
+            if strict:
+                raise
+            return []
+    
+    def _list_prs(self, owner, repo, page, per_page=100, sort='created', attempt=1):
+        return self._list_prs_conditional(owner, repo, page, per_page, sort, attempt=attempt)[0]
+    
+    def _list_prs_conditional(self, owner, repo, page, per_page=100, sort='created', etag=None,
+                              attempt=1):
+        """_list_prs com If-None-Match: (prs, etag); prs é [] se a página não mudou (304)."""
+        url = f"{self.base_url}/repos/{owner}/{repo}/pulls"
+        params = {
+            'state': 'closed',
+            'per_page': per_page,
+            'page': page,
+            'sort': sort,
+            'direction': 'desc'
+        }
+        
+        with self._span('list_prs'):
+            try:
+                prs, new_etag = self._fetch_conditional(url, 'pulls', params, etag)
+            except RequestFailed as e:
+                print(f"Erro ao coletar PRs: {e.error}")
+                self.ledger.failure(owner, repo, e, page=page, sort=sort, attempt=attempt)
+                return None, None
+        if prs is None:
+            print(f"{owner}/{repo}: página {page} sem alterações (304)")
+            return [], etag
+        return prs, new_etag
+    
+    @staticmethod
+    def _page_times(prs):
+        # Timestamps da página inteira convertidos de uma vez; PRs abertos ou
+        # fechados em menos de 1h são descartados antes de qualquer requisição extra
+        created = parse_timestamps([pr.get('created_at') for pr in prs])
+        merged = parse_timestamps([pr.get('merged_at') for pr in prs])
+        closed = np.where(np.isnat(merged),
+                          parse_timestamps([pr.get('closed_at') for pr in prs]), merged)
+        keep = ~np.isnat(created) & ~np.isnat(closed) & \
+            (closed - created >= np.timedelta64(1, 'h'))
+        return keep, ~np.isnat(merged), to_epoch(created), to_epoch(closed)
+    
+    def _enrich_pr(self, owner, repo, pr, merged, created_at, closed_at):
+        """
+        Busca detalhes, revisões e comentários de um PR; None (com o motivo contado no
+        ledger) se ele não se qualifica. Falhas de requisição sobem como RequestFailed.
+        """
+        if not all(key in pr for key in ['number', 'created_at', 'user']):
+            self.ledger.skip(owner, repo, 'missing_fields')
+            return None
+        
+        pr_url = f"{self.base_url}/repos/{owner}/{repo}/pulls/{pr['number']}"
+        pr_full = self._fetch(pr_url, 'pulls/detail')
+        self._sleep(0.5)
+        
+        required_fields = ['changed_files', 'additions', 'deletions', 
+                          'created_at', 'user', 'body']
+        if not all(key in pr_full for key in required_fields):
+            self.ledger.skip(owner, repo, 'incomplete_details')
+            return None
+        
+        reviews = self.get_pr_reviews(owner, repo, pr['number'], strict=True)
+        self._sleep(0.5)
+        
+        if len(reviews) < 1:
+            self.ledger.skip(owner, repo, 'no_reviews')
+            return None
+        
+        pr_comments = self.get_pr_comments(owner, repo, pr['number'], strict=True)
+        issue_comments = self.get_issue_comments(owner, repo, pr['number'], strict=True)
+        self._sleep(0.5)
+        
+        with self._span('row_assembly'):
+            return self._build_record(owner, repo, pr_full, reviews, pr_comments + issue_comments,
+                                      merged, created_at, closed_at, self.keep_interactions)
+    
+    @staticmethod
+    def _build_record(owner, repo, pr_full, reviews, comments, merged, created_at, closed_at,
+                      keep_interactions=False):
+        # Strings ISO de mesmo formato: a menor também é a mais antiga
+        submitted = [review['submitted_at'] for review in reviews
+                     if review.get('submitted_at')]
+        
+        author = None
+        if pr_full.get('user') and pr_full['user'].get('login'):
+            author = pr_full['user']['login']
+        
+        # login -> [revisões, comentários]; a ordem de inserção segue a das respostas
+        participants = {}
+        if author is not None:
+            participants[author] = [0, 0]
+        
+        for review in reviews:
+            if review.get('user') and review['user'].get('login'):
+                participants.setdefault(review['user']['login'], [0, 0])[0] += 1
+        
+        for comment in comments:
+            if comment.get('user') and comment['user'].get('login'):
+                participants.setdefault(comment['user']['login'], [0, 0])[1] += 1
+        
+        # Uma aresta por tipo: quem revisou e comentou aparece como 'review' e 'comment'
+        interactions = None
+        if keep_interactions and author is not None:
+            interactions = [(login, kind, count)
+                            for login, counts in participants.items() if login != author
+                            for kind, count in zip(('review', 'comment'), counts) if count]
+        
+        # As respostas JSON saem de escopo ao retornar; só o registro compacto sobrevive
+        return PRRecord(
+            repo_owner=owner,
+            repo_name=repo,
+            pr_number=pr_full['number'],
+            merged=bool(merged),
+            created_at=int(created_at),
+            closed_at=int(closed_at),
+            first_review_at=int(to_epoch(parse_timestamps([min(submitted)]))[0]) if submitted else -1,
+            files_changed=pr_full.get('changed_files', 0),
+            additions=pr_full.get('additions', 0),
+            deletions=pr_full.get('deletions', 0),
+            body_length=len(pr_full['body']) if pr_full.get('body') else 0,
+            num_reviews=len(reviews),
+            num_comments=len(comments),
+            num_participants=len(participants),
+            author=author if keep_interactions else None,
+            interactions=interactions
+        )
+    
+    def _enrich_or_record(self, owner, repo, pr, merged, created_at, closed_at, attempt=1):
+        """_enrich_pr que registra no ledger, em vez de propagar, qualquer falha do PR."""
+        try:
+            with self._span('enrich_pr'):
+                return self._enrich_pr(owner, repo, pr, merged, created_at, closed_at)
+        except Exception as e:
+            self.ledger.failure(owner, repo, e, pr_number=pr.get('number'), attempt=attempt,
+                                item=self._queue_item(owner, repo, pr, merged, created_at, closed_at))
+            return None
     
     def collect_prs_from_repo(self, owner, repo, max_prs=200):
         prs_data = []
@@ -109,115 +481,347 @@ class GitHubPRCollector:
         print(f"\nColetando PRs de {owner}/{repo}...")
         
         while len(prs_data) < max_prs:
-            url = f"{self.base_url}/repos/{owner}/{repo}/pulls"
-            params = {
-                'state': 'closed',
-                'per_page': per_page,
-                'page': page,
-                'sort': 'created',
-                'direction': 'desc'
-            }
+            prs = self._list_prs(owner, repo, page, per_page)
+            if not prs:
+                break
             
-            response = requests.get(url, headers=self.headers, params=params)
+            with self._span('timestamp_parse'):
+                keep, merged, created_at, closed_at = self._page_times(prs)
             
-            if response.status_code != 200:
-                print(f"Erro ao coletar PRs: {response.status_code}")
+            for i, pr in enumerate(prs):
+                if not keep[i]:
+                    self.ledger.skip(owner, repo, 'open_or_closed_under_1h')
+                    continue
+                
+                record = self._enrich_or_record(owner, repo, pr, merged[i], created_at[i], closed_at[i])
+                if record is not None:
+                    prs_data.append(record)
+                
+                if len(prs_data) >= max_prs:
+                    break
+            
+            print(f"Coletados {len(prs_data)} PRs válidos até agora...")
+            page += 1
+            self._sleep(2)
+            
+            if len(prs) < per_page:
                 break
+        
+        return prs_data
+    
+    @staticmethod
+    def _queue_item(owner, repo, pr, merged, created_at, closed_at):
+        # Só o que _enrich_pr usa; o restante da resposta da listagem não vai para a fila
+        user = pr.get('user') or {}
+        return {
+            'owner': owner,
+            'repo': repo,
+            'pr': {'number': pr.get('number'), 'created_at': pr.get('created_at'),
+                   'user': {'login': user.get('login')}},
+            'merged': bool(merged),
+            'created_at': int(created_at),
+            'closed_at': int(closed_at)
+        }
+    
+    def _list_into_queue(self, work, repos, max_prs, counts, condition, per_page=100):
+        """Produtor: lista páginas e enfileira os PRs candidatos, alternando entre repositórios."""
+        progress = work.state.setdefault('repos', {})
+        active = deque(f"{repo['owner']}/{repo['name']}" for repo in repos
+                       if not progress.get(f"{repo['owner']}/{repo['name']}", {}).get('done'))
+        
+        while active:
+            key = active.popleft()
+            with condition:
+                valid, in_flight = counts[key]
+                if valid >= max_prs:
+                    progress.setdefault(key, {'page': 1})['done'] = True
+                    work.save_state()
+                    continue
+                if valid + in_flight >= max_prs:
+                    # Candidatos suficientes em andamento: segue para o próximo repositório
+                    # e só volta a listar este se algum deles for descartado
+                    active.append(key)
+                    if all(sum(counts[k]) >= max_prs for k in active):
+                        condition.wait(timeout=1)
+                    continue
+            
+            owner, repo = key.split('/', 1)
+            state = progress.setdefault(key, {'page': 1, 'done': False})
+            print(f"Listando {key} (página {state['page']})...")
+            prs = self._list_prs(owner, repo, state['page'], per_page)
+            
+            if prs:
+                with self._span('timestamp_parse'):
+                    keep, merged, created_at, closed_at = self._page_times(prs)
+                self.ledger.skip(owner, repo, 'open_or_closed_under_1h', int((~keep).sum()))
+                for i, pr in enumerate(prs):
+                    if not keep[i]:
+                        continue
+                    item = self._queue_item(owner, repo, pr, merged[i], created_at[i], closed_at[i])
+                    with condition:
+                        counts[key][1] += 1
+                    if work.put(f"{key}#{pr.get('number')}", item) is None:
+                        with condition:
+                            counts[key][1] -= 1
+            
+            state['page'] += 1
+            state['done'] = not prs or len(prs) < per_page
+            work.save_state()
+            if not state['done']:
+                active.appendleft(key)
+            self._sleep(2)
+    
+    def _enrich_from_queue(self, work, max_prs, counts, condition):
+        """Consumidor: enriquece itens da fila até ela ser fechada e esvaziar."""
+        while True:
+            task = work.get()
+            if task is None:
+                return
+            seq, item = task
+            key = f"{item['owner']}/{item['repo']}"
+            
+            record = None
+            if counts[key][0] < max_prs:
+                record = self._enrich_or_record(item['owner'], item['repo'], item['pr'],
+                                                item['merged'], item['created_at'], item['closed_at'])
+            
+            work.done(seq, record.to_dict() if record is not None else None)
+            with condition:
+                counts[key][1] -= 1
+                if record is not None:
+                    counts[key][0] += 1
+                condition.notify_all()
+    
+    def collect_prs_pipeline(self, repos, max_prs=200, max_workers=4,
+                             state_dir='output/data/work_queue', max_pending=500):
+        """
+        Coleta em pipeline: uma thread lista páginas de PRs em uma WorkQueue limitada
+        (com transbordo em disco) e max_workers threads fazem o enriquecimento, de modo
+        que listagem e detalhes se sobrepõem e o pool segue ocupado entre repositórios.
+        Os registros saem na ordem em que foram listados, com até max_prs por repositório.
+        Se interrompida, a coleta retoma de state_dir sem repetir PRs já concluídos; uma
+        fila deixada por uma execução com outros repositórios ou max_prs não é retomada.
+        """
+        work = WorkQueue(state_dir, max_pending=max_pending)
+        run = {'repos': [f"{repo['owner']}/{repo['name']}" for repo in repos], 'max_prs': max_prs}
+        if work.state.setdefault('run', run) != run:
+            work.release()
+            raise ValueError(f"Fila em {state_dir} pertence a outra execução "
+                             f"({len(work.state['run']['repos'])} repositórios, "
+                             f"max_prs={work.state['run']['max_prs']}); remova o diretório "
+                             f"ou use outro state_dir")
+        work.save_state()
+        if work.pending or work.next_seq:
+            print(f"Retomando fila em {state_dir}: {work.pending} PRs pendentes")
+        
+        # [válidos, em andamento] por repositório, reconstruídos do estado recuperado
+        counts = defaultdict(lambda: [0, 0])
+        for result in work.finished.values():
+            if result is not None:
+                counts[f"{result['repo_owner']}/{result['repo_name']}"][0] += 1
+        for key in work.pending_keys():
+            counts[key.rsplit('#', 1)[0]][1] += 1
+        condition = threading.Condition()
+        
+        records = []
+        per_repo = defaultdict(int)
+        
+        def drain():
+            for result in work.completed():
+                if result is None:
+                    continue
+                key = f"{result['repo_owner']}/{result['repo_name']}"
+                # Com vários consumidores um repositório pode passar de max_prs por
+                # alguns PRs; o excedente (mais recente na ordem da fila) é descartado
+                if per_repo[key] < max_prs:
+                    per_repo[key] += 1
+                    records.append(PRRecord.from_dict(result))
+        
+        with ThreadPoolExecutor(max_workers=max_workers + 1) as executor:
+            workers = [executor.submit(self._enrich_from_queue, work, max_prs, counts, condition)
+                       for _ in range(max_workers)]
+            lister = executor.submit(self._list_into_queue, work, repos, max_prs, counts, condition)
             
-            prs = response.json()
+            try:
+                while not lister.done():
+                    drain()
+                    time.sleep(1)
+                lister.result()
+            finally:
+                work.close()
+            for worker in workers:
+                worker.result()
+        
+        drain()
+        work.clear()
+        print(f"\nColetados {len(records)} PRs válidos de {len(per_repo)} repositórios")
+        return records
+    
+    def retry_failures(self):
+        """
+        Refaz apenas as falhas pendentes do ledger: PRs são enriquecidos de novo a partir
+        dos dados guardados da listagem e páginas de listagem que falharam são relistadas.
+        Falhas resolvidas são marcadas no ledger; as que persistem ganham nova tentativa.
+        """
+        pending = self.ledger.pending()
+        print(f"\nReprocessando {len(pending)} falhas registradas...")
+        records = []
+        
+        for entry in pending:
+            owner, repo = entry['repo_owner'], entry['repo_name']
+            attempt = entry.get('attempt', 1) + 1
+            
+            if entry.get('item'):
+                item = entry['item']
+                try:
+                    with self._span('enrich_pr'):
+                        record = self._enrich_pr(owner, repo, item['pr'], item['merged'],
+                                                 item['created_at'], item['closed_at'])
+                except Exception as e:
+                    self.ledger.failure(owner, repo, e, pr_number=entry['pr_number'],
+                                        item=item, attempt=attempt)
+                    continue
+                self.ledger.resolve(entry)
+                if record is not None:
+                    records.append(record)
+            
+            elif entry.get('page') is not None:
+                prs = self._list_prs(owner, repo, entry['page'], sort=entry.get('sort', 'created'),
+                                     attempt=attempt)
+                if prs is None:
+                    continue
+                self.ledger.resolve(entry)
+                with self._span('timestamp_parse'):
+                    keep, merged, created_at, closed_at = self._page_times(prs)
+                for i, pr in enumerate(prs):
+                    if not keep[i]:
+                        self.ledger.skip(owner, repo, 'open_or_closed_under_1h')
+                        continue
+                    record = self._enrich_or_record(owner, repo, pr, merged[i], created_at[i],
+                                                    closed_at[i], attempt=attempt)
+                    if record is not None:
+                        records.append(record)
+        
+        remaining = len(self.ledger.pending())
+        print(f"Recuperados {len(records)} PRs; {remaining} falhas continuam pendentes")
+        return records
+    
+    def sync_prs_from_repo(self, owner, repo, repo_state, max_prs=None):
+        """
+        Sincronização incremental: lista os PRs fechados por updated_at decrescente,
+        para ao passar da marca d'água salva e só reprocessa PRs cujo updated_at mudou.
+        A primeira página é pedida com o ETag da última sincronização completa: se nada
+        mudou, a API responde 304 sem consumir cota e nenhum outro pedido é feito.
+        Marca d'água e ETag só avançam quando a listagem termina normalmente; um PR cujo
+        enriquecimento falhou segura a marca no seu updated_at e é tentado de novo.
+        repo_state ({'watermark': iso, 'etag': str, 'prs': {número: updated_at}}) é
+        atualizado no lugar.
+        """
+        watermark = repo_state.get('watermark')
+        seen = repo_state.setdefault('prs', {})
+        changed = []
+        newest = watermark
+        etag = None
+        page = 1
+        per_page = 100
+        done = False
+        # finished: listagem terminou (página curta, vazia ou marca d'água), não por falha
+        finished = False
+        failed = []
+        
+        print(f"\nSincronizando PRs de {owner}/{repo} (desde {watermark or 'o início'})...")
+        
+        while not done:
+            if page == 1:
+                prs, etag = self._list_prs_conditional(owner, repo, page, per_page, sort='updated',
+                                                       etag=repo_state.get('etag'))
+            else:
+                prs = self._list_prs(owner, repo, page, per_page, sort='updated')
+            if prs is None:
+                break
             if not prs:
+                finished = True
                 break
             
-            for pr in prs:
+            with self._span('timestamp_parse'):
+                keep, merged, created_at, closed_at = self._page_times(prs)
+            
+            for i, pr in enumerate(prs):
+                # Strings ISO de mesmo formato são comparáveis diretamente
+                updated_at = pr.get('updated_at')
+                if watermark and updated_at and updated_at < watermark:
+                    done = finished = True
+                    break
+                if updated_at and (newest is None or updated_at > newest):
+                    newest = updated_at
+                
+                number = str(pr.get('number'))
+                if seen.get(number) == updated_at:
+                    continue
+                
+                if not keep[i]:
+                    seen[number] = updated_at
+                    self.ledger.skip(owner, repo, 'open_or_closed_under_1h')
+                    continue
+                
                 try:
-                    if not all(key in pr for key in ['number', 'created_at', 'user']):
-                        continue
-                    
-                    pr_url = f"{self.base_url}/repos/{owner}/{repo}/pulls/{pr['number']}"
-                    pr_response = requests.get(pr_url, headers=self.headers)
-                    
-                    if pr_response.status_code != 200:
-                        continue
-                    
-                    pr_full = pr_response.json()
-                    time.sleep(0.5)
-                    
-                    required_fields = ['changed_files', 'additions', 'deletions', 
-                                      'created_at', 'user', 'body']
-                    if not all(key in pr_full for key in required_fields):
-                        continue
-                    
-                    reviews = self.get_pr_reviews(owner, repo, pr['number'])
-                    time.sleep(0.5)
-                    
-                    if len(reviews) < 1:
-                        continue
-                    
-                    created_at = datetime.strptime(pr_full['created_at'], '%Y-%m-%dT%H:%M:%SZ')
-                    
-                    if pr_full.get('merged_at'):
-                        closed_at = datetime.strptime(pr_full['merged_at'], '%Y-%m-%dT%H:%M:%SZ')
-                        status = 'MERGED'
-                    elif pr_full.get('closed_at'):
-                        closed_at = datetime.strptime(pr_full['closed_at'], '%Y-%m-%dT%H:%M:%SZ')
-                        status = 'CLOSED'
-                    else:
-                        continue
-                    
-                    time_diff = closed_at - created_at
-                    if time_diff < timedelta(hours=1):
-                        continue
-                    
-                    pr_comments = self.get_pr_comments(owner, repo, pr['number'])
-                    issue_comments = self.get_issue_comments(owner, repo, pr['number'])
-                    time.sleep(0.5)
-                    
-                    participants = set()
-                    if pr_full.get('user') and pr_full['user'].get('login'):
-                        participants.add(pr_full['user']['login'])
-                    
-                    for review in reviews:
-                        if review.get('user') and review['user'].get('login'):
-                            participants.add(review['user']['login'])
-                    
-                    for comment in pr_comments + issue_comments:
-                        if comment.get('user') and comment['user'].get('login'):
-                            participants.add(comment['user']['login'])
-                    
-                    pr_data = {
-                        'repo_owner': owner,
-                        'repo_name': repo,
-                        'pr_number': pr_full['number'],
-                        'status': status,
-                        'created_at': pr_full['created_at'],
-                        'closed_at': pr_full.get('merged_at') or pr_full.get('closed_at'),
-                        'files_changed': pr_full.get('changed_files', 0),
-                        'additions': pr_full.get('additions', 0),
-                        'deletions': pr_full.get('deletions', 0),
-                        'total_lines_changed': pr_full.get('additions', 0) + pr_full.get('deletions', 0),
-                        'body_length': len(pr_full['body']) if pr_full.get('body') else 0,
-                        'num_reviews': len(reviews),
-                        'num_comments': len(pr_comments) + len(issue_comments),
-                        'num_participants': len(participants),
-                        'time_to_close_hours': time_diff.total_seconds() / 3600
-                    }
-                    
-                    prs_data.append(pr_data)
-                    
+                    with self._span('enrich_pr'):
+                        record = self._enrich_pr(owner, repo, pr, merged[i], created_at[i], closed_at[i])
                 except Exception as e:
+                    # Não marcado como visto: a próxima sincronização tenta de novo
+                    self.ledger.failure(owner, repo, e, pr_number=pr.get('number'),
+                                        item=self._queue_item(owner, repo, pr, merged[i],
+                                                              created_at[i], closed_at[i]))
+                    failed.append(updated_at)
                     continue
+                seen[number] = updated_at
+                if record is not None:
+                    changed.append(record)
                 
-                if len(prs_data) >= max_prs:
+                if max_prs and len(changed) >= max_prs:
+                    done = True
                     break
             
-            print(f"Coletados {len(prs_data)} PRs válidos até agora...")
+            print(f"Página {page}: {len(changed)} PRs novos ou alterados")
             page += 1
-            time.sleep(2)
             
             if len(prs) < per_page:
+                finished = True
                 break
+            self._sleep(2)
         
-        return prs_data
+        # Com max_prs ou uma página que falhou a sincronização para antes do fim: a marca
+        # (e o ETag, que dispensaria a próxima passada) só avança quando todos os PRs
+        # mais recentes que ela foram vistos
+        if finished:
+            if failed:
+                # Sem updated_at não há onde segurar a marca: o PR fica para retry_failures
+                newest = min([newest] + [updated_at for updated_at in failed if updated_at])
+            repo_state['watermark'] = newest
+            if etag and not failed:
+                repo_state['etag'] = etag
+        return changed
+    
+    def sync_repositories(self, repos, state_file, max_prs=None):
+        if os.path.exists(state_file):
+            with open(state_file, encoding='utf-8') as f:
+                state = json.load(f)
+        else:
+            state = {}
+        
+        all_changed = []
+        for repo in repos:
+            key = f"{repo['owner']}/{repo['name']}"
+            all_changed.extend(self.sync_prs_from_repo(
+                repo['owner'], repo['name'], state.setdefault(key, {}), max_prs=max_prs))
+            
+            # Estado salvo após cada repositório para sobreviver a interrupções
+            with open(state_file + '.tmp', 'w', encoding='utf-8') as f:
+                json.dump(state, f)
+            os.replace(state_file + '.tmp', state_file)
+        
+        print(f"\nSincronização concluída: {len(all_changed)} PRs novos ou alterados")
+        return all_changed
     
     def save_repositories(self, repos, filename='selected_repositories.csv'):
         df = pd.DataFrame(repos)
@@ -225,8 +829,14 @@ class GitHubPRCollector:
         print(f"\nRepositórios salvos em {filename}")
         return df
     
+    def save_interactions(self, data, filename='github_pr_interactions.csv'):
+        df = PRRecord.interactions_to_dataframe(data)
+        df.to_csv(filename, index=False)
+        print(f"Interações salvas em {filename} ({len(df)} arestas)")
+        return df
+    
     def save_dataset(self, data, filename='github_prs_dataset.csv'):
-        df = pd.DataFrame(data)
+        df = PRRecord.to_dataframe(data)
         df.to_csv(filename, index=False)
         print(f"\nDataset salvo em {filename} com {len(df)} PRs")
         return df
\ No newline at end of file
@@ -19,13 +19,16 @@ import json
 
 class LabPipeline:
     
-    def __init__(self, github_token, output_dir='lab03_output'):
+    def __init__(self, github_token, output_dir='lab03_output', use_cache=True):
         self.token = github_token
         self.output_dir = output_dir
         self.timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
         
         self.create_directories()
         
+        from ResultCache import ResultCache
+        self.cache = ResultCache(f"{self.output_dir}/cache") if use_cache else None
+        
         print("=" * 80)
         print("LAB03 - Pipeline de Análise de Code Review no GitHub")
         print("=" * 80)
@@ -68,13 +71,14 @@ class LabPipeline:
         
         return filtered_repos, repos_df
     
-    def step2_collect_prs(self, repositories, max_prs_per_repo=100, max_repos=None):
+    def step2_collect_prs(self, repositories, max_prs_per_repo=100, max_repos=None, pipeline=False):
 
         print("\n" + "=" * 80)
         print("ETAPA 2: Coleta de Pull Requests e Métricas")
         print("=" * 80)
         
         from github_pr_collector import GitHubPRCollector
+        from PRRecord import PRRecord
         
         collector = GitHubPRCollector(self.token)
         
@@ -83,25 +87,30 @@ class LabPipeline:
         
         total_repos = len(repos_to_process)
         
-        for idx, repo in enumerate(repos_to_process, 1):
-            print(f"\n[{idx}/{total_repos}] Processando {repo['owner']}/{repo['name']}...")
-            
-            try:
-                prs = collector.collect_prs_from_repo(
-                    repo['owner'], 
-                    repo['name'], 
-                    max_prs=max_prs_per_repo
-                )
-                all_prs.extend(prs)
-                print(f"  ✓ Coletados {len(prs)} PRs")
-            except Exception as e:
-                print(f"  ✗ Erro ao processar repositório: {e}")
-                continue
-            
-            if idx % 5 == 0:
-                checkpoint_file = f"{self.output_dir}/data/checkpoint_{idx}_repos.csv"
-                pd.DataFrame(all_prs).to_csv(checkpoint_file, index=False)
-                print(f"  → Checkpoint salvo: {checkpoint_file}")
+        if pipeline:
+            # A fila em disco substitui os checkpoints: uma execução interrompida retoma dela
+            all_prs = collector.collect_prs_pipeline(repos_to_process, max_prs=max_prs_per_repo,
+                                                     state_dir=f"{self.output_dir}/data/work_queue")
+        else:
+            for idx, repo in enumerate(repos_to_process, 1):
+                print(f"\n[{idx}/{total_repos}] Processando {repo['owner']}/{repo['name']}...")
+                
+                try:
+                    prs = collector.collect_prs_from_repo(
+                        repo['owner'], 
+                        repo['name'], 
+                        max_prs=max_prs_per_repo
+                    )
+                    all_prs.extend(prs)
+                    print(f"  ✓ Coletados {len(prs)} PRs")
+                except Exception as e:
+                    print(f"  ✗ Erro ao processar repositório: {e}")
+                    continue
+                
+                if idx % 5 == 0:
+                    checkpoint_file = f"{self.output_dir}/data/checkpoint_{idx}_repos.csv"
+                    PRRecord.to_dataframe(all_prs).to_csv(checkpoint_file, index=False)
+                    print(f"  → Checkpoint salvo: {checkpoint_file}")
         
         dataset_file = f"{self.output_dir}/data/github_prs_dataset_{self.timestamp}.csv"
         dataset_df = collector.save_dataset(all_prs, filename=dataset_file)
@@ -119,13 +128,31 @@ class LabPipeline:
         print("=" * 80)
         
         from statistical_analysis import PRAnalyzer
+        from MergeModel import MergeOutcomeModel
+        from ResultCache import json_default
+        
+        results_file = f"{self.output_dir}/reports/analysis_results_{self.timestamp}.json"
+        report_file = f"{self.output_dir}/reports/analysis_results_{self.timestamp}.txt"
+        
+        cache_key = None
+        if self.cache:
+            cache_key = self.cache.key('analysis', dataset_file, {'method': 'spearman'},
+                                       code=[PRAnalyzer, MergeOutcomeModel])
+            cached = self.cache.get(cache_key)
+            if cached:
+                self.cache.restore(cache_key, cached, {'results.json': results_file,
+                                                       'report.txt': report_file})
+                print(f"\n✓ Etapa 3 concluída (resultados em cache: {cache_key})")
+                print(f"  - Resultados JSON: {results_file}")
+                print(f"  - Relatório textual: {report_file}")
+                return None, cached['results']
         
         analyzer = PRAnalyzer(dataset_file)
         
         print("\nExecutando análises para todas as RQs...")
         results = analyzer.run_all_analyses()
-        
-        results_file = f"{self.output_dir}/reports/analysis_results_{self.timestamp}.json"
+        analyzer.run_merge_model()
+        analyzer.run_stratified_analyses()
         
         serializable_results = {}
         for rq, data in results.items():
@@ -137,11 +164,14 @@ class LabPipeline:
                     serializable_results[rq][key] = value
         
         with open(results_file, 'w') as f:
-            json.dump(serializable_results, f, indent=2)
+            json.dump(serializable_results, f, indent=2, default=json_default)
         
-        report_file = f"{self.output_dir}/reports/analysis_results_{self.timestamp}.txt"
         analyzer.generate_report(output_file=report_file)
         
+        if self.cache:
+            self.cache.put(cache_key, serializable_results,
+                           {'results.json': results_file, 'report.txt': report_file})
+        
         print(f"\n✓ Etapa 3 concluída!")
         print(f"  - Resultados JSON: {results_file}")
         print(f"  - Relatório textual: {report_file}")
@@ -159,6 +189,18 @@ class LabPipeline:
         plots_dir = f"{self.output_dir}/plots/{self.timestamp}"
         os.makedirs(plots_dir, exist_ok=True)
         
+        cache_key = None
+        if self.cache:
+            cache_key = self.cache.key('plots', dataset_file, {'plots': 10, 'dpi': 300},
+                                       code=[PRVisualizer])
+            cached = self.cache.get(cache_key)
+            if cached:
+                self.cache.restore(cache_key, cached,
+                                   {name: f"{plots_dir}/{name}" for name in cached['artifacts']})
+                print(f"\n✓ Etapa 4 concluída (gráficos em cache: {cache_key})")
+                print(f"  - Gráficos salvos em: {plots_dir}")
+                return plots_dir
+        
         visualizer = PRVisualizer(dataset_file)
         
         print("\nGerando gráficos...")
@@ -174,6 +216,10 @@ class LabPipeline:
         visualizer.plot_reviews_vs_interactions(f"{plots_dir}/09_reviews_vs_interactions.png")
         visualizer.plot_correlation_heatmap(f"{plots_dir}/10_correlation_heatmap.png")
         
+        if self.cache:
+            self.cache.put(cache_key, artifacts={name: f"{plots_dir}/{name}"
+                                                 for name in sorted(os.listdir(plots_dir))})
+        
         print(f"\n✓ Etapa 4 concluída!")
         print(f"  - Gráficos salvos em: {plots_dir}")
         print(f"  - Total de visualizações: 10")
@@ -189,130 +235,26 @@ class LabPipeline:
         print("ETAPA 5: Geração do Relatório Final")
         print("=" * 80)
         
-        df = pd.read_csv(dataset_file)
+        from ReportGenerator import ReportGenerator, METRIC_LABELS
+        from DatasetLoader import load_dataset
         
-        report_file = f"{self.output_dir}/reports/relatorio_final_{self.timestamp}.md"
+        if analyzer is not None:
+            df = analyzer.df
+        else:
+            df = load_dataset(dataset_file, ['status'] + list(METRIC_LABELS))
         
-        with open(report_file, 'w', encoding='utf-8') as f:
-            # Cabeçalho
-            f.write("# Relatório Final - LAB03\n")
-            f.write("## Caracterizando a atividade de code review no GitHub\n\n")
-            f.write(f"**Data:** {datetime.now().strftime('%d/%m/%Y')}\n\n")
-            f.write("---\n\n")
-            
-            # Estatísticas gerais
-            f.write("## 1. Visão Geral do Dataset\n\n")
-            f.write(f"- **Total de PRs analisados:** {len(df)}\n")
-            f.write(f"- **PRs MERGED:** {sum(df['status'] == 'MERGED')} ({sum(df['status'] == 'MERGED')/len(df)*100:.1f}%)\n")
-            f.write(f"- **PRs CLOSED:** {sum(df['status'] == 'CLOSED')} ({sum(df['status'] == 'CLOSED')/len(df)*100:.1f}%)\n\n")
-            
-            # Estatísticas descritivas
-            f.write("### Medianas das Métricas\n\n")
-            f.write("| Métrica | Geral | MERGED | CLOSED |\n")
-            f.write("|---------|-------|--------|--------|\n")
-            
-            metrics = {
-                'Arquivos Alterados': 'files_changed',
-                'Linhas Adicionadas': 'additions',
-                'Linhas Removidas': 'deletions',
-                'Total de Linhas': 'total_lines_changed',
-                'Tempo (horas)': 'time_to_close_hours',
-                'Descrição (caracteres)': 'body_length',
-                'Participantes': 'num_participants',
-                'Comentários': 'num_comments',
-                'Revisões': 'num_reviews'
-            }
-            
-            for label, column in metrics.items():
-                overall = df[column].median()
-                merged = df[df['status'] == 'MERGED'][column].median()
-                closed = df[df['status'] == 'CLOSED'][column].median()
-                f.write(f"| {label} | {overall:.1f} | {merged:.1f} | {closed:.1f} |\n")
-            
-            f.write("\n---\n\n")
-            
-            # Resultados das RQs
-            f.write("## 2. Resultados das Questões de Pesquisa\n\n")
-            
-            # RQ01-RQ04 (Status)
-            status_rqs = ['RQ01', 'RQ02', 'RQ03', 'RQ04']
-            for rq in status_rqs:
-                if rq in results:
-                    f.write(f"### {rq}\n\n")
-                    
-                    if 'correlations' in results[rq]:
-                        f.write("| Métrica | Correlação (ρ) | p-value | Significante |\n")
-                        f.write("|---------|---------------|---------|-------------|\n")
-                        for var, corr in results[rq]['correlations'].items():
-                            sig = "Sim ✓" if corr['significant'] else "Não ✗"
-                            f.write(f"| {var} | {corr['correlation']:.4f} | {corr['p_value']:.6f} | {sig} |\n")
-                    elif 'correlation' in results[rq]:
-                        corr = results[rq]['correlation']
-                        f.write(f"- **Correlação (ρ):** {corr['correlation']:.4f}\n")
-                        f.write(f"- **p-value:** {corr['p_value']:.6f}\n")
-                        f.write(f"- **Significante:** {'Sim ✓' if corr['significant'] else 'Não ✗'}\n")
-                    
-                    f.write("\n")
-            
-            f.write("---\n\n")
-            
-            # RQ05-RQ08 (Revisões)
-            review_rqs = ['RQ05', 'RQ06', 'RQ07', 'RQ08']
-            for rq in review_rqs:
-                if rq in results:
-                    f.write(f"### {rq}\n\n")
-                    
-                    if 'correlations' in results[rq]:
-                        f.write("| Métrica | Correlação (ρ) | p-value | Significante |\n")
-                        f.write("|---------|---------------|---------|-------------|\n")
-                        for var, corr in results[rq]['correlations'].items():
-                            sig = "Sim ✓" if corr['significant'] else "Não ✗"
-                            f.write(f"| {var} | {corr['correlation']:.4f} | {corr['p_value']:.6f} | {sig} |\n")
-                    elif 'correlation' in results[rq]:
-                        corr = results[rq]['correlation']
-                        f.write(f"- **Correlação (ρ):** {corr['correlation']:.4f}\n")
-                        f.write(f"- **p-value:** {corr['p_value']:.6f}\n")
-                        f.write(f"- **Significante:** {'Sim ✓' if corr['significant'] else 'Não ✗'}\n")
-                    
-                    f.write("\n")
-            
-            f.write("---\n\n")
-            
-            f.write("## 3. Visualizações\n\n")
-            f.write("As visualizações geradas encontram-se no diretório:\n")
-            f.write(f"```\n{plots_dir}\n```\n\n")
-            
-            f.write("Lista de gráficos:\n")
-            plots = [
-                "01_status_distribution.png - Distribuição de Status",
-                "02_size_comparison.png - RQ01: Tamanho vs Status",
-                "03_time_analysis.png - RQ02: Tempo vs Status",
-                "04_description_analysis.png - RQ03: Descrição vs Status",
-                "05_interactions_analysis.png - RQ04: Interações vs Status",
-                "06_reviews_vs_size.png - RQ05: Tamanho vs Revisões",
-                "07_reviews_vs_time.png - RQ06: Tempo vs Revisões",
-                "08_reviews_vs_description.png - RQ07: Descrição vs Revisões",
-                "09_reviews_vs_interactions.png - RQ08: Interações vs Revisões",
-                "10_correlation_heatmap.png - Matriz de Correlação"
-            ]
-            
-            for plot in plots:
-                f.write(f"- `{plot}`\n")
-            
-            f.write("\n---\n\n")
-            
-            f.write("## 4. Conclusão\n\n")
-            f.write("Este relatório apresenta os resultados da análise de code review em repositórios populares do GitHub. ")
-            f.write("Os dados coletados e analisados fornecem insights importantes sobre os fatores que influenciam ")
-            f.write("o merge de Pull Requests e o número de revisões necessárias.\n\n")
-            f.write("Para uma análise completa e discussão detalhada dos resultados, consulte o template de relatório fornecido.\n\n")
+        report = ReportGenerator.from_dataframe(df, results, plots_dir=plots_dir)
+        outputs = report.write_all(f"{self.output_dir}/reports/relatorio_final_{self.timestamp}")
+        report_file = outputs['md']
         
         print(f"\n✓ Etapa 5 concluída!")
         print(f"  - Relatório final salvo: {report_file}")
+        print(f"  - Outros formatos: {', '.join(outputs[fmt] for fmt in ('txt', 'json', 'html'))}")
         
         return report_file
     
-    def run_full_pipeline(self, limit_repos=200, min_prs=100, max_repos=10, max_prs_per_repo=100):
+    def run_full_pipeline(self, limit_repos=200, min_prs=100, max_repos=10, max_prs_per_repo=100,
+                          pipeline=False):
         """
         Executa o pipeline completo
         
@@ -321,6 +263,7 @@ class LabPipeline:
         - min_prs: Mínimo de PRs que um repositório deve ter
         - max_repos: Máximo de repositórios a processar (None = todos)
         - max_prs_per_repo: Máximo de PRs a coletar por repositório
+        - pipeline: Coleta de PRs em pipeline (collect_prs_pipeline), retomável
         """
         
         start_time = datetime.now()
@@ -336,7 +279,8 @@ class LabPipeline:
             dataset_df, dataset_file = self.step2_collect_prs(
                 repositories,
                 max_prs_per_repo=max_prs_per_repo,
-                max_repos=max_repos
+                max_repos=max_repos,
+                pipeline=pipeline
             )
             
             # Etapa 3: Análise estatística
@@ -453,7 +397,8 @@ def main():
         limit_repos=limit_repos,
         min_prs=min_prs,
         max_repos=max_repos,
-        max_prs_per_repo=max_prs_per_repo
+        max_prs_per_repo=max_prs_per_repo,
+        pipeline=os.environ.get('LAB03_PIPELINE') == '1'
     )
     
     if results:
@@ -0,0 +1,177 @@
+import os
+import shutil
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from src.PRAnalyzer import rank_with_ties
+
+# total_lines_changed fica de fora: é a soma exata de additions e deletions
+MODEL_FEATURES = ['files_changed', 'additions', 'deletions', 'time_to_close_hours',
+                  'body_length', 'num_participants', 'num_comments', 'num_reviews']
+
+# Abaixo disso os folds rodam no próprio processo: o pool custaria mais que o ajuste
+PARALLEL_MIN_ROWS = 200_000
+
+
+def build_features(df, features=MODEL_FEATURES):
+    """
+    Matriz de features (float64, com coluna de intercepto) montada uma única vez:
+    log1p das métricas de cauda longa, padronizadas. Linhas com valores ausentes
+    são descartadas. Retorna (X, y, médias, desvios).
+    """
+    values = df[features].to_numpy(dtype=np.float64)
+    y = (df['status'] == 'MERGED').to_numpy(dtype=np.float64)
+    valid = ~np.isnan(values).any(axis=1)
+    values, y = values[valid], y[valid]
+
+    X = np.empty((len(values), len(features) + 1))
+    X[:, 0] = 1.0
+    np.log1p(np.clip(values, 0, None), out=X[:, 1:])
+    mean = X[:, 1:].mean(axis=0)
+    std = X[:, 1:].std(axis=0)
+    std[std == 0] = 1.0
+    X[:, 1:] -= mean
+    X[:, 1:] /= std
+    return X, y, mean, std
+
+
+def sigmoid(z):
+    return 0.5 * (1 + np.tanh(0.5 * z))
+
+
+def fit_logistic(X, y, l2=1.0, max_iter=50, tol=1e-8):
+    """Regressão logística com penalização L2 (sem penalizar o intercepto) via Newton/IRLS."""
+    n, p = X.shape
+    beta = np.zeros(p)
+    penalty = np.full(p, l2)
+    penalty[0] = 0.0
+
+    for _ in range(max_iter):
+        prob = sigmoid(X @ beta)
+        gradient = X.T @ (prob - y) + penalty * beta
+        hessian = (X * (prob * (1 - prob))[:, None]).T @ X + np.diag(penalty)
+        step = np.linalg.solve(hessian + 1e-9 * np.eye(p), gradient)
+        beta -= step
+        if np.max(np.abs(step)) < tol:
+            break
+    return beta
+
+
+def auc(y, scores):
+    """Área sob a curva ROC pela estatística U de Mann-Whitney (com empates)."""
+    positive = y == 1
+    n1 = int(positive.sum())
+    n0 = len(y) - n1
+    if n1 == 0 or n0 == 0:
+        return float('nan')
+    ranks, _ = rank_with_ties(scores)
+    return float((ranks[positive].sum() - n1 * (n1 + 1) / 2) / (n1 * n0))
+
+
+def log_loss(y, prob):
+    prob = np.clip(prob, 1e-12, 1 - 1e-12)
+    return float(-np.mean(y * np.log(prob) + (1 - y) * np.log(1 - prob)))
+
+
+def _fit_fold(X, y, folds, fold, l2, seed):
+    test = folds == fold
+    beta = fit_logistic(X[~test], y[~test], l2=l2)
+
+    X_test, y_test = np.array(X[test]), y[test]
+    scores = X_test @ beta
+    prob = sigmoid(scores)
+    fold_auc = auc(y_test, scores)
+
+    # Importância por permutação: queda de AUC ao embaralhar cada feature no teste
+    rng = np.random.default_rng(seed + fold)
+    drops = []
+    for column in range(1, X.shape[1]):
+        original = X_test[:, column].copy()
+        X_test[:, column] = rng.permutation(original)
+        drops.append(fold_auc - auc(y_test, X_test @ beta))
+        X_test[:, column] = original
+
+    return {
+        'auc': fold_auc,
+        'log_loss': log_loss(y_test, prob),
+        'accuracy': float(np.mean((prob >= 0.5) == (y_test == 1))),
+        'coefficients': beta[1:].tolist(),
+        'permutation_importance': drops
+    }
+
+
+def _fit_fold_from_disk(work_dir, fold, l2, seed):
+    # Nos processos do pool as matrizes são mapeadas do disco, sem cópia por worker
+    X = np.load(os.path.join(work_dir, 'X.npy'), mmap_mode='r')
+    y = np.load(os.path.join(work_dir, 'y.npy'), mmap_mode='r')
+    folds = np.load(os.path.join(work_dir, 'folds.npy'), mmap_mode='r')
+    return _fit_fold(X, y, folds, fold, l2, seed)
+
+
+class MergeOutcomeModel:
+    """
+    Modelo preditivo de MERGED vs CLOSED a partir das métricas das RQs: regressão
+    logística regularizada, avaliada por validação cruzada k-fold com os folds
+    ajustados em paralelo. Reporta AUC, log-loss, acurácia, coeficientes padronizados
+    e importância por permutação de cada feature.
+
+    As features são padronizadas uma vez sobre o dataset inteiro (transformação não
+    supervisionada); o intercepto absorve diferenças de média entre folds.
+    """
+
+    def __init__(self, features=MODEL_FEATURES, folds=5, l2=1.0, seed=42, max_workers=None):
+        self.features = list(features)
+        self.folds = folds
+        self.l2 = l2
+        self.seed = seed
+        self.max_workers = max_workers
+
+    def cross_validate(self, df):
+        X, y, mean, std = build_features(df, self.features)
+        n = len(y)
+        if n < self.folds * 2 or y.min() == y.max():
+            return {'error': 'Dados insuficientes para o modelo', 'num_prs': n}
+
+        rng = np.random.default_rng(self.seed)
+        folds = np.empty(n, dtype=np.int8)
+        folds[rng.permutation(n)] = np.arange(n) % self.folds
+
+        if n < PARALLEL_MIN_ROWS:
+            fold_results = [_fit_fold(X, y, folds, fold, self.l2, self.seed)
+                            for fold in range(self.folds)]
+        else:
+            work_dir = tempfile.mkdtemp(prefix='merge_model_')
+            try:
+                np.save(os.path.join(work_dir, 'X.npy'), X)
+                np.save(os.path.join(work_dir, 'y.npy'), y)
+                np.save(os.path.join(work_dir, 'folds.npy'), folds)
+                workers = min(self.folds, self.max_workers or os.cpu_count())
+                with ProcessPoolExecutor(max_workers=workers) as executor:
+                    fold_results = list(executor.map(
+                        _fit_fold_from_disk, [work_dir] * self.folds, range(self.folds),
+                        [self.l2] * self.folds, [self.seed] * self.folds))
+            finally:
+                shutil.rmtree(work_dir, ignore_errors=True)
+
+        aucs = np.array([fold['auc'] for fold in fold_results])
+        coefficients = np.mean([fold['coefficients'] for fold in fold_results], axis=0)
+        importance = np.mean([fold['permutation_importance'] for fold in fold_results], axis=0)
+
+        return {
+            'method': 'Regressão logística (L2, IRLS)',
+            'features': self.features,
+            'num_prs': n,
+            'folds': self.folds,
+            'merge_rate': float(y.mean()),
+            'auc_mean': float(aucs.mean()),
+            'auc_std': float(aucs.std()),
+            'fold_auc': aucs.tolist(),
+            'log_loss': float(np.mean([fold['log_loss'] for fold in fold_results])),
+            'accuracy': float(np.mean([fold['accuracy'] for fold in fold_results])),
+            'coefficients': dict(zip(self.features, coefficients.tolist())),
+            'permutation_importance': dict(zip(self.features, importance.tolist())),
+            'feature_mean': dict(zip(self.features, mean.tolist())),
+            'feature_std': dict(zip(self.features, std.tolist()))
+        }
@@ -1,23 +1,177 @@
+import contextlib
+import io
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
 import pandas as pd
 from scipy import stats
 
+from src.DatasetLoader import load_dataset
+from src.TimeFeatures import add_time_features
+
+RQ_PAIRS = [
+    ('RQ01', 'files_changed', 'files_changed', 'status_numeric'),
+    ('RQ01', 'additions', 'additions', 'status_numeric'),
+    ('RQ01', 'deletions', 'deletions', 'status_numeric'),
+    ('RQ01', 'total_lines', 'total_lines_changed', 'status_numeric'),
+    ('RQ02', None, 'time_to_close_hours', 'status_numeric'),
+    ('RQ03', None, 'body_length', 'status_numeric'),
+    ('RQ04', 'participants', 'num_participants', 'status_numeric'),
+    ('RQ04', 'comments', 'num_comments', 'status_numeric'),
+    ('RQ05', 'files_changed', 'files_changed', 'num_reviews'),
+    ('RQ05', 'additions', 'additions', 'num_reviews'),
+    ('RQ05', 'deletions', 'deletions', 'num_reviews'),
+    ('RQ05', 'total_lines', 'total_lines_changed', 'num_reviews'),
+    ('RQ06', None, 'time_to_close_hours', 'num_reviews'),
+    ('RQ07', None, 'body_length', 'num_reviews'),
+    ('RQ08', 'participants', 'num_participants', 'num_reviews'),
+    ('RQ08', 'comments', 'num_comments', 'num_reviews'),
+]
+
+STATUS_METRICS = ['files_changed', 'additions', 'deletions', 'total_lines_changed',
+                  'time_to_close_hours', 'body_length', 'num_participants', 'num_comments',
+                  'num_reviews']
+
+GROUP_KEYS = ['repo_owner', 'repo_name']
+
+
+def iter_correlations(results):
+    """Percorre os resultados das RQs como (rq, chave, dicionário da correlação)."""
+    for rq, key, _, _ in RQ_PAIRS:
+        result = results.get(rq, {})
+        if key is None and 'correlation' in result:
+            yield rq, key, result['correlation']
+        elif key is not None and key in result.get('correlations', {}):
+            yield rq, key, result['correlations'][key]
+
+
+def holm(p_values):
+    p_values = np.asarray(p_values, dtype=float)
+    adjusted = np.full(len(p_values), np.nan)
+    valid = np.flatnonzero(~np.isnan(p_values))
+    order = valid[np.argsort(p_values[valid])]
+    m = len(order)
+    stepped = np.maximum.accumulate((m - np.arange(m)) * p_values[order])
+    adjusted[order] = np.minimum(stepped, 1)
+    return adjusted
+
+
+def benjamini_hochberg(p_values):
+    p_values = np.asarray(p_values, dtype=float)
+    adjusted = np.full(len(p_values), np.nan)
+    valid = np.flatnonzero(~np.isnan(p_values))
+    order = valid[np.argsort(p_values[valid])]
+    m = len(order)
+    scaled = p_values[order] * m / np.arange(1, m + 1)
+    adjusted[order] = np.minimum(np.minimum.accumulate(scaled[::-1])[::-1], 1)
+    return adjusted
+
+
+def rank_with_ties(values):
+    """Postos médios (como scipy.stats.rankdata) e o termo de empates Σ t³ - t."""
+    _, inverse, counts = np.unique(values, return_inverse=True, return_counts=True)
+    # Posto médio de cada valor distinto: posição inicial + (t + 1) / 2
+    midranks = np.cumsum(counts) - counts + (counts + 1) / 2
+    counts = counts.astype(float)
+    return midranks[inverse], np.sum(counts ** 3 - counts)
+
+
+def mann_whitney_from_ranks(rank_sum, n1, n2, tie_term):
+    """
+    Teste U de Mann-Whitney (aproximação normal com correção de continuidade e de
+    empates) a partir da soma dos postos do grupo 1 numa ordenação conjunta.
+    tie_term é a soma de t³ - t sobre os grupos de empates.
+    """
+    n = n1 + n2
+    if n1 == 0 or n2 == 0:
+        return {'U': np.nan, 'p_value': np.nan, 'rank_biserial': np.nan, 'significant': False}
+    
+    u1 = rank_sum - n1 * (n1 + 1) / 2
+    mu = n1 * n2 / 2
+    sigma = np.sqrt(n1 * n2 / 12 * ((n + 1) - tie_term / (n * (n - 1))))
+    if sigma == 0:
+        p_value = np.nan
+    else:
+        z = (u1 - mu - 0.5 * np.sign(u1 - mu)) / sigma
+        p_value = float(2 * stats.norm.sf(abs(z)))
+    
+    return {
+        'U': float(u1),
+        'p_value': p_value,
+        'rank_biserial': float(2 * u1 / (n1 * n2) - 1),
+        'significant': bool(p_value < 0.05)
+    }
+
+
+# Colunas do dataset ordenado por repositório, enviadas uma vez a cada processo do pool
+_group_columns = None
+
+
+def _init_group_worker(columns):
+    global _group_columns
+    _group_columns = columns
+
+
+def _analyze_group(bounds):
+    # Executado nos processos do pool: recebe só o intervalo [início, fim) do grupo
+    start, end = bounds
+    df = pd.DataFrame({column: values[start:end] for column, values in _group_columns.items()})
+    with contextlib.redirect_stdout(io.StringIO()):
+        analyzer = PRAnalyzer.from_dataframe(df)
+        return analyzer.run_all_analyses()
+
+
 class PRAnalyzer:
-    def __init__(self, dataset_path):
-        self.df = pd.read_csv(dataset_path)
+    # Colunas lidas do dataset; timestamps e demais campos não são carregados
+    COLUMNS = ['status'] + STATUS_METRICS + GROUP_KEYS + ['pr_number']
+    
+    def __init__(self, dataset_path, memory_map=False):
+        self._setup(load_dataset(dataset_path, self.COLUMNS, memory_map=memory_map))
+    
+    @classmethod
+    def from_dataframe(cls, df):
+        analyzer = cls.__new__(cls)
+        analyzer._setup(df)
+        return analyzer
+    
+    def _setup(self, df):
+        self.df = add_time_features(df)
         self.results = {}
+        self._ranks = {}
         self.df['status_numeric'] = (self.df['status'] == 'MERGED').astype(int)
         
         print(f"Dataset carregado: {len(self.df)} PRs")
         print(f"PRs MERGED: {sum(self.df['status'] == 'MERGED')}")
         print(f"PRs CLOSED: {sum(self.df['status'] == 'CLOSED')}")
     
+    def column_ranks(self, column):
+        """
+        Postos médios da coluna e o termo de empates (Σ t³ - t), calculados uma única
+        vez e reutilizados pelas correlações de Spearman e pelos testes de Mann-Whitney.
+        Retorna None se a coluna tiver valores ausentes.
+        """
+        if column not in self._ranks:
+            values = self.df[column].to_numpy()
+            self._ranks[column] = None if pd.isna(values).any() else rank_with_ties(values)
+        return self._ranks[column]
+    
     def calculate_correlation(self, var1, var2, method='spearman'):
-        data = self.df[[var1, var2]].dropna()
+        ranked = [self.column_ranks(var) for var in (var1, var2)] if method == 'spearman' else [None]
         
-        if method == 'spearman':
+        if method == 'spearman' and all(r is not None for r in ranked):
+            n = len(self.df)
+            with np.errstate(divide='ignore', invalid='ignore'):
+                corr = np.corrcoef(ranked[0][0], ranked[1][0])[0, 1]
+                t = corr * np.sqrt((n - 2) / ((1 - corr) * (1 + corr)))
+            p_value = 2 * stats.t.sf(abs(t), n - 2)
+            method_name = "Spearman"
+        elif method == 'spearman':
+            data = self.df[[var1, var2]].dropna()
             corr, p_value = stats.spearmanr(data[var1], data[var2])
             method_name = "Spearman"
         else:
+            data = self.df[[var1, var2]].dropna()
             corr, p_value = stats.pearsonr(data[var1], data[var2])
             method_name = "Pearson"
         
@@ -108,37 +262,167 @@ class PRAnalyzer:
         self.analyze_rq06()
         self.analyze_rq07()
         self.analyze_rq08()
+        self.analyze_status_differences()
+        self.adjust_p_values()
         print("\n=== ANÁLISES CONCLUÍDAS ===")
         return self.results
     
-    def generate_report(self, output_file='analysis_results.txt'):
-        with open(output_file, 'w', encoding='utf-8') as f:
-            f.write("=" * 80 + "\n")
-            f.write("RELATÓRIO DE ANÁLISE ESTATÍSTICA\n")
-            f.write("=" * 80 + "\n\n")
-            
-            f.write(f"Total de PRs: {len(self.df)}\n")
-            f.write(f"MERGED: {sum(self.df['status'] == 'MERGED')}\n")
-            f.write(f"CLOSED: {sum(self.df['status'] == 'CLOSED')}\n\n")
+    def analyze_status_differences(self):
+        print("\n=== Mann-Whitney: MERGED vs CLOSED por métrica ===")
+        merged = self.df['status_numeric'].to_numpy() == 1
+        
+        results = {}
+        for metric in STATUS_METRICS:
+            ranked = self.column_ranks(metric)
+            if ranked is None:
+                valid = self.df[metric].notna().to_numpy()
+                ranks, tie_term = rank_with_ties(self.df[metric].to_numpy()[valid])
+                group = merged[valid]
+            else:
+                (ranks, tie_term), group = ranked, merged
+            n1 = int(group.sum())
+            results[metric] = mann_whitney_from_ranks(ranks[group].sum(), n1,
+                                                      len(group) - n1, tie_term)
+        
+        self.results['MannWhitney'] = results
+        return results
+    
+    def adjust_p_values(self):
+        """
+        Acrescenta p-values ajustados (Holm e Benjamini-Hochberg) a cada família de
+        testes: as 16 correlações das RQs e os testes de Mann-Whitney.
+        """
+        families = [
+            [corr for _, _, corr in iter_correlations(self.results)],
+            list(self.results.get('MannWhitney', {}).values())
+        ]
+        for tests in families:
+            if not tests:
+                continue
+            p_values = [test['p_value'] for test in tests]
+            for test, p_holm, p_bh in zip(tests, holm(p_values), benjamini_hochberg(p_values)):
+                test['p_value_holm'] = float(p_holm)
+                test['p_value_bh'] = float(p_bh)
+                test['significant_holm'] = bool(p_holm < 0.05)
+                test['significant_bh'] = bool(p_bh < 0.05)
+        return self.results
+    
+    def run_merge_model(self, folds=5, max_workers=None):
+        from src.MergeModel import MergeOutcomeModel
+        
+        print("\n=== Modelo preditivo de merge (validação cruzada) ===")
+        model = MergeOutcomeModel(folds=folds, max_workers=max_workers)
+        self.results['model'] = model.cross_validate(self.df)
+        if 'auc_mean' in self.results['model']:
+            print(f"AUC: {self.results['model']['auc_mean']:.4f} "
+                  f"(± {self.results['model']['auc_std']:.4f}, {folds} folds)")
+        return self.results['model']
+    
+    def run_incremental_analyses(self, state_file):
+        from src.PRStatsState import PRStatsState
+
+        print("Incorporando lote ao estado incremental...")
+        state = PRStatsState.load(state_file) if os.path.exists(state_file) else PRStatsState()
+        state.update(self.df)
+        state.save(state_file)
+
+        self.results = state.results()
+        self.results['MannWhitney'] = {metric: state.mann_whitney(metric) for metric in STATUS_METRICS}
+        self.results['summary'] = state.summary()
+        self.adjust_p_values()
+        print(f"Estado atualizado: {state.num_prs} PRs acumulados ({state.last_update['new']} novos, "
+              f"{state.last_update['skipped']} já incorporados)")
+        if state.last_update['updated']:
+            print(f"{state.last_update['updated']} PRs mudaram desde que foram incorporados e seguem com a "
+                  f"versão anterior; reconstrua o estado a partir do dataset completo para atualizá-los")
+        print(f"Estado salvo em {state_file}")
+        return self.results
+
+    def _group_slices(self):
+        # Ordena uma única vez e devolve os limites [início, fim) de cada repositório
+        ordered = self.df.sort_values(GROUP_KEYS, kind='stable').reset_index(drop=True)
+        keys = ordered[GROUP_KEYS].to_numpy()
+        changed = np.any(keys[1:] != keys[:-1], axis=1)
+        starts = np.concatenate(([0], np.flatnonzero(changed) + 1))
+        ends = np.append(starts[1:], len(ordered))
+        return ordered, starts, ends
+    
+    def run_stratified_analyses(self, min_prs=10, max_workers=None):
+        print("Iniciando análises estratificadas por repositório...")
+        ordered, starts, ends = self._group_slices()
+        
+        groups = {}
+        owners, names = (ordered[key].to_numpy() for key in GROUP_KEYS)
+        for start, end in zip(starts, ends):
+            if end - start < min_prs:
+                continue
+            groups[f"{owners[start]}/{names[start]}"] = (int(start), int(end))
+        
+        print(f"Repositórios analisados: {len(groups)} (ignorados: {len(starts) - len(groups)} com < {min_prs} PRs)")
+        
+        # Só as colunas usadas nas RQs vão aos processos, uma vez; cada tarefa é um intervalo
+        columns = {column: ordered[column].array for column in ['status'] + STATUS_METRICS
+                   if column in ordered.columns}
+        workers = max_workers or os.cpu_count()
+        chunksize = max(1, len(groups) // (workers * 4))
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_group_worker,
+                                 initargs=(columns,)) as executor:
+            group_results = dict(zip(groups, executor.map(_analyze_group, groups.values(),
+                                                          chunksize=chunksize)))
+        
+        sizes = {repo: end - start for repo, (start, end) in groups.items()}
+        self.results['stratified'] = {
+            'groups': group_results,
+            'meta': self.meta_aggregate(group_results, sizes)
+        }
+        print("\n=== ANÁLISES ESTRATIFICADAS CONCLUÍDAS ===")
+        return self.results['stratified']
+    
+    @staticmethod
+    def meta_aggregate(group_results, sizes):
+        """
+        Combina as correlações de cada repositório via transformação z de Fisher,
+        ponderada por n - 3 (efeitos fixos).
+        """
+        collected = {}
+        for repo, results in group_results.items():
+            if sizes[repo] <= 3:
+                continue
+            for rq, key, corr in iter_correlations(results):
+                if np.isnan(corr['correlation']):
+                    continue
+                rhos, weights, significant = collected.setdefault((rq, key), ([], [], []))
+                rhos.append(corr['correlation'])
+                weights.append(sizes[repo] - 3)
+                significant.append(bool(corr['significant']))
+        
+        meta = {}
+        for (rq, key), (rhos, weights, significant) in collected.items():
+            z = np.arctanh(np.clip(rhos, -0.999999, 0.999999))
+            weights = np.asarray(weights, dtype=float)
+            z_pooled = np.sum(weights * z) / weights.sum()
+            se = 1 / np.sqrt(weights.sum())
+            p_value = 2 * stats.norm.sf(abs(z_pooled) / se)
             
-            for rq in ['RQ01', 'RQ02', 'RQ03', 'RQ04', 'RQ05', 'RQ06', 'RQ07', 'RQ08']:
-                f.write(f"\n{rq}\n")
-                f.write("-" * 80 + "\n")
-                
-                if rq in self.results:
-                    result = self.results[rq]
-                    
-                    if 'correlations' in result:
-                        for var, corr in result['correlations'].items():
-                            f.write(f"\n{var}:\n")
-                            f.write(f"  Correlação: {corr['correlation']:.4f}\n")
-                            f.write(f"  P-value: {corr['p_value']:.6f}\n")
-                            f.write(f"  Significante: {'Sim' if corr['significant'] else 'Não'}\n")
-                    
-                    elif 'correlation' in result:
-                        corr = result['correlation']
-                        f.write(f"  Correlação: {corr['correlation']:.4f}\n")
-                        f.write(f"  P-value: {corr['p_value']:.6f}\n")
-                        f.write(f"  Significante: {'Sim' if corr['significant'] else 'Não'}\n")
+            entry = {
+                'correlation': float(np.tanh(z_pooled)),
+                'ci_low': float(np.tanh(z_pooled - 1.96 * se)),
+                'ci_high': float(np.tanh(z_pooled + 1.96 * se)),
+                'p_value': float(p_value),
+                'method': 'Spearman (meta, Fisher z)',
+                'significant': bool(p_value < 0.05),
+                'median_correlation': float(np.median(rhos)),
+                'num_groups': len(rhos),
+                'num_significant_groups': sum(significant)
+            }
+            if key is None:
+                meta.setdefault(rq, {})['correlation'] = entry
+            else:
+                meta.setdefault(rq, {}).setdefault('correlations', {})[key] = entry
+        return meta
+    
+    def generate_report(self, output_file='analysis_results.txt'):
+        from src.ReportGenerator import ReportGenerator
         
-        print(f"\nRelatório salvo em {output_file}")
\ No newline at end of file
+        ReportGenerator.from_dataframe(self.df, self.results).write(output_file, 'txt')
+        print(f"\nRelatório salvo em {output_file}")
@@ -0,0 +1,132 @@
+import sys
+
+import numpy as np
+import pandas as pd
+
+from src.TimeFeatures import ISO_FORMAT, hours_between, parse_timestamps, to_epoch
+
+DATASET_COLUMNS = [
+    'repo_owner', 'repo_name', 'pr_number', 'status', 'created_at', 'closed_at',
+    'files_changed', 'additions', 'deletions', 'total_lines_changed', 'body_length',
+    'num_reviews', 'num_comments', 'num_participants', 'time_to_close_hours',
+    'first_review_at', 'time_to_first_review_hours'
+]
+
+# Arestas autor -> participante (revisor ou comentarista), uma por PR e participante
+INTERACTION_COLUMNS = ['repo_owner', 'repo_name', 'pr_number', 'author', 'participant',
+                       'kind', 'interactions']
+
+
+class PRRecord:
+    """
+    Registro compacto de um PR coletado: atributos fixos em __slots__, identificadores
+    do repositório internados (uma única string por repositório) e timestamps como
+    inteiros de época (segundos, UTC; -1 quando ausente, como em first_review_at),
+    formatados como ISO-8601 só na exportação.
+
+    Opcionalmente guarda o autor e os demais participantes do PR em interactions:
+    lista de (login, tipo, interações), uma entrada por tipo ('review' para revisões,
+    'comment' para comentários) em que o participante tem interações.
+    """
+
+    __slots__ = ('repo_owner', 'repo_name', 'pr_number', 'merged', 'created_at', 'closed_at',
+                 'first_review_at', 'files_changed', 'additions', 'deletions', 'body_length',
+                 'num_reviews', 'num_comments', 'num_participants', 'author', 'interactions')
+
+    # Colunas numéricas copiadas diretamente dos atributos, com o dtype de destino
+    NUMERIC_FIELDS = {
+        'pr_number': np.int64,
+        'files_changed': np.int64,
+        'additions': np.int64,
+        'deletions': np.int64,
+        'body_length': np.int64,
+        'num_reviews': np.int64,
+        'num_comments': np.int64,
+        'num_participants': np.int64
+    }
+
+    def __init__(self, repo_owner, repo_name, pr_number, merged, created_at, closed_at,
+                 files_changed, additions, deletions, body_length,
+                 num_reviews, num_comments, num_participants, first_review_at=-1,
+                 author=None, interactions=None):
+        self.repo_owner = sys.intern(repo_owner)
+        self.repo_name = sys.intern(repo_name)
+        self.pr_number = pr_number
+        self.merged = merged
+        self.created_at = created_at
+        self.closed_at = closed_at
+        self.first_review_at = first_review_at
+        self.files_changed = files_changed
+        self.additions = additions
+        self.deletions = deletions
+        self.body_length = body_length
+        self.num_reviews = num_reviews
+        self.num_comments = num_comments
+        self.num_participants = num_participants
+        self.author = author
+        self.interactions = interactions
+
+    @property
+    def status(self):
+        return 'MERGED' if self.merged else 'CLOSED'
+
+    @property
+    def total_lines_changed(self):
+        return self.additions + self.deletions
+
+    @property
+    def time_to_close_hours(self):
+        return (self.closed_at - self.created_at) / 3600
+
+    def to_dict(self):
+        return {field: getattr(self, field) for field in self.__slots__}
+
+    @classmethod
+    def from_dict(cls, data):
+        first_review_at = data.get('first_review_at')
+        if first_review_at is None or isinstance(first_review_at, str):
+            # Registros gravados por versões que guardavam a string ISO
+            data = dict(data, first_review_at=int(to_epoch(parse_timestamps([first_review_at]))[0]))
+        return cls(**data)
+
+    def __repr__(self):
+        return f"PRRecord({self.repo_owner}/{self.repo_name}#{self.pr_number}, {self.status})"
+
+    @staticmethod
+    def _column(records, field, dtype):
+        return np.fromiter((getattr(r, field) for r in records), dtype=dtype, count=len(records))
+
+    @classmethod
+    def to_dataframe(cls, records):
+        """Monta o DataFrame coluna a coluna, sem dicionários intermediários por linha."""
+        columns = {field: cls._column(records, field, dtype)
+                   for field, dtype in cls.NUMERIC_FIELDS.items()}
+        merged = cls._column(records, 'merged', bool)
+        created_at = cls._column(records, 'created_at', np.int64).astype('datetime64[s]')
+        closed_at = cls._column(records, 'closed_at', np.int64).astype('datetime64[s]')
+        first_review_at = cls._column(records, 'first_review_at', np.int64)
+        first_review_at = np.where(first_review_at < 0, np.datetime64('NaT'),
+                                   first_review_at.astype('datetime64[s]'))
+
+        columns['repo_owner'] = pd.Categorical([r.repo_owner for r in records])
+        columns['repo_name'] = pd.Categorical([r.repo_name for r in records])
+        columns['status'] = np.where(merged, 'MERGED', 'CLOSED')
+        columns['created_at'] = pd.DatetimeIndex(created_at).strftime(ISO_FORMAT)
+        columns['closed_at'] = pd.DatetimeIndex(closed_at).strftime(ISO_FORMAT)
+        columns['first_review_at'] = pd.DatetimeIndex(first_review_at).strftime(ISO_FORMAT)
+        columns['total_lines_changed'] = columns['additions'] + columns['deletions']
+        columns['time_to_close_hours'] = hours_between(created_at, closed_at)
+        columns['time_to_first_review_hours'] = hours_between(created_at, first_review_at)
+
+        return pd.DataFrame(columns, columns=DATASET_COLUMNS)
+
+    @staticmethod
+    def interactions_to_dataframe(records):
+        """Tabela de arestas dos registros coletados com interações."""
+        rows = [(r.repo_owner, r.repo_name, r.pr_number, r.author, login, kind, count)
+                for r in records if r.interactions
+                for login, kind, count in r.interactions]
+        df = pd.DataFrame(rows, columns=INTERACTION_COLUMNS)
+        for column in ['repo_owner', 'repo_name', 'kind']:
+            df[column] = df[column].astype('category')
+        return df
@@ -0,0 +1,267 @@
+import json
+
+import numpy as np
+import pandas as pd
+from scipy import stats
+
+from src.PRAnalyzer import RQ_PAIRS, mann_whitney_from_ranks
+
+# Resolução do esboço de postos: bins em escala log1p, 16 por unidade (~6% de largura).
+# Valores inteiros pequenos (revisões, participantes, status) caem em bins distintos.
+BINS_PER_UNIT = 16
+STATE_VERSION = 3
+STATUSES = ['CLOSED', 'MERGED']
+
+TRACKED_PAIRS = sorted({(var1, var2) for _, _, var1, var2 in RQ_PAIRS} |
+                       {('num_reviews', 'status_numeric')})
+METRICS = sorted({var1 for var1, _ in TRACKED_PAIRS} | {'num_reviews'})
+
+# Identificação de cada PR e colunas incorporadas de cada linha
+KEY_COLUMNS = ['repo_owner', 'repo_name', 'pr_number']
+VALUE_COLUMNS = METRICS + ['status_numeric']
+COLUMN_INDEX = {column: i for i, column in enumerate(VALUE_COLUMNS)}
+
+
+def to_bins(values):
+    values = np.clip(np.asarray(values, dtype=float), 0, None)
+    return np.floor(np.log1p(values) * BINS_PER_UNIT).astype(np.int64)
+
+
+def bin_value(bins):
+    return np.expm1((np.asarray(bins) + 0.5) / BINS_PER_UNIT)
+
+
+def _add_padded(a, b):
+    shape = tuple(max(x, y) for x, y in zip(a.shape, b.shape))
+    total = np.zeros(shape, dtype=np.int64)
+    total[tuple(slice(0, n) for n in a.shape)] += a
+    total[tuple(slice(0, n) for n in b.shape)] += b
+    return total
+
+
+def _midranks(counts):
+    before = np.cumsum(counts) - counts
+    return before + (counts + 1) / 2
+
+
+class PRStatsState:
+    """
+    Estatísticas suficientes e mescláveis do dataset: contagens, momentos por
+    métrica/status e histogramas conjuntos em bins log para aproximar os postos
+    de Spearman. Novos lotes são incorporados somando contagens.
+
+    Cada PR (repo_owner, repo_name, pr_number) é contado uma vez. O índice de
+    deduplicação guarda só dois uint64 por PR (hash da chave, ordenado, e hash dos
+    valores incorporados): reaplicar um lote não muda nada, e um PR cujos valores
+    mudaram é detectado mas não substituído, pois sem os valores antigos a observação
+    anterior não pode ser retirada. Todas as estatísticas, inclusive min/max, seguem
+    com a primeira versão do PR; para incorporar atualizações, reconstrua o estado a
+    partir do dataset completo.
+    """
+
+    def __init__(self):
+        self.num_prs = 0
+        # moments[métrica] -> linhas CLOSED/MERGED, colunas n, soma, soma², min, max
+        self.moments = {metric: self._empty_moments() for metric in METRICS}
+        self.joint = {pair: np.zeros((0, 0), dtype=np.int64) for pair in TRACKED_PAIRS}
+        # PRs incorporados: hashes das chaves (ordenados) e dos valores de cada um
+        self.key_hashes = np.zeros(0, dtype=np.uint64)
+        self.row_hashes = np.zeros(0, dtype=np.uint64)
+        self.last_update = {'new': 0, 'updated': 0, 'skipped': 0}
+
+    @staticmethod
+    def _empty_moments():
+        moments = np.zeros((len(STATUSES), 5))
+        moments[:, 3] = np.inf
+        moments[:, 4] = -np.inf
+        return moments
+
+    def _fold(self, values):
+        if not len(values):
+            return
+        status = values[:, COLUMN_INDEX['status_numeric']]
+
+        for metric in METRICS:
+            column = values[:, COLUMN_INDEX[metric]]
+            for s in range(len(STATUSES)):
+                group = column[(status == s) & ~np.isnan(column)]
+                if len(group) == 0:
+                    continue
+                row = self.moments[metric][s]
+                row[0] += len(group)
+                row[1] += group.sum()
+                row[2] += np.square(group).sum()
+                row[3] = min(row[3], group.min())
+                row[4] = max(row[4], group.max())
+
+        for var1, var2 in TRACKED_PAIRS:
+            x, y = values[:, COLUMN_INDEX[var1]], values[:, COLUMN_INDEX[var2]]
+            present = ~np.isnan(x) & ~np.isnan(y)
+            if not present.any():
+                continue
+            bx, by = to_bins(x[present]), to_bins(y[present])
+            ny = by.max() + 1
+            counts = np.bincount(bx * ny + by, minlength=(bx.max() + 1) * ny)
+            self.joint[(var1, var2)] = _add_padded(self.joint[(var1, var2)],
+                                                   counts.reshape(-1, ny))
+
+    def _lookup(self, key_hashes):
+        """Posição de cada hash no índice ordenado e se ele já está lá."""
+        positions = np.searchsorted(self.key_hashes, key_hashes)
+        found = np.zeros(len(key_hashes), dtype=bool)
+        inside = positions < len(self.key_hashes)
+        found[inside] = self.key_hashes[positions[inside]] == key_hashes[inside]
+        return positions, found
+
+    def _insert(self, key_hashes, row_hashes):
+        order = np.argsort(key_hashes, kind='stable')
+        key_hashes, row_hashes = key_hashes[order], row_hashes[order]
+        positions = np.searchsorted(self.key_hashes, key_hashes)
+        self.key_hashes = np.insert(self.key_hashes, positions, key_hashes)
+        self.row_hashes = np.insert(self.row_hashes, positions, row_hashes)
+
+    def update(self, df):
+        missing = [column for column in KEY_COLUMNS if column not in df.columns]
+        if missing:
+            raise ValueError(f"Lote sem as colunas de identificação do PR: {', '.join(missing)}")
+        status = (df['status'] == 'MERGED').to_numpy(dtype=float)
+        values = np.column_stack([status if column == 'status_numeric' else df[column].to_numpy(dtype=float)
+                                  for column in VALUE_COLUMNS])
+        key_hashes = pd.util.hash_pandas_object(df[KEY_COLUMNS].astype(str), index=False).to_numpy()
+        row_hashes = pd.util.hash_pandas_object(pd.DataFrame(values), index=False).to_numpy()
+
+        # Dentro do lote vale a última linha de cada PR
+        _, last = np.unique(key_hashes[::-1], return_index=True)
+        rows = np.sort(len(key_hashes) - 1 - last)
+        key_hashes, row_hashes, values = key_hashes[rows], row_hashes[rows], values[rows]
+
+        positions, found = self._lookup(key_hashes)
+        same = np.zeros(len(rows), dtype=bool)
+        same[found] = self.row_hashes[positions[found]] == row_hashes[found]
+        new = ~found
+
+        self._fold(values[new])
+        self._insert(key_hashes[new], row_hashes[new])
+        self.num_prs += int(new.sum())
+        self.last_update = {'new': int(new.sum()), 'updated': int((found & ~same).sum()),
+                            'skipped': int(same.sum())}
+        return self
+
+    def merge(self, other):
+        # Sem os valores de cada PR não há como desfazer a contagem de um PR em comum
+        if self._lookup(other.key_hashes)[1].any():
+            raise ValueError("Estados com PRs em comum não podem ser mesclados")
+        self.num_prs += other.num_prs
+        for metric in METRICS:
+            a, b = self.moments[metric], other.moments[metric]
+            a[:, :3] += b[:, :3]
+            a[:, 3] = np.minimum(a[:, 3], b[:, 3])
+            a[:, 4] = np.maximum(a[:, 4], b[:, 4])
+        for pair in TRACKED_PAIRS:
+            self.joint[pair] = _add_padded(self.joint[pair], other.joint[pair])
+        self._insert(other.key_hashes, other.row_hashes)
+        return self
+
+    def spearman(self, var1, var2):
+        table = self.joint[(var1, var2)].astype(float)
+        n = table.sum()
+        if n < 3:
+            return {'correlation': np.nan, 'p_value': np.nan,
+                    'method': 'Spearman (incremental)', 'significant': False}
+
+        mean_rank = (n + 1) / 2
+        rx = _midranks(table.sum(axis=1)) - mean_rank
+        ry = _midranks(table.sum(axis=0)) - mean_rank
+        cov = rx @ table @ ry
+        var_x = table.sum(axis=1) @ np.square(rx)
+        var_y = table.sum(axis=0) @ np.square(ry)
+
+        if var_x == 0 or var_y == 0:
+            corr, p_value = np.nan, np.nan
+        else:
+            corr = float(np.clip(cov / np.sqrt(var_x * var_y), -1, 1))
+            t = corr * np.sqrt((n - 2) / max(1 - corr ** 2, 1e-300))
+            p_value = float(2 * stats.t.sf(abs(t), n - 2))
+
+        return {
+            'correlation': corr,
+            'p_value': p_value,
+            'method': 'Spearman (incremental)',
+            'significant': bool(p_value < 0.05)
+        }
+
+    def mann_whitney(self, metric):
+        table = self.joint[(metric, 'status_numeric')].astype(float)
+        closed_col, merged_col = to_bins(0), to_bins(1)
+        merged = table[:, merged_col] if merged_col < table.shape[1] else np.zeros(len(table))
+        closed = table[:, closed_col] if closed_col < table.shape[1] else np.zeros(len(table))
+        totals = merged + closed
+        ranks = _midranks(totals)
+        return mann_whitney_from_ranks(ranks @ merged, merged.sum(), closed.sum(),
+                                       np.sum(totals ** 3 - totals))
+
+    def quantile(self, metric, q, status=None):
+        table = self.joint[(metric, 'status_numeric')]
+        if status is None:
+            counts = table.sum(axis=1)
+        else:
+            column = to_bins(STATUSES.index(status))
+            counts = table[:, column] if column < table.shape[1] else np.zeros(len(table))
+        if counts.sum() == 0:
+            return np.nan
+        position = np.searchsorted(np.cumsum(counts), q * counts.sum(), side='left')
+        return float(bin_value(position))
+
+    def summary(self):
+        summary = {}
+        for metric in METRICS:
+            summary[metric] = {}
+            for s, status in enumerate(STATUSES):
+                n, total, total_sq, low, high = self.moments[metric][s]
+                if n == 0:
+                    continue
+                mean = total / n
+                std = np.sqrt(max(total_sq / n - mean ** 2, 0) * n / max(n - 1, 1))
+                entry = {'count': int(n), 'mean': mean, 'std': std, 'min': low, 'max': high}
+                if (metric, 'status_numeric') in self.joint:
+                    entry['median'] = self.quantile(metric, 0.5, status)
+                summary[metric][status] = entry
+        return summary
+
+    def results(self):
+        results = {}
+        for rq, key, var1, var2 in RQ_PAIRS:
+            corr = self.spearman(var1, var2)
+            if key is None:
+                results[rq] = {'correlation': corr}
+            else:
+                results.setdefault(rq, {'correlations': {}})['correlations'][key] = corr
+        return results
+
+    def save(self, path):
+        arrays = {f"moments__{metric}": moments for metric, moments in self.moments.items()}
+        arrays.update({f"joint__{var1}__{var2}": table
+                       for (var1, var2), table in self.joint.items()})
+        meta = json.dumps({'version': STATE_VERSION, 'num_prs': self.num_prs,
+                           'bins_per_unit': BINS_PER_UNIT})
+        with open(path, 'wb') as f:
+            np.savez_compressed(f, meta=np.array(meta), key_hashes=self.key_hashes,
+                                row_hashes=self.row_hashes, **arrays)
+
+    @classmethod
+    def load(cls, path):
+        state = cls()
+        with np.load(path, allow_pickle=False) as data:
+            meta = json.loads(str(data['meta']))
+            if meta['version'] != STATE_VERSION or meta['bins_per_unit'] != BINS_PER_UNIT:
+                raise ValueError(f"Estado incompatível em {path}: {meta}")
+            state.num_prs = meta['num_prs']
+            for metric in METRICS:
+                if f"moments__{metric}" in data:
+                    state.moments[metric] = data[f"moments__{metric}"]
+            for var1, var2 in TRACKED_PAIRS:
+                if f"joint__{var1}__{var2}" in data:
+                    state.joint[(var1, var2)] = data[f"joint__{var1}__{var2}"]
+            state.key_hashes = data['key_hashes']
+            state.row_hashes = data['row_hashes']
+        return state
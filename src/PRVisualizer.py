@@ -1,11 +1,19 @@
-import pandas as pd
 import matplotlib.pyplot as plt
 import seaborn as sns
 import numpy as np
 
+from src.DatasetLoader import load_dataset
+
 class PRVisualizer:
-    def __init__(self, dataset_path):
-        self.df = pd.read_csv(dataset_path)
+    COLUMNS = ['status', 'files_changed', 'additions', 'deletions', 'total_lines_changed',
+               'time_to_close_hours', 'body_length', 'num_participants', 'num_comments',
+               'num_reviews']
+    # Lidas se existirem, só para as tendências (TrendAnalyzer sobre o mesmo DataFrame)
+    TREND_COLUMNS = ['repo_owner', 'repo_name', 'created_at']
+    
+    def __init__(self, dataset_path, memory_map=False):
+        self.df = load_dataset(dataset_path, self.COLUMNS + self.TREND_COLUMNS, memory_map=memory_map)
+        self.trends = None
         sns.set_style("whitegrid")
         plt.rcParams['figure.figsize'] = (12, 8)
         print(f"Dataset carregado: {len(self.df)} PRs")
@@ -75,7 +83,59 @@ class PRVisualizer:
         print(f"Gráfico salvo: {save_path}")
         plt.close()
     
-    def generate_all_plots(self, output_dir='plots'):
+    def plot_trends(self, save_path='trends.png', trends=None, rolling_days=90):
+        if trends is None:
+            trends = self.trend_analyzer()
+        if trends is None or not len(trends.times):
+            print("Sem datas de criação válidas: gráfico de tendências ignorado")
+            return
+        monthly = trends.bucketed('M')
+        rolling = trends.rolling(rolling_days, 'M')
+        
+        fig, axes = plt.subplots(2, 2, figsize=(14, 10), sharex=True)
+        
+        axes[0, 0].bar(monthly.index, monthly['count'], width=20, color='#3498db', alpha=0.7)
+        axes[0, 0].set_title('PRs criados por mês', fontsize=12, fontweight='bold')
+        
+        axes[0, 1].plot(monthly.index, monthly['merge_rate'], 'o-', color='#2ecc71', label='Mensal')
+        axes[0, 1].plot(rolling.index, rolling['merge_rate'], color='black', label=f'Móvel ({rolling_days} dias)')
+        axes[0, 1].set_title('Taxa de merge', fontsize=12, fontweight='bold')
+        axes[0, 1].legend()
+        
+        axes[1, 0].plot(monthly.index, monthly['num_reviews_median'], 'o-', label='Mediana')
+        axes[1, 0].plot(rolling.index, rolling['num_reviews_mean'], color='black', label=f'Média móvel ({rolling_days} dias)')
+        axes[1, 0].set_title('Revisões por PR', fontsize=12, fontweight='bold')
+        axes[1, 0].legend()
+        
+        axes[1, 1].plot(monthly.index, monthly['time_to_close_hours_median'], 'o-', color='#e67e22')
+        axes[1, 1].set_title('Mediana do tempo até fechamento (horas)', fontsize=12, fontweight='bold')
+        
+        for ax in axes.flatten():
+            ax.grid(alpha=0.3)
+        fig.autofmt_xdate()
+        plt.suptitle('Tendências ao longo do tempo', fontsize=16, fontweight='bold')
+        plt.tight_layout()
+        plt.savefig(save_path, dpi=300, bbox_inches='tight')
+        print(f"Gráfico salvo: {save_path}")
+        plt.close()
+    
+    def trend_analyzer(self):
+        """TrendAnalyzer do DataFrame já carregado (criado uma vez); None sem created_at."""
+        if self.trends is None and 'created_at' in self.df.columns:
+            from src.TrendAnalyzer import TrendAnalyzer
+            self.trends = TrendAnalyzer.from_dataframe(self.df)
+        return self.trends
+    
+    def export_interactive(self, output_dir='interactive', trends=None, arrow=True):
+        """
+        Exporta os agregados dos gráficos (JSON e, com pyarrow, Arrow) e um dashboard
+        HTML que os desenha no navegador, em vez de PNGs renderizados aqui.
+        """
+        from src.PlotExporter import PlotExporter
+        exporter = PlotExporter(self.df, [column for column in self.COLUMNS if column != 'status'])
+        return exporter.export(output_dir, trends if trends is not None else self.trend_analyzer(), arrow=arrow)
+    
+    def generate_all_plots(self, output_dir='plots', trends=None):
         import os
         os.makedirs(output_dir, exist_ok=True)
         
@@ -83,4 +143,8 @@ class PRVisualizer:
         self.plot_status_distribution(f'{output_dir}/01_status_distribution.png')
         self.plot_size_comparison(f'{output_dir}/02_size_comparison.png')
         self.plot_correlation_heatmap(f'{output_dir}/03_correlation_heatmap.png')
+        if trends is None:
+            trends = self.trend_analyzer()
+        if trends is not None and len(trends.times):
+            self.plot_trends(f'{output_dir}/04_trends.png', trends)
         print("\n=== Visualizações concluídas ===")
\ No newline at end of file
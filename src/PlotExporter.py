@@ -0,0 +1,381 @@
+import json
+import os
+from datetime import datetime
+from string import Template
+
+import numpy as np
+import pandas as pd
+
+from src.ResultCache import json_default
+
+QUANTILES = [0.0, 0.05, 0.1, 0.25, 0.5, 0.75, 0.9, 0.95, 1.0]
+HISTOGRAM_BINS = 40
+GROUPS = ['ALL', 'MERGED', 'CLOSED']
+STATUS_COLORS = {'ALL': '#3498db', 'MERGED': '#2ecc71', 'CLOSED': '#e74c3c'}
+
+
+def _clean(values, digits=6):
+    """Lista JSON compacta: floats com `digits` dígitos significativos, NaN/inf como null."""
+    return [float(f"{value:.{digits}g}") if np.isfinite(value) else None
+            for value in np.asarray(values, dtype=np.float64).ravel()]
+
+
+def log_bin_edges(values, bins=HISTOGRAM_BINS):
+    """Bordas em escala log1p entre 0 e o máximo: métricas de cauda longa não viram uma só barra."""
+    finite = values[np.isfinite(values)]
+    top = max(float(finite.max()), 1.0) if len(finite) else 1.0
+    return np.expm1(np.linspace(0.0, np.log1p(top), bins + 1))
+
+
+def _table(table):
+    """DataFrame indexado por data -> {'index': [...], 'columns': {nome: [...]}}."""
+    return {'index': [stamp.strftime('%Y-%m-%d') for stamp in table.index],
+            'columns': {column: _clean(table[column]) for column in table.columns}}
+
+
+class PlotExporter:
+    """
+    Agregados pré-calculados dos gráficos (quantis, histogramas, matriz de correlação
+    e tendências) em arquivos JSON/Arrow pequenos, mais um dashboard HTML autocontido
+    que desenha os gráficos no navegador a partir deles.
+
+    O tamanho da saída depende do número de bins, quantis, métricas e buckets de
+    tempo, não do número de PRs: os dados brutos nunca são exportados.
+    """
+
+    def __init__(self, df, metrics, bins=HISTOGRAM_BINS, quantiles=QUANTILES):
+        self.metrics = [metric for metric in metrics if metric in df.columns]
+        self.bins = bins
+        self.quantile_levels = list(quantiles)
+        self.values = {metric: df[metric].to_numpy(dtype=np.float64) for metric in self.metrics}
+        status = df['status'].to_numpy()
+        self.masks = {'ALL': np.ones(len(df), dtype=bool),
+                      'MERGED': status == 'MERGED',
+                      'CLOSED': status == 'CLOSED'}
+        # 0 = MERGED, 1 = CLOSED, 2 = outro status (só entra em ALL)
+        self.group_codes = np.where(self.masks['MERGED'], 0, np.where(self.masks['CLOSED'], 1, 2))
+
+    def summary(self):
+        return {'total': int(len(self.group_codes)),
+                'status': {group: int(self.masks[group].sum()) for group in GROUPS[1:]}}
+
+    def quantiles(self):
+        table = {}
+        for metric, values in self.values.items():
+            table[metric] = {}
+            for group, mask in self.masks.items():
+                selected = values[mask]
+                selected = selected[~np.isnan(selected)]
+                table[metric][group] = (_clean(np.quantile(selected, self.quantile_levels))
+                                        if len(selected) else [None] * len(self.quantile_levels))
+        return {'levels': self.quantile_levels, 'metrics': table}
+
+    def histograms(self):
+        """Contagens por bin e grupo em uma única passada de bincount por métrica."""
+        table = {}
+        for metric, values in self.values.items():
+            edges = log_bin_edges(values, self.bins)
+            present = ~np.isnan(values)
+            index = np.clip(np.searchsorted(edges, values[present], side='right') - 1, 0, self.bins - 1)
+            counts = np.bincount(self.group_codes[present] * self.bins + index,
+                                 minlength=3 * self.bins).reshape(3, self.bins)
+            table[metric] = {'edges': _clean(edges),
+                             'counts': {'ALL': counts.sum(axis=0).tolist(),
+                                        'MERGED': counts[0].tolist(),
+                                        'CLOSED': counts[1].tolist()}}
+        return table
+
+    def correlation(self):
+        frame = pd.DataFrame(self.values)
+        return {'metrics': self.metrics,
+                'pearson': [_clean(row) for row in frame.corr(method='pearson').to_numpy()],
+                'spearman': [_clean(row) for row in frame.rank().corr(method='pearson').to_numpy()]}
+
+    def aggregates(self, trends=None, rolling_days=90):
+        data = {'generated': datetime.now().isoformat(timespec='seconds'),
+                'summary': self.summary(),
+                'quantiles': self.quantiles(),
+                'histograms': self.histograms(),
+                'correlation': self.correlation()}
+        if trends is not None and len(trends.times):
+            data['trends'] = {'monthly': _table(trends.bucketed('M')),
+                              'rolling': _table(trends.rolling(rolling_days, 'M')),
+                              'rolling_days': rolling_days}
+        return data
+
+    @staticmethod
+    def write_json(data, output_dir):
+        paths = {}
+        for name, value in data.items():
+            if name == 'generated':
+                continue
+            paths[name] = os.path.join(output_dir, f"{name}.json")
+            with open(paths[name], 'w', encoding='utf-8') as f:
+                json.dump(value, f, separators=(',', ':'), allow_nan=False, default=json_default)
+        return paths
+
+    @staticmethod
+    def _long_tables(data):
+        """Versões em formato longo (uma linha por valor) para leitura por ferramentas Arrow."""
+        levels = data['quantiles']['levels']
+        tables = {
+            'quantiles': pd.DataFrame(
+                [(metric, group, level, value)
+                 for metric, groups in data['quantiles']['metrics'].items()
+                 for group, values in groups.items() for level, value in zip(levels, values)],
+                columns=['metric', 'group', 'quantile', 'value']),
+            'histograms': pd.DataFrame(
+                [(metric, group, hist['edges'][i], hist['edges'][i + 1], count)
+                 for metric, hist in data['histograms'].items()
+                 for group, counts in hist['counts'].items() for i, count in enumerate(counts)],
+                columns=['metric', 'group', 'bin_left', 'bin_right', 'count']),
+            'correlation': pd.DataFrame(
+                [(method, var1, var2, data['correlation'][method][i][j])
+                 for method in ['pearson', 'spearman']
+                 for i, var1 in enumerate(data['correlation']['metrics'])
+                 for j, var2 in enumerate(data['correlation']['metrics'])],
+                columns=['method', 'var1', 'var2', 'value'])
+        }
+        if 'trends' in data:
+            monthly = data['trends']['monthly']
+            tables['trends'] = pd.DataFrame(monthly['columns'],
+                                            index=pd.to_datetime(monthly['index'])).rename_axis('bucket').reset_index()
+        return tables
+
+    @classmethod
+    def write_arrow(cls, data, output_dir):
+        try:
+            import pyarrow.feather as feather
+        except ImportError:
+            print("pyarrow não instalado: exportação Arrow ignorada")
+            return {}
+
+        paths = {}
+        for name, table in cls._long_tables(data).items():
+            paths[name] = os.path.join(output_dir, f"{name}.arrow")
+            # Colunas de texto como dicionário: cada nome de métrica/grupo é gravado uma vez
+            table = table.astype({column: 'category' for column in table.columns
+                                  if table[column].dtype == object})
+            feather.write_feather(table, paths[name])
+        return paths
+
+    @staticmethod
+    def write_dashboard(data, path):
+        # Os dados vão embutidos: o HTML abre direto do disco (file://), sem servidor
+        payload = json.dumps(data, separators=(',', ':'), allow_nan=False, default=json_default)
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(DASHBOARD_TEMPLATE.substitute(data=payload.replace('</', '<\\/'),
+                                                  colors=json.dumps(STATUS_COLORS)))
+        return path
+
+    def export(self, output_dir, trends=None, arrow=True):
+        os.makedirs(output_dir, exist_ok=True)
+        data = self.aggregates(trends)
+        paths = {'json': self.write_json(data, output_dir)}
+        if arrow:
+            paths['arrow'] = self.write_arrow(data, output_dir)
+        paths['dashboard'] = self.write_dashboard(data, os.path.join(output_dir, 'dashboard.html'))
+        size = sum(os.path.getsize(p) for group in paths.values()
+                   for p in (group.values() if isinstance(group, dict) else [group]))
+        print(f"Exportação interativa salva em {output_dir} ({size / 1024:.1f} KB)")
+        return paths
+
+
+# Sem bibliotecas externas: SVG gerado por JavaScript puro a partir do JSON embutido
+DASHBOARD_TEMPLATE = Template("""<!DOCTYPE html>
+<html lang="pt-BR">
+<head>
+<meta charset="utf-8">
+<title>LAB03 - Dashboard de Code Review</title>
+<style>
+body { font-family: sans-serif; max-width: 1100px; margin: 2em auto; color: #222; }
+section { margin-bottom: 2em; }
+label { margin-right: 1em; }
+svg { background: #fff; border: 1px solid #ddd; }
+svg text { font-size: 11px; }
+.muted { color: #777; }
+</style>
+</head>
+<body>
+<h1>LAB03 - Code Review no GitHub</h1>
+<p id="summary" class="muted"></p>
+
+<section>
+<h2>Distribuição por métrica</h2>
+<label>Métrica <select id="metric"></select></label>
+<label><input type="checkbox" id="normalize" checked> Proporção por status</label>
+<div><svg id="histogram" width="1000" height="320"></svg></div>
+<div><svg id="boxplot" width="1000" height="160"></svg></div>
+</section>
+
+<section>
+<h2>Matriz de correlação</h2>
+<label>Método <select id="method"><option value="spearman">Spearman</option><option value="pearson">Pearson</option></select></label>
+<div><svg id="heatmap" width="760" height="620"></svg></div>
+</section>
+
+<section id="trends-section">
+<h2>Tendências mensais</h2>
+<label>Série <select id="series"></select></label>
+<div><svg id="trends" width="1000" height="320"></svg></div>
+</section>
+
+<script id="data" type="application/json">$data</script>
+<script>
+var DATA = JSON.parse(document.getElementById('data').textContent);
+var COLORS = $colors;
+var NS = 'http://www.w3.org/2000/svg';
+
+function el(parent, name, attrs, text) {
+  var node = document.createElementNS(NS, name);
+  for (var key in attrs) node.setAttribute(key, attrs[key]);
+  if (text !== undefined) node.textContent = text;
+  parent.appendChild(node);
+  return node;
+}
+function option(select, value) {
+  var node = document.createElement('option');
+  node.value = node.textContent = value;
+  select.appendChild(node);
+}
+function clear(svg) { while (svg.firstChild) svg.removeChild(svg.firstChild); return svg; }
+function fmt(v) {
+  if (v === null) return '-';
+  var a = Math.abs(v);
+  return a >= 1000 ? v.toExponential(1) : a >= 10 ? v.toFixed(0) : v.toFixed(2);
+}
+function linear(d0, d1, r0, r1) { return function (v) { return r0 + (v - d0) / ((d1 - d0) || 1) * (r1 - r0); }; }
+
+var s = DATA.summary;
+document.getElementById('summary').textContent = s.total + ' PRs (MERGED: ' + s.status.MERGED +
+  ', CLOSED: ' + s.status.CLOSED + ') - gerado em ' + DATA.generated;
+
+function drawHistogram(metric, normalize) {
+  var svg = clear(document.getElementById('histogram'));
+  var hist = DATA.histograms[metric], bins = hist.edges.length - 1;
+  var groups = ['MERGED', 'CLOSED'], series = {}, top = 0;
+  groups.forEach(function (g) {
+    var counts = hist.counts[g], total = counts.reduce(function (a, b) { return a + b; }, 0) || 1;
+    series[g] = counts.map(function (c) { return normalize ? c / total : c; });
+    top = Math.max(top, Math.max.apply(null, series[g]));
+  });
+  var x = linear(0, bins, 60, 980), y = linear(0, top, 290, 20), w = (x(1) - x(0)) / 2;
+  groups.forEach(function (g, k) {
+    series[g].forEach(function (v, i) {
+      var bar = el(svg, 'rect', {x: x(i) + k * w, y: y(v), width: w - 1, height: 290 - y(v), fill: COLORS[g], opacity: 0.75});
+      el(bar, 'title', {}, g + ' [' + fmt(hist.edges[i]) + ', ' + fmt(hist.edges[i + 1]) + '): ' + hist.counts[g][i]);
+    });
+    el(svg, 'text', {x: 800 + k * 90, y: 14, fill: COLORS[g]}, '\\u25A0 ' + g);
+  });
+  for (var i = 0; i <= bins; i += Math.ceil(bins / 10)) {
+    el(svg, 'text', {x: x(i), y: 306, 'text-anchor': 'middle'}, fmt(hist.edges[i]));
+  }
+  for (var t = 0; t <= 4; t++) {
+    var v = top * t / 4;
+    el(svg, 'text', {x: 55, y: y(v) + 4, 'text-anchor': 'end'}, normalize ? (100 * v).toFixed(1) + '%' : fmt(v));
+  }
+  el(svg, 'text', {x: 520, y: 318, 'text-anchor': 'middle', class: 'muted'}, metric + ' (bins em escala log)');
+}
+
+function drawBoxplot(metric) {
+  var svg = clear(document.getElementById('boxplot'));
+  var q = DATA.quantiles, levels = q.levels, groups = ['ALL', 'MERGED', 'CLOSED'];
+  function at(g, level) { return q.metrics[metric][g][levels.indexOf(level)]; }
+  var top = Math.max.apply(null, groups.map(function (g) { return at(g, 0.95) || 0; }));
+  var x = linear(Math.log1p(0), Math.log1p(top), 110, 980);
+  function px(v) { return x(Math.log1p(Math.max(v, 0))); }
+  groups.forEach(function (g, k) {
+    var cy = 30 + k * 42;
+    if (at(g, 0.5) === null) return;
+    el(svg, 'text', {x: 100, y: cy + 4, 'text-anchor': 'end'}, g);
+    el(svg, 'line', {x1: px(at(g, 0.05)), x2: px(at(g, 0.95)), y1: cy, y2: cy, stroke: '#555'});
+    el(svg, 'rect', {x: px(at(g, 0.25)), y: cy - 12, width: Math.max(px(at(g, 0.75)) - px(at(g, 0.25)), 1),
+                     height: 24, fill: COLORS[g], opacity: 0.6, stroke: '#333'});
+    el(svg, 'line', {x1: px(at(g, 0.5)), x2: px(at(g, 0.5)), y1: cy - 12, y2: cy + 12, stroke: '#000', 'stroke-width': 2});
+    el(svg, 'text', {x: px(at(g, 0.5)), y: cy - 15, 'text-anchor': 'middle'}, 'mediana ' + fmt(at(g, 0.5)));
+  });
+  el(svg, 'text', {x: 540, y: 154, 'text-anchor': 'middle', class: 'muted'},
+     'caixa: p25-p75, linha: p5-p95 (escala log)');
+}
+
+function color(v) {
+  if (v === null) return '#eee';
+  var r = v > 0 ? 255 : Math.round(255 * (1 + v)), b = v < 0 ? 255 : Math.round(255 * (1 - v));
+  var g = Math.round(255 * (1 - Math.abs(v)));
+  return 'rgb(' + r + ',' + g + ',' + b + ')';
+}
+
+function drawHeatmap(method) {
+  var svg = clear(document.getElementById('heatmap'));
+  var names = DATA.correlation.metrics, m = DATA.correlation[method], n = names.length;
+  var size = Math.min(60, 560 / n), left = 170, top = 10;
+  names.forEach(function (name, i) {
+    el(svg, 'text', {x: left - 6, y: top + i * size + size / 2 + 4, 'text-anchor': 'end'}, name);
+    el(svg, 'text', {x: 0, y: 0, 'text-anchor': 'end',
+                     transform: 'translate(' + (left + i * size + size / 2) + ',' + (top + n * size + 8) + ') rotate(-40)'}, name);
+    names.forEach(function (_, j) {
+      var v = m[i][j];
+      el(svg, 'rect', {x: left + j * size, y: top + i * size, width: size - 1, height: size - 1, fill: color(v)});
+      el(svg, 'text', {x: left + j * size + size / 2, y: top + i * size + size / 2 + 4, 'text-anchor': 'middle'},
+         v === null ? '' : v.toFixed(2));
+    });
+  });
+}
+
+function drawTrends(name) {
+  var svg = clear(document.getElementById('trends'));
+  var monthly = DATA.trends.monthly, rolling = DATA.trends.rolling;
+  var values = monthly.columns[name], n = values.length;
+  var rollingValues = rolling.columns[name] || null;
+  var all = values.concat(rollingValues || []).filter(function (v) { return v !== null; });
+  var lo = Math.min.apply(null, all.concat([0])), hi = Math.max.apply(null, all);
+  var x = linear(0, Math.max(n - 1, 1), 60, 980), y = linear(lo, hi, 290, 20);
+  function path(series, shift) {
+    var d = '', pen = 'M';
+    series.forEach(function (v, i) {
+      if (v === null) { pen = 'M'; return; }
+      d += pen + x(i + shift).toFixed(1) + ',' + y(v).toFixed(1) + ' '; pen = 'L';
+    });
+    return d;
+  }
+  el(svg, 'path', {d: path(values, 0), fill: 'none', stroke: COLORS.ALL, 'stroke-width': 2});
+  if (rollingValues) {
+    // A janela móvel termina no fim de cada mês: alinhada ao bucket do próprio mês
+    el(svg, 'path', {d: path(rollingValues, 0), fill: 'none', stroke: '#000', 'stroke-dasharray': '4 3'});
+    el(svg, 'text', {x: 760, y: 14}, '- - média móvel (' + DATA.trends.rolling_days + ' dias)');
+  }
+  for (var i = 0; i < n; i += Math.ceil(n / 12)) {
+    el(svg, 'text', {x: x(i), y: 306, 'text-anchor': 'middle'}, monthly.index[i].slice(0, 7));
+  }
+  for (var t = 0; t <= 4; t++) {
+    var v = lo + (hi - lo) * t / 4;
+    el(svg, 'text', {x: 55, y: y(v) + 4, 'text-anchor': 'end'}, fmt(v));
+  }
+}
+
+var metricSelect = document.getElementById('metric');
+Object.keys(DATA.histograms).forEach(function (name) { option(metricSelect, name); });
+function updateMetric() {
+  drawHistogram(metricSelect.value, document.getElementById('normalize').checked);
+  drawBoxplot(metricSelect.value);
+}
+metricSelect.onchange = updateMetric;
+document.getElementById('normalize').onchange = updateMetric;
+updateMetric();
+
+var methodSelect = document.getElementById('method');
+methodSelect.onchange = function () { drawHeatmap(methodSelect.value); };
+drawHeatmap(methodSelect.value);
+
+if (DATA.trends) {
+  var seriesSelect = document.getElementById('series');
+  Object.keys(DATA.trends.monthly.columns).forEach(function (name) { option(seriesSelect, name); });
+  seriesSelect.onchange = function () { drawTrends(seriesSelect.value); };
+  drawTrends(seriesSelect.value);
+} else {
+  document.getElementById('trends-section').style.display = 'none';
+}
+</script>
+</body>
+</html>
+""")
@@ -0,0 +1,347 @@
+import html
+import json
+from datetime import datetime
+from string import Template
+
+from src.PRAnalyzer import RQ_PAIRS, iter_correlations
+from src.ResultCache import json_default
+
+METRIC_LABELS = {
+    'files_changed': 'Arquivos Alterados',
+    'additions': 'Linhas Adicionadas',
+    'deletions': 'Linhas Removidas',
+    'total_lines_changed': 'Total de Linhas',
+    'time_to_close_hours': 'Tempo (horas)',
+    'body_length': 'Descrição (caracteres)',
+    'num_participants': 'Participantes',
+    'num_comments': 'Comentários',
+    'num_reviews': 'Revisões'
+}
+
+PLOTS = [
+    "01_status_distribution.png - Distribuição de Status",
+    "02_size_comparison.png - RQ01: Tamanho vs Status",
+    "03_time_analysis.png - RQ02: Tempo vs Status",
+    "04_description_analysis.png - RQ03: Descrição vs Status",
+    "05_interactions_analysis.png - RQ04: Interações vs Status",
+    "06_reviews_vs_size.png - RQ05: Tamanho vs Revisões",
+    "07_reviews_vs_time.png - RQ06: Tempo vs Revisões",
+    "08_reviews_vs_description.png - RQ07: Descrição vs Revisões",
+    "09_reviews_vs_interactions.png - RQ08: Interações vs Revisões",
+    "10_correlation_heatmap.png - Matriz de Correlação"
+]
+
+RQS = list(dict.fromkeys(rq for rq, _, _, _ in RQ_PAIRS))
+
+MARKDOWN_TEMPLATE = Template("""# Relatório Final - LAB03
+## Caracterizando a atividade de code review no GitHub
+
+**Data:** $date
+
+---
+
+## 1. Visão Geral do Dataset
+
+- **Total de PRs analisados:** $total
+- **PRs MERGED:** $merged ($merged_pct%)
+- **PRs CLOSED:** $closed ($closed_pct%)
+
+### Medianas das Métricas
+
+| Métrica | Geral | MERGED | CLOSED |
+|---------|-------|--------|--------|
+$median_rows
+---
+
+## 2. Resultados das Questões de Pesquisa
+
+$rq_sections
+### Mann-Whitney: MERGED vs CLOSED
+
+| Métrica | U | Rank-biserial | p-value | p-value (Holm) | p-value (BH) |
+|---------|---|---------------|---------|----------------|--------------|
+$mann_whitney_rows
+$model_section---
+
+## 3. Visualizações
+
+As visualizações geradas encontram-se no diretório:
+```
+$plots_dir
+```
+
+Lista de gráficos:
+$plot_rows
+---
+
+## 4. Conclusão
+
+Este relatório apresenta os resultados da análise de code review em repositórios populares do GitHub. Os dados coletados e analisados fornecem insights importantes sobre os fatores que influenciam o merge de Pull Requests e o número de revisões necessárias.
+
+Para uma análise completa e discussão detalhada dos resultados, consulte o template de relatório fornecido.
+
+""")
+
+TEXT_TEMPLATE = Template("""$rule
+RELATÓRIO DE ANÁLISE ESTATÍSTICA
+$rule
+
+Total de PRs: $total
+MERGED: $merged
+CLOSED: $closed
+
+$rq_sections$mann_whitney_section$model_section""")
+
+HTML_TEMPLATE = Template("""<!DOCTYPE html>
+<html lang="pt-BR">
+<head>
+<meta charset="utf-8">
+<title>Relatório Final - LAB03</title>
+<style>
+body { font-family: sans-serif; max-width: 960px; margin: 2em auto; }
+table { border-collapse: collapse; margin-bottom: 1.5em; }
+th, td { border: 1px solid #ccc; padding: 4px 10px; text-align: right; }
+th:first-child, td:first-child { text-align: left; }
+</style>
+</head>
+<body>
+<h1>Relatório Final - LAB03</h1>
+<p><strong>Data:</strong> $date</p>
+<h2>1. Visão Geral do Dataset</h2>
+<ul>
+<li>Total de PRs analisados: $total</li>
+<li>PRs MERGED: $merged ($merged_pct%)</li>
+<li>PRs CLOSED: $closed ($closed_pct%)</li>
+</ul>
+<table>
+<tr><th>Métrica</th><th>Geral</th><th>MERGED</th><th>CLOSED</th></tr>
+$median_rows
+</table>
+<h2>2. Resultados das Questões de Pesquisa</h2>
+<table>
+<tr><th>RQ</th><th>Métrica</th><th>Correlação (ρ)</th><th>p-value</th><th>p-value (Holm)</th><th>p-value (BH)</th><th>Significante</th></tr>
+$rq_rows
+</table>
+<h3>Mann-Whitney: MERGED vs CLOSED</h3>
+<table>
+<tr><th>Métrica</th><th>U</th><th>Rank-biserial</th><th>p-value</th><th>p-value (Holm)</th><th>p-value (BH)</th></tr>
+$mann_whitney_rows
+</table>
+$model_section
+</body>
+</html>
+""")
+
+
+class ReportGenerator:
+    """
+    Gera os relatórios (Markdown, texto, JSON e HTML) a partir de resultados já
+    calculados e de uma tabela de medianas obtida em uma única passada de groupby.
+    """
+
+    FORMATS = {'md': 'render_markdown', 'txt': 'render_text',
+               'json': 'render_json', 'html': 'render_html'}
+
+    def __init__(self, results, counts, medians=None, plots_dir=''):
+        self.results = results
+        self.counts = counts
+        self.medians = medians
+        self.plots_dir = plots_dir
+
+    @classmethod
+    def from_dataframe(cls, df, results, plots_dir=''):
+        columns = [column for column in METRIC_LABELS if column in df.columns]
+        grouped = df.groupby('status', observed=True)[columns]
+        medians = grouped.median().T
+        medians['Geral'] = df[columns].median()
+        counts = grouped.size()
+        counts = {'total': len(df),
+                  'MERGED': int(counts.get('MERGED', 0)),
+                  'CLOSED': int(counts.get('CLOSED', 0))}
+        return cls(results, counts, medians, plots_dir)
+
+    def _overview(self):
+        total = self.counts['total'] or 1
+        return {
+            'date': datetime.now().strftime('%d/%m/%Y'),
+            'total': self.counts['total'],
+            'merged': self.counts['MERGED'],
+            'closed': self.counts['CLOSED'],
+            'merged_pct': f"{self.counts['MERGED'] / total * 100:.1f}",
+            'closed_pct': f"{self.counts['CLOSED'] / total * 100:.1f}"
+        }
+
+    def _median_rows(self):
+        for column, label in METRIC_LABELS.items():
+            if self.medians is not None and column in self.medians.index:
+                row = self.medians.loc[column]
+                yield label, *(row.get(column, float('nan')) for column in ('Geral', 'MERGED', 'CLOSED'))
+
+    def _correlation_rows(self):
+        for rq, key, corr in iter_correlations(self.results):
+            yield rq, key or next(var1 for r, _, var1, _ in RQ_PAIRS if r == rq), corr
+
+    def _model(self):
+        model = self.results.get('model')
+        return model if model and 'auc_mean' in model else None
+
+    def _model_rows(self):
+        # Features em ordem decrescente de importância por permutação
+        model = self._model()
+        importance = model['permutation_importance']
+        for feature in sorted(importance, key=importance.get, reverse=True):
+            yield METRIC_LABELS.get(feature, feature), model['coefficients'][feature], importance[feature]
+
+    @staticmethod
+    def _significant(test, yes='Sim ✓', no='Não ✗'):
+        return yes if test['significant'] else no
+
+    def render_markdown(self):
+        rq_sections = []
+        rows_by_rq = {}
+        for rq, var, corr in self._correlation_rows():
+            rows_by_rq.setdefault(rq, []).append(
+                f"| {var} | {corr['correlation']:.4f} | {corr['p_value']:.6f} | "
+                f"{corr.get('p_value_holm', float('nan')):.6f} | "
+                f"{corr.get('p_value_bh', float('nan')):.6f} | {self._significant(corr)} |")
+        for rq, rows in rows_by_rq.items():
+            rq_sections.append(
+                f"### {rq}\n\n"
+                "| Métrica | Correlação (ρ) | p-value | p-value (Holm) | p-value (BH) | Significante |\n"
+                "|---------|---------------|---------|----------------|--------------|-------------|\n"
+                + "\n".join(rows) + "\n\n")
+
+        return MARKDOWN_TEMPLATE.substitute(
+            self._overview(),
+            median_rows="".join(f"| {label} | {overall:.1f} | {merged:.1f} | {closed:.1f} |\n"
+                                for label, overall, merged, closed in self._median_rows()),
+            rq_sections="".join(rq_sections),
+            mann_whitney_rows="".join(
+                f"| {metric} | {test['U']:.1f} | {test['rank_biserial']:.4f} | "
+                f"{test['p_value']:.6f} | {test['p_value_holm']:.6f} | {test['p_value_bh']:.6f} |\n"
+                for metric, test in self.results.get('MannWhitney', {}).items()),
+            model_section=self._model_markdown(),
+            plots_dir=self.plots_dir,
+            plot_rows="".join(f"- `{plot}`\n" for plot in PLOTS)
+        )
+
+    def _model_markdown(self):
+        model = self._model()
+        if model is None:
+            return ""
+        return (f"\n### Modelo preditivo de merge\n\n"
+                f"{model['method']}, validação cruzada {model['folds']}-fold com "
+                f"{model['num_prs']} PRs (taxa de merge {model['merge_rate'] * 100:.1f}%).\n\n"
+                f"- **AUC:** {model['auc_mean']:.4f} ± {model['auc_std']:.4f}\n"
+                f"- **Log-loss:** {model['log_loss']:.4f}\n"
+                f"- **Acurácia:** {model['accuracy']:.4f}\n\n"
+                "| Feature | Coeficiente padronizado | Importância (queda de AUC) |\n"
+                "|---------|-------------------------|----------------------------|\n"
+                + "".join(f"| {label} | {coef:.4f} | {drop:.4f} |\n"
+                          for label, coef, drop in self._model_rows()) + "\n")
+
+    @staticmethod
+    def _text_block(corr, indent):
+        return (f"{indent}Correlação: {corr['correlation']:.4f}\n"
+                f"{indent}P-value: {corr['p_value']:.6f}\n"
+                f"{indent}P-value ajustado (Holm / BH): "
+                f"{corr.get('p_value_holm', float('nan')):.6f} / "
+                f"{corr.get('p_value_bh', float('nan')):.6f}\n"
+                f"{indent}Significante: {'Sim' if corr['significant'] else 'Não'}\n")
+
+    def render_text(self):
+        sections = []
+        for rq in RQS:
+            section = f"\n{rq}\n" + "-" * 80 + "\n"
+            result = self.results.get(rq, {})
+            if 'correlations' in result:
+                for var, corr in result['correlations'].items():
+                    section += f"\n{var}:\n" + self._text_block(corr, "  ")
+            elif 'correlation' in result:
+                section += self._text_block(result['correlation'], "  ")
+            sections.append(section)
+
+        mann_whitney = ""
+        if 'MannWhitney' in self.results:
+            mann_whitney = "\n\nMANN-WHITNEY: MERGED vs CLOSED\n" + "-" * 80 + "\n"
+            for metric, test in self.results['MannWhitney'].items():
+                mann_whitney += (f"\n{metric}:\n"
+                                 f"  U: {test['U']:.1f}\n"
+                                 f"  Rank-biserial: {test['rank_biserial']:.4f}\n"
+                                 f"  P-value: {test['p_value']:.6f}\n"
+                                 f"  P-value ajustado (Holm / BH): "
+                                 f"{test['p_value_holm']:.6f} / {test['p_value_bh']:.6f}\n")
+
+        model_section = ""
+        model = self._model()
+        if model is not None:
+            model_section = (f"\n\nMODELO PREDITIVO DE MERGE\n" + "-" * 80 + "\n"
+                             f"\n{model['method']} - {model['folds']} folds, {model['num_prs']} PRs\n"
+                             f"  AUC: {model['auc_mean']:.4f} (± {model['auc_std']:.4f})\n"
+                             f"  Log-loss: {model['log_loss']:.4f}\n"
+                             f"  Acurácia: {model['accuracy']:.4f}\n")
+            for label, coef, drop in self._model_rows():
+                model_section += f"\n{label}:\n  Coeficiente: {coef:.4f}\n  Importância: {drop:.4f}\n"
+
+        return TEXT_TEMPLATE.substitute(
+            rule="=" * 80,
+            total=self.counts['total'],
+            merged=self.counts['MERGED'],
+            closed=self.counts['CLOSED'],
+            rq_sections="".join(sections),
+            mann_whitney_section=mann_whitney,
+            model_section=model_section
+        )
+
+    def render_json(self):
+        medians = self.medians.to_dict(orient='index') if self.medians is not None else None
+        return json.dumps({'counts': self.counts, 'medians': medians, 'results': self.results},
+                          indent=2, ensure_ascii=False, default=json_default)
+
+    def render_html(self):
+        overview = self._overview()
+        overview['date'] = html.escape(overview['date'])
+        return HTML_TEMPLATE.substitute(
+            overview,
+            median_rows="\n".join(
+                f"<tr><td>{html.escape(label)}</td><td>{overall:.1f}</td>"
+                f"<td>{merged:.1f}</td><td>{closed:.1f}</td></tr>"
+                for label, overall, merged, closed in self._median_rows()),
+            rq_rows="\n".join(
+                f"<tr><td>{rq}</td><td>{html.escape(var)}</td><td>{corr['correlation']:.4f}</td>"
+                f"<td>{corr['p_value']:.6f}</td><td>{corr.get('p_value_holm', float('nan')):.6f}</td>"
+                f"<td>{corr.get('p_value_bh', float('nan')):.6f}</td>"
+                f"<td>{self._significant(corr, 'Sim', 'Não')}</td></tr>"
+                for rq, var, corr in self._correlation_rows()),
+            mann_whitney_rows="\n".join(
+                f"<tr><td>{html.escape(metric)}</td><td>{test['U']:.1f}</td>"
+                f"<td>{test['rank_biserial']:.4f}</td><td>{test['p_value']:.6f}</td>"
+                f"<td>{test['p_value_holm']:.6f}</td><td>{test['p_value_bh']:.6f}</td></tr>"
+                for metric, test in self.results.get('MannWhitney', {}).items()),
+            model_section=self._model_html()
+        )
+
+    def _model_html(self):
+        model = self._model()
+        if model is None:
+            return ""
+        rows = "\n".join(f"<tr><td>{html.escape(label)}</td><td>{coef:.4f}</td><td>{drop:.4f}</td></tr>"
+                         for label, coef, drop in self._model_rows())
+        return (f"<h3>Modelo preditivo de merge</h3>\n"
+                f"<p>{html.escape(model['method'])}, {model['folds']} folds, {model['num_prs']} PRs: "
+                f"AUC {model['auc_mean']:.4f} (± {model['auc_std']:.4f}), "
+                f"log-loss {model['log_loss']:.4f}, acurácia {model['accuracy']:.4f}</p>\n"
+                "<table>\n<tr><th>Feature</th><th>Coeficiente padronizado</th>"
+                f"<th>Importância (queda de AUC)</th></tr>\n{rows}\n</table>")
+
+    def render(self, fmt):
+        return getattr(self, self.FORMATS[fmt])()
+
+    def write(self, output_file, fmt=None):
+        fmt = fmt or output_file.rsplit('.', 1)[-1]
+        with open(output_file, 'w', encoding='utf-8') as f:
+            f.write(self.render(fmt))
+        return output_file
+
+    def write_all(self, base_path, formats=('md', 'txt', 'json', 'html')):
+        return {fmt: self.write(f"{base_path}.{fmt}", fmt) for fmt in formats}
@@ -0,0 +1,144 @@
+import glob
+import hashlib
+import inspect
+import json
+import os
+import shutil
+from importlib import metadata
+
+CACHE_VERSION = 2
+
+# Os resultados dependem de todos os módulos de src/ (loader, features, relatório...)
+SOURCE_DIR = os.path.dirname(os.path.abspath(__file__))
+LIBRARIES = ['numpy', 'pandas', 'scipy', 'matplotlib', 'seaborn', 'pyarrow']
+
+
+def json_default(value):
+    # Escalares numpy (np.bool_, np.float64...) nos resultados das análises
+    if hasattr(value, 'item'):
+        return value.item()
+    if hasattr(value, 'to_dict'):
+        return value.to_dict()
+    raise TypeError(f"Tipo não serializável: {type(value).__name__}")
+
+
+class ResultCache:
+    """
+    Cache de resultados e artefatos das etapas do pipeline, indexado pelo hash do
+    conteúdo do dataset, pelo esquema (cabeçalho), pelos parâmetros, pelo código de
+    todos os módulos de src/ (mais o de objetos extras passados em code) e pelas
+    versões das bibliotecas. Qualquer mudança nesses itens gera uma nova chave.
+    """
+
+    def __init__(self, cache_dir):
+        self.cache_dir = cache_dir
+        self.index_file = os.path.join(cache_dir, 'fingerprints.json')
+        os.makedirs(cache_dir, exist_ok=True)
+
+        if os.path.exists(self.index_file):
+            with open(self.index_file, encoding='utf-8') as f:
+                self.fingerprints = json.load(f)
+        else:
+            self.fingerprints = {}
+        self._environment = None
+
+    def dataset_hash(self, dataset_file):
+        # O hash completo só é recalculado quando tamanho ou mtime mudam
+        stat = os.stat(dataset_file)
+        path = os.path.abspath(dataset_file)
+        known = self.fingerprints.get(path)
+        if known and known['size'] == stat.st_size and known['mtime_ns'] == stat.st_mtime_ns:
+            return known['sha256']
+
+        digest = hashlib.sha256()
+        with open(dataset_file, 'rb') as f:
+            for chunk in iter(lambda: f.read(1 << 20), b''):
+                digest.update(chunk)
+
+        self.fingerprints[path] = {
+            'size': stat.st_size,
+            'mtime_ns': stat.st_mtime_ns,
+            'sha256': digest.hexdigest()
+        }
+        with open(self.index_file, 'w', encoding='utf-8') as f:
+            json.dump(self.fingerprints, f, indent=2)
+        return digest.hexdigest()
+
+    @staticmethod
+    def code_version(*objects):
+        digest = hashlib.sha256()
+        for obj in objects:
+            with open(inspect.getsourcefile(obj), 'rb') as f:
+                digest.update(f.read())
+        return digest.hexdigest()
+
+    @staticmethod
+    def source_version(source_dir=SOURCE_DIR):
+        digest = hashlib.sha256()
+        for path in sorted(glob.glob(os.path.join(source_dir, '**', '*.py'), recursive=True)):
+            digest.update(os.path.relpath(path, source_dir).encode())
+            with open(path, 'rb') as f:
+                digest.update(f.read())
+        return digest.hexdigest()
+
+    @staticmethod
+    def library_versions(libraries=LIBRARIES):
+        versions = {}
+        for library in libraries:
+            try:
+                versions[library] = metadata.version(library)
+            except metadata.PackageNotFoundError:
+                versions[library] = None
+        return versions
+
+    def environment(self):
+        # Calculado uma vez por execução: o código não muda entre as etapas
+        if self._environment is None:
+            self._environment = {'source': self.source_version(),
+                                 'libraries': self.library_versions()}
+        return self._environment
+
+    @staticmethod
+    def dataset_schema(dataset_file):
+        with open(dataset_file, encoding='utf-8') as f:
+            return f.readline().strip()
+
+    def key(self, stage, dataset_file, params, code=()):
+        payload = json.dumps({
+            'cache_version': CACHE_VERSION,
+            'stage': stage,
+            'dataset': self.dataset_hash(dataset_file),
+            'schema': self.dataset_schema(dataset_file),
+            'params': params,
+            'code': self.code_version(*code),
+            'environment': self.environment()
+        }, sort_keys=True, default=json_default)
+        return f"{stage}_{hashlib.sha256(payload.encode()).hexdigest()[:24]}"
+
+    def get(self, key):
+        manifest_file = os.path.join(self.cache_dir, key, 'manifest.json')
+        if not os.path.exists(manifest_file):
+            return None
+        with open(manifest_file, encoding='utf-8') as f:
+            return json.load(f)
+
+    def put(self, key, results=None, artifacts=None):
+        """artifacts mapeia um nome lógico (estável entre execuções) -> caminho do arquivo."""
+        entry_dir = os.path.join(self.cache_dir, key)
+        os.makedirs(entry_dir, exist_ok=True)
+
+        names = sorted(artifacts or {})
+        for name in names:
+            shutil.copy2(artifacts[name], os.path.join(entry_dir, name))
+
+        # O manifesto é escrito por último: entradas incompletas nunca são lidas
+        manifest_file = os.path.join(entry_dir, 'manifest.json')
+        with open(manifest_file + '.tmp', 'w', encoding='utf-8') as f:
+            json.dump({'results': results, 'artifacts': names}, f, default=json_default)
+        os.replace(manifest_file + '.tmp', manifest_file)
+
+    def restore(self, key, entry, destinations):
+        """Copia os artefatos do cache; destinations mapeia nome lógico -> caminho de destino."""
+        for name in entry['artifacts']:
+            if name in destinations:
+                shutil.copy2(os.path.join(self.cache_dir, key, name), destinations[name])
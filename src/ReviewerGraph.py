@@ -0,0 +1,257 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+from src.PRAnalyzer import GROUP_KEYS
+
+INTERACTION_DTYPES = {'repo_owner': 'category', 'repo_name': 'category', 'kind': 'category',
+                      'pr_number': np.int64, 'interactions': np.int32}
+
+
+def segment_starts(sorted_codes, num_segments):
+    """Início de cada segmento em um array de códigos ordenado (segmentos vazios incluídos)."""
+    return np.searchsorted(sorted_codes, np.arange(num_segments + 1), side='left')
+
+
+class ReviewerGraph:
+    """
+    Grafo de interação autor -> revisor/comentarista por repositório.
+
+    Cada nó é um par (repositório, usuário), de modo que os repositórios formam
+    componentes disjuntos de uma única matriz de adjacência esparsa em formato CSR
+    (indptr, indices, weights), com peso = número de PRs em que o participante
+    interagiu com o autor (de qualquer tipo) e pesos por tipo em review_weights e
+    comment_weights. Os nós são ordenados por repositório, então métricas por
+    repositório são reduções sobre segmentos contíguos (bincount/reduceat), sem laços
+    em Python: a construção é O(E log E) e cada iteração do PageRank é O(E).
+    """
+
+    def __init__(self, interactions_path, kinds=None):
+        edges = pd.read_csv(interactions_path, dtype=INTERACTION_DTYPES,
+                            keep_default_na=False, na_values=[''])
+        self._build(edges, kinds)
+
+    @classmethod
+    def from_dataframe(cls, edges, kinds=None):
+        graph = cls.__new__(cls)
+        graph._build(edges, kinds)
+        return graph
+
+    def _build(self, edges, kinds):
+        if kinds is not None:
+            edges = edges[edges['kind'].isin(list(kinds))]
+        edges = edges.dropna(subset=['author', 'participant'])
+        self.results = {}
+
+        repo_codes = edges.groupby(GROUP_KEYS, observed=True, sort=False).ngroup().to_numpy()
+        _, first = np.unique(repo_codes, return_index=True)
+        self.repo_keys = pd.DataFrame({key: edges[key].to_numpy()[first].astype(str) for key in GROUP_KEYS})
+        self.num_repos = len(first)
+
+        logins = np.concatenate([edges['author'].to_numpy(dtype=object),
+                                 edges['participant'].to_numpy(dtype=object)])
+        user_codes, self.users = pd.factorize(logins)
+        num_users = max(len(self.users), 1)
+
+        # Nó = (repositório, usuário); np.unique ordena as chaves, agrupando os nós por repositório
+        repo_codes = repo_codes.astype(np.int64)
+        keys = np.concatenate([repo_codes, repo_codes]) * num_users + user_codes
+        node_keys, inverse = np.unique(keys, return_inverse=True)
+        num_edges = len(edges)
+        self.num_nodes = len(node_keys)
+        self.node_repo = node_keys // num_users
+        self.node_user = node_keys % num_users
+        self.repo_start = segment_starts(self.node_repo, self.num_repos)
+
+        # Arestas por PR (para as métricas de PR) e arestas agregadas por par (CSR)
+        self.edge_src = inverse[:num_edges]
+        self.edge_dst = inverse[num_edges:]
+        self.edge_repo = repo_codes
+        self.edge_pr = edges['pr_number'].to_numpy(dtype=np.int64)
+        self.edge_review = (edges['kind'] == 'review').to_numpy()
+        edge_comment = (edges['kind'] == 'comment').to_numpy()
+
+        # Cada linha é um tipo de interação em um PR; o peso total conta o PR uma vez só
+        pair_ids = self.edge_src * self.num_nodes + self.edge_dst
+        first = ~pd.DataFrame({'pair': pair_ids, 'pr': self.edge_pr}).duplicated().to_numpy()
+        pairs, pair_index = np.unique(pair_ids, return_inverse=True)
+        rows = pairs // self.num_nodes
+        self.indices = pairs % self.num_nodes
+        self.weights = np.bincount(pair_index, weights=first, minlength=len(pairs))
+        self.review_weights = np.bincount(pair_index, weights=self.edge_review, minlength=len(pairs))
+        self.comment_weights = np.bincount(pair_index, weights=edge_comment, minlength=len(pairs))
+        self.indptr = np.concatenate(([0], np.cumsum(np.bincount(rows, minlength=self.num_nodes))))
+        self._rows = rows
+        self._pairs = pairs
+
+        print(f"Grafo de revisão: {self.num_repos} repositórios, {self.num_nodes} participantes, "
+              f"{len(pairs)} pares autor-participante ({num_edges} interações)")
+
+    def _repo_sum(self, values):
+        return np.bincount(self.node_repo, weights=values, minlength=self.num_repos)
+
+    def pagerank(self, alpha=0.85, tol=1e-6, max_iter=100):
+        """
+        PageRank ponderado de cada nó dentro do seu repositório (soma 1 por repositório):
+        a importância flui do autor para quem revisa/comenta seus PRs. Teleporte e massa
+        de nós sem arestas de saída são redistribuídos só entre os nós do mesmo repositório.
+        Para quando a variação L1 média por repositório fica abaixo de tol.
+        """
+        if not self.num_nodes:
+            return np.zeros(0)
+        inverse_size = 1.0 / np.diff(self.repo_start)[self.node_repo]
+        out_weight = np.bincount(self._rows, weights=self.weights, minlength=self.num_nodes)
+        edge_share = alpha * self.weights / out_weight[self._rows]
+        dangling = np.flatnonzero(out_weight == 0)
+        dangling_repo = self.node_repo[dangling]
+        teleport = (1 - alpha) * inverse_size
+
+        rank = inverse_size.copy()
+        for _ in range(max_iter):
+            flow = np.bincount(self.indices, weights=rank[self._rows] * edge_share,
+                               minlength=self.num_nodes)
+            lost = np.bincount(dangling_repo, weights=rank[dangling], minlength=self.num_repos)
+            new_rank = flow + (alpha * lost)[self.node_repo] * inverse_size + teleport
+            delta = np.abs(new_rank - rank).sum()
+            rank = new_rank
+            if delta < tol * self.num_repos:
+                break
+        return rank
+
+    def participants(self):
+        """Carga e centralidade de cada participante, por repositório."""
+        load = np.bincount(self.indices, weights=self.weights, minlength=self.num_nodes)
+        repo_load = self._repo_sum(load)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            share = np.where(repo_load[self.node_repo] > 0, load / repo_load[self.node_repo], 0.0)
+        rank = self.pagerank()
+        repo_size = np.diff(self.repo_start)[self.node_repo]
+
+        table = self.repo_keys.iloc[self.node_repo].reset_index(drop=True)
+        table['user'] = self.users[self.node_user]
+        table['prs_participated'] = load.astype(np.int64)
+        table['prs_reviewed'] = np.bincount(self.indices, weights=self.review_weights,
+                                            minlength=self.num_nodes).astype(np.int64)
+        table['prs_commented'] = np.bincount(self.indices, weights=self.comment_weights,
+                                             minlength=self.num_nodes).astype(np.int64)
+        table['authors_served'] = np.bincount(self.indices, minlength=self.num_nodes)
+        table['participants_received'] = np.diff(self.indptr)
+        table['load_share'] = share
+        table['pagerank'] = rank
+        # 1 = centralidade média do repositório; comparável entre repositórios de tamanhos diferentes
+        table['pagerank_scaled'] = rank * repo_size
+        return table
+
+    def repositories(self, participants=None):
+        """Concentração da carga de revisão por repositório."""
+        if participants is None:
+            participants = self.participants()
+        load = participants['prs_participated'].to_numpy(dtype=np.float64)
+        share = participants['load_share'].to_numpy()
+        reviewer = load > 0
+
+        # Ordem decrescente de carga dentro de cada repositório (nós já agrupados por repositório)
+        order = np.lexsort((-load, self.node_repo))
+        sorted_share = share[order]
+        cumulative = np.cumsum(sorted_share)
+        offset = np.concatenate(([0.0], cumulative))[self.repo_start[:-1]]
+        before = cumulative - sorted_share - offset[self.node_repo[order]]
+        needed = (before < 0.5 - 1e-9) & reviewer[order]
+
+        # Gini da carga entre os revisores: posições crescentes dentro do segmento
+        ascending = np.lexsort((load, self.node_repo))
+        ascending = ascending[reviewer[ascending]]
+        repo_of = self.node_repo[ascending]
+        starts = segment_starts(repo_of, self.num_repos)
+        position = np.arange(len(ascending)) - starts[repo_of] + 1
+        count = np.diff(starts).astype(np.float64)
+        total = np.bincount(repo_of, weights=load[ascending], minlength=self.num_repos)
+        weighted = np.bincount(repo_of, weights=position * load[ascending], minlength=self.num_repos)
+
+        # Reciprocidade: fração dos pares autor -> participante que também ocorrem no sentido inverso
+        reverse = self.indices * self.num_nodes + self._rows
+        found = np.searchsorted(self._pairs, reverse)
+        reciprocal = (found < len(self._pairs)) & (self._pairs[np.minimum(found, len(self._pairs) - 1)] == reverse)
+        pair_repo = self.node_repo[self._rows]
+        num_pairs = np.bincount(pair_repo, minlength=self.num_repos)
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            hhi = self._repo_sum(share ** 2)
+            table = self.repo_keys.copy()
+            table['num_participants'] = np.diff(self.repo_start)
+            table['num_reviewers'] = count.astype(np.int64)
+            table['num_authors'] = self._repo_sum((np.diff(self.indptr) > 0).astype(np.float64)).astype(np.int64)
+            table['num_pairs'] = num_pairs
+            table['num_interactions'] = np.bincount(self.edge_repo, minlength=self.num_repos)
+            table['load_hhi'] = hhi
+            table['effective_reviewers'] = 1 / hhi
+            table['top_reviewer_share'] = np.maximum.reduceat(share, self.repo_start[:-1]) if self.num_nodes else []
+            table['reviewers_for_half_load'] = np.bincount(self.node_repo[order], weights=needed,
+                                                           minlength=self.num_repos).astype(np.int64)
+            table['load_gini'] = np.where(count > 1, 2 * weighted / (count * total) - (count + 1) / count, 0.0)
+            table['reciprocity'] = np.bincount(pair_repo, weights=reciprocal, minlength=self.num_repos) / num_pairs
+        return table
+
+    def pull_requests(self, participants=None):
+        """Métricas dos participantes de cada PR, para juntar às linhas do dataset."""
+        if participants is None:
+            participants = self.participants()
+        share = participants['load_share'].to_numpy()
+        centrality = participants['pagerank_scaled'].to_numpy()
+
+        edges = pd.DataFrame({'repo': self.edge_repo, 'pr_number': self.edge_pr,
+                              'participant': self.edge_dst, 'reviewer': self.edge_review,
+                              'share': share[self.edge_dst],
+                              'centrality': centrality[self.edge_dst],
+                              'author_centrality': centrality[self.edge_src]})
+        # Um participante por PR (com reviewer verdadeiro se revisou), mesmo com dois tipos
+        edges = edges.sort_values('reviewer', ascending=False, kind='stable')
+        edges = edges.drop_duplicates(['repo', 'pr_number', 'participant'])
+        table = edges.groupby(['repo', 'pr_number'], sort=False).agg(
+            graph_reviewers=('reviewer', 'sum'),
+            graph_participants=('share', 'size'),
+            max_participant_load_share=('share', 'max'),
+            mean_participant_centrality=('centrality', 'mean'),
+            author_centrality=('author_centrality', 'first')).reset_index()
+
+        keys = self.repo_keys.iloc[table['repo'].to_numpy()].reset_index(drop=True)
+        return pd.concat([keys, table.drop(columns='repo')], axis=1)
+
+    def run_graph_analysis(self):
+        print("\n=== Grafo de interação autor-revisor ===")
+        participants = self.participants()
+        self.results = {
+            'participants': participants,
+            'repositories': self.repositories(participants),
+            'pull_requests': self.pull_requests(participants)
+        }
+        repos = self.results['repositories']
+        if len(repos):
+            print(f"Revisores efetivos (mediana por repositório): {repos['effective_reviewers'].median():.1f}")
+            print(f"Parcela do principal revisor (mediana): {repos['top_reviewer_share'].median():.1%}")
+        return self.results
+
+    def join(self, df):
+        """Anexa às linhas de PR as métricas do PR e do seu repositório (prefixo repo_)."""
+        if not self.results:
+            self.run_graph_analysis()
+        repos = self.results['repositories'].rename(
+            columns={column: f'repo_{column}' for column in self.results['repositories'].columns
+                     if column not in GROUP_KEYS})
+        keys = {key: df[key].astype(str) for key in GROUP_KEYS}
+        joined = df.assign(**keys).merge(repos, on=GROUP_KEYS, how='left')
+        joined = joined.merge(self.results['pull_requests'], on=GROUP_KEYS + ['pr_number'], how='left')
+        joined.index = df.index
+        for key in GROUP_KEYS:
+            joined[key] = df[key]
+        return joined
+
+    def save(self, output_dir, prefix='reviewer_graph'):
+        os.makedirs(output_dir, exist_ok=True)
+        paths = {}
+        for name, table in self.results.items():
+            paths[name] = os.path.join(output_dir, f"{prefix}_{name}.csv")
+            table.to_csv(paths[name], index=False)
+        print(f"Grafo de revisão salvo em {output_dir}/{prefix}_*.csv")
+        return paths
@@ -0,0 +1,68 @@
+import warnings
+
+import numpy as np
+import pandas as pd
+
+ISO_FORMAT = '%Y-%m-%dT%H:%M:%SZ'
+TIMESTAMP_COLUMNS = ['created_at', 'closed_at', 'first_review_at']
+
+# (coluna derivada, início, fim)
+DURATION_FEATURES = [
+    ('time_to_close_hours', 'created_at', 'closed_at'),
+    ('time_to_first_review_hours', 'created_at', 'first_review_at'),
+]
+
+
+def parse_timestamps(values):
+    """Converte uma sequência de strings ISO-8601 (ou None) em datetime64 UTC de uma só vez."""
+    values = np.asarray(values, dtype=object)
+    missing = pd.isna(values)
+
+    # Caminho rápido para o formato da API ('YYYY-MM-DDTHH:MM:SSZ', largura fixa):
+    # conversão direta pelo numpy, sem o parser genérico do pandas
+    fixed = np.where(missing, '1970-01-01T00:00:00Z', values).astype(str)
+    if len(fixed) and (np.char.str_len(fixed) == 20).all() and np.char.endswith(fixed, 'Z').all():
+        try:
+            parsed = fixed.astype('U19').astype('datetime64[s]')
+            parsed[missing] = np.datetime64('NaT')
+            return parsed
+        except ValueError:
+            pass
+
+    series = pd.Series(values, dtype=object)
+    parsed = pd.to_datetime(series, format=ISO_FORMAT, utc=True, errors='coerce')
+    parsed = parsed.dt.tz_localize(None).to_numpy(dtype='datetime64[s]', copy=True)
+    # Outras variantes ISO-8601 (frações de segundo, '+00:00', só minutos) pelo parser geral
+    retry = np.isnat(parsed) & ~missing
+    if retry.any():
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore')
+            extra = pd.to_datetime(series[retry], format='ISO8601', utc=True, errors='coerce')
+        parsed[retry] = extra.dt.floor('s').dt.tz_localize(None).to_numpy(dtype='datetime64[s]')
+    return parsed
+
+
+def to_epoch(timestamps):
+    """datetime64 -> segundos de época (int64); NaT vira -1."""
+    epoch = timestamps.astype('datetime64[s]').astype(np.int64)
+    return np.where(np.isnat(timestamps), -1, epoch)
+
+
+def hours_between(start, end):
+    return (end - start) / np.timedelta64(1, 'h')
+
+
+def add_time_features(df):
+    """
+    Converte as colunas de timestamp presentes em datetime64 e deriva as durações
+    ausentes (em horas) como operações vetoriais. Durações já existentes no dataset
+    são mantidas.
+    """
+    for column in TIMESTAMP_COLUMNS:
+        if column in df.columns and not pd.api.types.is_datetime64_any_dtype(df[column]):
+            df[column] = parse_timestamps(df[column].to_numpy())
+
+    for feature, start, end in DURATION_FEATURES:
+        if feature not in df.columns and start in df.columns and end in df.columns:
+            df[feature] = hours_between(df[start].to_numpy(), df[end].to_numpy())
+    return df
@@ -0,0 +1,77 @@
+import threading
+import time
+
+
+def mask(token):
+    return f"...{token[-4:]}"
+
+
+class TokenPool:
+    """
+    Conjunto de tokens do GitHub com a cota restante de cada um, por recurso da API
+    ('core', 'search'), lida dos cabeçalhos X-RateLimit-* de cada resposta.
+
+    acquire() escolhe o token com mais cota disponível; um token esgotado (ou em
+    espera por Retry-After) só volta a ser usado após o reset informado pela API.
+    Tokens ainda não medidos têm prioridade, para que a cota de todos seja conhecida.
+    """
+
+    def __init__(self, tokens):
+        if isinstance(tokens, str):
+            tokens = [tokens]
+        self.tokens = list(dict.fromkeys(token for token in tokens if token))
+        if not self.tokens:
+            raise ValueError("Nenhum token informado")
+        self.lock = threading.Lock()
+        # (token, recurso) -> [restante, reset em segundos de época]
+        self.budget = {}
+
+    def _entry(self, token, resource):
+        return self.budget.setdefault((token, resource), [float('inf'), 0.0])
+
+    def acquire(self, resource='core'):
+        """Retorna (token, 0) ou, se todos estiverem esgotados, (None, segundos até o próximo reset)."""
+        with self.lock:
+            now = time.time()
+            best, best_remaining = None, 0
+            next_reset = None
+            for token in self.tokens:
+                entry = self._entry(token, resource)
+                if entry[0] <= 0 and entry[1] <= now:
+                    # Reset já passou: a cota volta a ser desconhecida até a próxima resposta
+                    entry[0] = float('inf')
+                if entry[0] > best_remaining:
+                    best, best_remaining = token, entry[0]
+                elif entry[0] <= 0:
+                    next_reset = entry[1] if next_reset is None else min(next_reset, entry[1])
+
+            if best is None:
+                return None, max(1.0, (next_reset or now + 60) - now)
+            self._entry(best, resource)[0] -= 1
+            return best, 0
+
+    def update(self, token, response, resource='core'):
+        """Atualiza a cota do token; retorna True se a resposta indica limite de requisições."""
+        headers = response.headers
+        resource = headers.get('X-RateLimit-Resource', resource)
+        with self.lock:
+            entry = self._entry(token, resource)
+            if 'X-RateLimit-Remaining' in headers:
+                entry[0] = int(headers['X-RateLimit-Remaining'])
+            if 'X-RateLimit-Reset' in headers:
+                entry[1] = float(headers['X-RateLimit-Reset'])
+
+            limited = response.status_code == 429 or (
+                response.status_code == 403 and (entry[0] <= 0 or 'Retry-After' in headers))
+            if limited:
+                # Limite secundário (Retry-After) também tira o token de uso temporariamente
+                entry[0] = 0
+                if 'Retry-After' in headers:
+                    entry[1] = max(entry[1], time.time() + float(headers['Retry-After']))
+                elif entry[1] <= time.time():
+                    entry[1] = time.time() + 60
+            return limited
+
+    def status(self, resource='core'):
+        with self.lock:
+            return {mask(token): self._entry(token, resource)[0] for token in self.tokens}
@@ -0,0 +1,191 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+from src.DatasetLoader import load_dataset
+from src.PRAnalyzer import GROUP_KEYS, STATUS_METRICS
+from src.TimeFeatures import add_time_features
+
+# Unidades de datetime64 aceitas como tamanho de bucket
+BUCKET_UNITS = {'D': 'dia', 'W': 'semana', 'M': 'mês', 'Y': 'ano'}
+
+
+class TrendAnalyzer:
+    """
+    Tendências temporais das métricas das RQs pela data de criação dos PRs.
+
+    Os timestamps são convertidos uma única vez e o dataset é ordenado por created_at
+    (índice temporal); somas acumuladas de cada métrica permitem consultar qualquer
+    janela [início, fim) com duas buscas binárias. Agregados por bucket (dia, semana,
+    mês, ano), por repositório e médias móveis são calculados em passadas vetoriais.
+    """
+
+    COLUMNS = GROUP_KEYS + ['status', 'created_at'] + STATUS_METRICS
+
+    def __init__(self, dataset_path, memory_map=False):
+        self._setup(load_dataset(dataset_path, self.COLUMNS, memory_map=memory_map))
+
+    @classmethod
+    def from_dataframe(cls, df):
+        analyzer = cls.__new__(cls)
+        analyzer._setup(df)
+        return analyzer
+
+    def _setup(self, df):
+        df = add_time_features(df)
+        created = df['created_at'].to_numpy(dtype='datetime64[s]')
+        valid = ~np.isnat(created)
+        order = np.argsort(created[valid], kind='stable')
+
+        self.times = created[valid][order]
+        self.merged = (df['status'].to_numpy()[valid] == 'MERGED')[order]
+        self.metrics = [metric for metric in STATUS_METRICS if metric in df.columns]
+        self.values = {metric: df[metric].to_numpy(dtype=np.float64)[valid][order]
+                       for metric in self.metrics}
+
+        # Códigos por groupby (rápido com as categorias do loader), sem montar MultiIndex.
+        # Datasets sem as colunas de repositório só têm os agregados globais.
+        self.repos = None
+        self.repo_codes = None
+        if all(key in df.columns for key in GROUP_KEYS):
+            codes = df.groupby(GROUP_KEYS, observed=True, sort=False).ngroup().to_numpy()
+            _, first = np.unique(codes, return_index=True)
+            owners = df[GROUP_KEYS[0]].to_numpy()[first]
+            names = df[GROUP_KEYS[1]].to_numpy()[first]
+            self.repos = np.array([f"{owner}/{name}" for owner, name in zip(owners, names)], dtype=object)
+            self.repo_codes = codes[valid][order].astype(np.int32)
+
+        # Somas acumuladas com zero à esquerda: soma de [i, j) = cum[j] - cum[i]
+        self.cum_merged = np.concatenate(([0], np.cumsum(self.merged, dtype=np.int64)))
+        self.cum_values = {}
+        self.cum_counts = {}
+        for metric, values in self.values.items():
+            present = ~np.isnan(values)
+            self.cum_values[metric] = np.concatenate(([0.0], np.cumsum(np.where(present, values, 0.0))))
+            self.cum_counts[metric] = np.concatenate(([0], np.cumsum(present, dtype=np.int64)))
+        self.results = {}
+
+        print(f"Índice temporal: {len(self.times)} PRs"
+              + (f" de {self.times[0]} a {self.times[-1]}" if len(self.times) else ""))
+
+    def _bounds(self, start, end):
+        start = np.datetime64(start, 's')
+        end = np.datetime64(end, 's')
+        return (np.searchsorted(self.times, start, side='left'),
+                np.searchsorted(self.times, end, side='left'))
+
+    def _window_sums(self, lo, hi):
+        """Contagem, taxa de merge e médias de janelas [lo, hi) (arrays de índices)."""
+        count = hi - lo
+        with np.errstate(divide='ignore', invalid='ignore'):
+            stats = {'count': count,
+                     'merge_rate': (self.cum_merged[hi] - self.cum_merged[lo]) / count}
+            for metric in self.metrics:
+                n = self.cum_counts[metric][hi] - self.cum_counts[metric][lo]
+                stats[f'{metric}_mean'] = (self.cum_values[metric][hi] - self.cum_values[metric][lo]) / n
+        return stats
+
+    def window(self, start, end, medians=True):
+        """Agregados dos PRs criados em [start, end): O(log n), mais O(k) para as medianas."""
+        lo, hi = self._bounds(start, end)
+        stats = {key: value.item() for key, value in
+                 self._window_sums(np.array([lo]), np.array([hi])).items()}
+        if medians:
+            for metric in self.metrics:
+                values = self.values[metric][lo:hi]
+                values = values[~np.isnan(values)]
+                stats[f'{metric}_median'] = float(np.median(values)) if len(values) else float('nan')
+        return stats
+
+    def _edges(self, freq):
+        if freq not in BUCKET_UNITS:
+            raise ValueError(f"Frequência inválida: {freq} (use {', '.join(BUCKET_UNITS)})")
+        if freq == 'W':
+            # datetime64[W] alinha as semanas à quinta-feira (dia da época Unix);
+            # as semanas aqui começam na segunda-feira, como em to_period('W-SUN')
+            first, last = self.times[[0, -1]].astype('datetime64[D]')
+            first -= (first.astype(np.int64) + 3) % 7
+            last -= (last.astype(np.int64) + 3) % 7
+            return np.arange(first, last + 14, 7).astype('datetime64[s]')
+        first = self.times[0].astype(f'datetime64[{freq}]')
+        last = self.times[-1].astype(f'datetime64[{freq}]')
+        return np.arange(first, last + 2).astype('datetime64[s]')
+
+    def _medians(self, keys, index):
+        medians = pd.DataFrame({metric: values for metric, values in self.values.items()})
+        medians = medians.groupby(keys).median().reindex(index)
+        return medians.add_suffix('_median')
+
+    def bucketed(self, freq='M'):
+        """Agregados por bucket de tempo, incluindo buckets vazios (contagem 0)."""
+        if not len(self.times):
+            return pd.DataFrame()
+        edges = self._edges(freq)
+        positions = np.searchsorted(self.times, edges, side='left')
+        table = pd.DataFrame(self._window_sums(positions[:-1], positions[1:]),
+                             index=pd.DatetimeIndex(edges[:-1], name='bucket'))
+
+        # O índice é ordenado: o bucket de cada PR sai de uma busca binária só
+        buckets = np.searchsorted(edges, self.times, side='right') - 1
+        medians = self._medians(buckets, np.arange(len(edges) - 1))
+        medians.index = table.index
+        return table.join(medians)
+
+    def bucketed_by_repo(self, freq='M'):
+        """Agregados por (repositório, bucket) em uma passada de bincount/groupby."""
+        if not len(self.times) or self.repo_codes is None:
+            return pd.DataFrame()
+        edges = self._edges(freq)
+        num_buckets = len(edges) - 1
+        buckets = np.searchsorted(edges, self.times, side='right') - 1
+        keys = self.repo_codes.astype(np.int64) * num_buckets + buckets
+        present_keys, inverse = np.unique(keys, return_inverse=True)
+
+        count = np.bincount(inverse)
+        columns = {'count': count,
+                   'merge_rate': np.bincount(inverse, weights=self.merged) / count}
+        for metric, values in self.values.items():
+            present = ~np.isnan(values)
+            with np.errstate(divide='ignore', invalid='ignore'):
+                columns[f'{metric}_mean'] = (np.bincount(inverse, weights=np.where(present, values, 0.0))
+                                             / np.bincount(inverse, weights=present))
+
+        index = pd.MultiIndex.from_arrays(
+            [self.repos[present_keys // num_buckets],
+             pd.DatetimeIndex(edges[present_keys % num_buckets])], names=['repo', 'bucket'])
+        table = pd.DataFrame(columns, index=index)
+        medians = self._medians(inverse, np.arange(len(present_keys)))
+        medians.index = index
+        return table.join(medians)
+
+    def rolling(self, days=90, freq='M'):
+        """Médias móveis: para o fim de cada bucket, agrega os PRs dos `days` dias anteriores."""
+        if not len(self.times):
+            return pd.DataFrame()
+        ends = self._edges(freq)[1:]
+        hi = np.searchsorted(self.times, ends, side='left')
+        lo = np.searchsorted(self.times, ends - np.timedelta64(days, 'D'), side='left')
+        return pd.DataFrame(self._window_sums(lo, hi), index=pd.DatetimeIndex(ends, name='window_end'))
+
+    def run_trend_analysis(self, freq='M', rolling_days=90):
+        print(f"\n=== Tendências temporais (bucket: {BUCKET_UNITS.get(freq, freq)}, "
+              f"janela móvel: {rolling_days} dias) ===")
+        self.results = {
+            'bucketed': self.bucketed(freq),
+            'by_repo': self.bucketed_by_repo(freq),
+            'rolling': self.rolling(rolling_days, freq)
+        }
+        if len(self.results['bucketed']):
+            active = self.results['bucketed'][self.results['bucketed']['count'] > 0]
+            print(f"Buckets com PRs: {len(active)} de {len(self.results['bucketed'])}")
+        return self.results
+
+    def save(self, output_dir, prefix='trends'):
+        os.makedirs(output_dir, exist_ok=True)
+        paths = {}
+        for name, table in self.results.items():
+            paths[name] = os.path.join(output_dir, f"{prefix}_{name}.csv")
+            table.to_csv(paths[name])
+        print(f"Tendências salvas em {output_dir}/{prefix}_*.csv")
+        return paths
@@ -0,0 +1,187 @@
+import json
+import os
+import threading
+from collections import deque
+
+
+class WorkQueue:
+    """
+    Fila de trabalho limitada entre um produtor (listagem) e consumidores (enriquecimento).
+
+    - Todo item é gravado no journal queue.jsonl antes de ser entregue; a memória guarda
+      no máximo memory_items itens e o excedente é relido do disco quando a fila esvazia.
+    - put() bloqueia enquanto houver max_pending itens não concluídos (backpressure).
+    - Cada item recebe um número de sequência; completed() libera os resultados de
+      done() na ordem de inserção, independentemente da ordem de conclusão.
+    - Conclusões ficam em done.jsonl e o progresso do produtor em state.json; reabrir o
+      mesmo diretório após uma interrupção recoloca na fila só os itens pendentes.
+    """
+
+    def __init__(self, state_dir, max_pending=1000, memory_items=200):
+        self.state_dir = state_dir
+        self.max_pending = max_pending
+        self.memory_items = memory_items
+        self.queue_file = os.path.join(state_dir, 'queue.jsonl')
+        self.done_file = os.path.join(state_dir, 'done.jsonl')
+        self.state_file = os.path.join(state_dir, 'state.json')
+
+        self.condition = threading.Condition()
+        self.buffer = deque()
+        self.keys = set()
+        self.in_progress = {}
+        self.finished = {}
+        self.next_emit = 0
+        self.closed = False
+        self.state = {}
+
+        os.makedirs(state_dir, exist_ok=True)
+        remaining = self._recover()
+
+        self.queue_writer = open(self.queue_file, 'ab')
+        self.done_writer = open(self.done_file, 'ab')
+        self.reader = open(self.queue_file, 'rb')
+        # Itens recuperados começam todos "no disco"
+        self.read_pos = 0
+        self.unread = len(remaining)
+
+    @staticmethod
+    def _read_journal(path):
+        entries = []
+        if not os.path.exists(path):
+            return entries
+        valid = 0
+        with open(path, 'rb') as f:
+            for line in f:
+                try:
+                    entries.append(json.loads(line))
+                except ValueError:
+                    # Última linha incompleta de uma gravação interrompida
+                    break
+                valid += len(line)
+        with open(path, 'r+b') as f:
+            f.truncate(valid)
+        return entries
+
+    @staticmethod
+    def _write_journal(path, entries):
+        with open(path + '.tmp', 'wb') as f:
+            for entry in entries:
+                f.write(json.dumps(entry).encode('utf-8') + b'\n')
+        os.replace(path + '.tmp', path)
+
+    def _recover(self):
+        if os.path.exists(self.state_file):
+            with open(self.state_file, encoding='utf-8') as f:
+                self.state = json.load(f)
+
+        # Concluídos prevalecem sobre o item enfileirado de mesma sequência; tudo é
+        # renumerado de forma contígua, preservando a ordem original
+        entries = {entry['seq']: entry for entry in self._read_journal(self.queue_file)}
+        entries.update({entry['seq']: entry for entry in self._read_journal(self.done_file)})
+
+        done, remaining = [], []
+        for seq, old in enumerate(sorted(entries)):
+            entry = dict(entries[old], seq=seq)
+            self.keys.add(entry['key'])
+            if 'result' in entry:
+                done.append(entry)
+                self.finished[seq] = entry['result']
+            else:
+                remaining.append(entry)
+                self.in_progress[seq] = entry['key']
+
+        self._write_journal(self.done_file, done)
+        self._write_journal(self.queue_file, remaining)
+        self.next_seq = len(entries)
+        return remaining
+
+    @property
+    def pending(self):
+        return len(self.in_progress)
+
+    def pending_keys(self):
+        with self.condition:
+            return list(self.in_progress.values())
+
+    def save_state(self):
+        with open(self.state_file + '.tmp', 'w', encoding='utf-8') as f:
+            json.dump(self.state, f)
+        os.replace(self.state_file + '.tmp', self.state_file)
+
+    def put(self, key, item):
+        """Enfileira item; bloqueia sob backpressure. Retorna a sequência ou None se key já existe."""
+        with self.condition:
+            self.condition.wait_for(lambda: self.pending < self.max_pending or self.closed)
+            if key in self.keys:
+                return None
+
+            seq = self.next_seq
+            line = json.dumps({'seq': seq, 'key': key, 'item': item}).encode('utf-8') + b'\n'
+            if self.unread == 0 and len(self.buffer) < self.memory_items:
+                self.buffer.append((seq, item))
+            else:
+                # Transbordo: o item fica só no disco, relido em ordem por get()
+                if self.unread == 0:
+                    self.read_pos = self.queue_writer.tell()
+                self.unread += 1
+            self.queue_writer.write(line)
+            self.queue_writer.flush()
+
+            self.next_seq += 1
+            self.keys.add(key)
+            self.in_progress[seq] = key
+            self.condition.notify_all()
+            return seq
+
+    def _refill(self):
+        self.reader.seek(self.read_pos)
+        while self.unread and len(self.buffer) < self.memory_items:
+            entry = json.loads(self.reader.readline())
+            self.buffer.append((entry['seq'], entry['item']))
+            self.unread -= 1
+        self.read_pos = self.reader.tell()
+
+    def get(self):
+        """Próximo (seq, item); None quando a fila foi fechada e esvaziou."""
+        with self.condition:
+            self.condition.wait_for(lambda: self.buffer or self.unread or self.closed)
+            if not self.buffer and self.unread:
+                self._refill()
+            if not self.buffer:
+                return None
+            return self.buffer.popleft()
+
+    def done(self, seq, result=None):
+        with self.condition:
+            key = self.in_progress.pop(seq)
+            line = json.dumps({'seq': seq, 'key': key, 'result': result}).encode('utf-8') + b'\n'
+            self.done_writer.write(line)
+            self.done_writer.flush()
+            self.finished[seq] = result
+            self.condition.notify_all()
+
+    def completed(self):
+        """Resultados concluídos ainda não emitidos, em ordem de sequência contígua."""
+        with self.condition:
+            results = []
+            while self.next_emit in self.finished:
+                results.append(self.finished.pop(self.next_emit))
+                self.next_emit += 1
+            return results
+
+    def close(self):
+        with self.condition:
+            self.closed = True
+            self.condition.notify_all()
+
+    def release(self):
+        """Fecha os arquivos, mantendo o estado em disco."""
+        for handle in (self.queue_writer, self.done_writer, self.reader):
+            handle.close()
+
+    def clear(self):
+        """Fecha os arquivos e remove o estado em disco (após uma execução completa)."""
+        self.release()
+        for path in (self.queue_file, self.done_file, self.state_file):
+            if os.path.exists(path):
+                os.remove(path)
@@ -1,47 +1,520 @@
+import json
 import os
 import sys
+import tempfile
+import time
+import warnings
 import pandas as pd
 import numpy as np
 
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
 
-from src.PRAnalyzer import PRAnalyzer
+from src.DatasetMerger import DatasetMerger
+from src.GitHubPRCollector import GitHubPRCollector
+from src.PRAnalyzer import PRAnalyzer, iter_correlations
+from src.PRRecord import PRRecord
+from src.PRStatsState import PRStatsState
 from src.PRVisualizer import PRVisualizer
+from src.ResultCache import ResultCache
+from src.ReviewerGraph import ReviewerGraph
+from src.TimeFeatures import parse_timestamps
+from src.TokenPool import TokenPool
+from src.TrendAnalyzer import TrendAnalyzer
+from src.WorkQueue import WorkQueue
 
 
-def main():
-    print("=" * 80)
-    print("LAB03 - TESTE RÁPIDO (Dados Sintéticos)")
-    print("=" * 80)
+def generate_synthetic_dataset(n_prs, seed=42, num_repos=1, heavy_tailed=False):
+    """
+    Gera PRs sintéticos. Por padrão usa distribuições de Poisson em um único
+    repositório; com heavy_tailed=True as métricas seguem distribuições de cauda
+    longa (lognormal/Pareto) e os PRs se distribuem entre num_repos repositórios
+    de tamanhos desiguais (Zipf), como nos dados reais.
+    """
+    np.random.seed(seed)
     
-    # 1. GERAR DADOS
-    print("\n[1/3] Gerando dados sintéticos...")
+    if num_repos > 1:
+        weights = 1 / np.arange(1, num_repos + 1)
+        repo_ids = np.random.choice(num_repos, n_prs, p=weights / weights.sum())
+        repo_owner = pd.Categorical.from_codes(repo_ids % max(num_repos // 4, 1),
+                                               [f'owner{i}' for i in range(max(num_repos // 4, 1))])
+        repo_name = pd.Categorical.from_codes(repo_ids, [f'repo{i}' for i in range(num_repos)])
+    else:
+        repo_owner, repo_name = ['test'] * n_prs, ['repo'] * n_prs
     
-    os.makedirs('test_output', exist_ok=True)
+    if heavy_tailed:
+        time_to_close = np.random.lognormal(2.5, 2.0, n_prs) + 1
+        # PRs analisados rapidamente têm mais chance de merge
+        p_merged = 1 / (1 + np.exp(0.4 * (np.log(time_to_close) - 3)))
+        metrics = {
+            'status': np.where(np.random.random(n_prs) < p_merged, 'MERGED', 'CLOSED'),
+            'files_changed': np.random.lognormal(0.8, 1.2, n_prs).astype(int) + 1,
+            'additions': (np.random.pareto(1.1, n_prs) * 10).astype(int),
+            'deletions': (np.random.pareto(1.3, n_prs) * 5).astype(int),
+            'body_length': np.random.lognormal(5.5, 1.5, n_prs).astype(int),
+            'num_reviews': np.random.negative_binomial(1, 0.35, n_prs) + 1,
+            'num_comments': np.random.negative_binomial(1, 0.15, n_prs),
+            'num_participants': np.random.negative_binomial(2, 0.5, n_prs) + 1,
+            'time_to_close_hours': time_to_close
+        }
+    else:
+        metrics = {
+            'status': np.random.choice(['MERGED', 'CLOSED'], n_prs, p=[0.7, 0.3]),
+            'files_changed': np.random.poisson(5, n_prs) + 1,
+            'additions': np.random.poisson(100, n_prs) + 10,
+            'deletions': np.random.poisson(50, n_prs) + 5,
+            'body_length': np.random.poisson(500, n_prs) + 50,
+            'num_reviews': np.random.poisson(2, n_prs) + 1,
+            'num_comments': np.random.poisson(5, n_prs),
+            'num_participants': np.random.poisson(3, n_prs) + 1,
+            'time_to_close_hours': np.random.exponential(24, n_prs) + 1
+        }
     
-    np.random.seed(42)
-    n_prs = 500
+    if heavy_tailed:
+        created = np.datetime64('2021-01-01T00:00:00') + \
+            np.random.randint(0, 3 * 365 * 24 * 3600, n_prs).astype('timedelta64[s]')
+        closed = created + (metrics['time_to_close_hours'] * 3600).astype('timedelta64[s]')
+        created_at = pd.DatetimeIndex(created).strftime('%Y-%m-%dT%H:%M:%SZ')
+        closed_at = pd.DatetimeIndex(closed).strftime('%Y-%m-%dT%H:%M:%SZ')
+    else:
+        created_at = ['2024-01-01T00:00:00Z'] * n_prs
+        closed_at = ['2024-01-02T00:00:00Z'] * n_prs
     
     data = {
-        'repo_owner': ['test'] * n_prs,
-        'repo_name': ['repo'] * n_prs,
+        'repo_owner': repo_owner,
+        'repo_name': repo_name,
         'pr_number': range(1, n_prs + 1),
-        'status': np.random.choice(['MERGED', 'CLOSED'], n_prs, p=[0.7, 0.3]),
-        'created_at': ['2024-01-01T00:00:00Z'] * n_prs,
-        'closed_at': ['2024-01-02T00:00:00Z'] * n_prs,
-        'files_changed': np.random.poisson(5, n_prs) + 1,
-        'additions': np.random.poisson(100, n_prs) + 10,
-        'deletions': np.random.poisson(50, n_prs) + 5,
+        'status': metrics['status'],
+        'created_at': created_at,
+        'closed_at': closed_at,
+        'files_changed': metrics['files_changed'],
+        'additions': metrics['additions'],
+        'deletions': metrics['deletions'],
         'total_lines_changed': 0,
-        'body_length': np.random.poisson(500, n_prs) + 50,
-        'num_reviews': np.random.poisson(2, n_prs) + 1,
-        'num_comments': np.random.poisson(5, n_prs),
-        'num_participants': np.random.poisson(3, n_prs) + 1,
-        'time_to_close_hours': np.random.exponential(24, n_prs) + 1
+        'body_length': metrics['body_length'],
+        'num_reviews': metrics['num_reviews'],
+        'num_comments': metrics['num_comments'],
+        'num_participants': metrics['num_participants'],
+        'time_to_close_hours': metrics['time_to_close_hours']
     }
     
     df = pd.DataFrame(data)
     df['total_lines_changed'] = df['additions'] + df['deletions']
+    return df
+
+
+def generate_synthetic_interactions(df, num_users=40, seed=42):
+    """Arestas autor -> revisor sintéticas: um revisor por revisão, escolhidos com pesos Zipf."""
+    rng = np.random.default_rng(seed)
+    weights = 1 / np.arange(1, num_users + 1)
+    rows = np.repeat(np.arange(len(df)), df['num_reviews'].to_numpy())
+    authors = rng.integers(0, num_users, len(df))
+    reviewers = rng.choice(num_users, len(rows), p=weights / weights.sum())
+    
+    edges = pd.DataFrame({
+        'repo_owner': np.asarray(df['repo_owner'])[rows],
+        'repo_name': np.asarray(df['repo_name'])[rows],
+        'pr_number': df['pr_number'].to_numpy()[rows],
+        'author': [f'user{i}' for i in authors[rows]],
+        'participant': [f'user{i}' for i in reviewers],
+        'kind': 'review',
+        'interactions': 1
+    })
+    edges = edges[edges['author'] != edges['participant']]
+    return edges.drop_duplicates(['repo_owner', 'repo_name', 'pr_number', 'participant'])
+
+
+class FakeResponse:
+    def __init__(self, status_code, payload, headers=None):
+        self.status_code = status_code
+        self.payload = payload
+        self.headers = headers or {}
+    
+    def json(self):
+        return self.payload
+
+
+class FakeGitHub:
+    """Substitui a requests.Session do coletor: responde à API a partir de PRs em memória."""
+    
+    def __init__(self, prs):
+        self.prs = prs
+        self.calls = []
+        # Falhas injetadas: páginas da listagem e PRs cujo detalhe responde 502
+        self.failing_pages = set()
+        self.failing_prs = set()
+    
+    def get(self, url, headers=None, params=None, **kwargs):
+        self.calls.append((url, dict(params or {}), dict(headers or {})))
+        path = url.split('/repos/', 1)[1].split('/')[2:]
+        if path == ['pulls']:
+            page, per_page = params.get('page', 1), params.get('per_page', 100)
+            if page in self.failing_pages:
+                return FakeResponse(502, None)
+            prs = self.prs
+            if params.get('sort') == 'updated':
+                prs = sorted(prs, key=lambda pr: pr['updated_at'], reverse=True)
+            prs = prs[(page - 1) * per_page:page * per_page]
+            etag = f'"{hash(json.dumps(prs, sort_keys=True))}"'
+            if (headers or {}).get('If-None-Match') == etag:
+                return FakeResponse(304, None, {'ETag': etag})
+            return FakeResponse(200, prs, {'ETag': etag})
+        pr = next(pr for pr in self.prs if pr['number'] == int(path[1]))
+        if len(path) == 2:
+            if pr['number'] in self.failing_prs:
+                return FakeResponse(502, None)
+            return FakeResponse(200, dict(pr, changed_files=2, additions=10, deletions=3, body='texto'))
+        if path[-1] == 'reviews':
+            return FakeResponse(200, [{'user': {'login': 'revisor'}, 'submitted_at': '2024-01-01T05:00:00Z'}])
+        return FakeResponse(200, [{'user': {'login': 'comentarista'}}])
+    
+    def detail_calls(self):
+        return sorted(int(url.rsplit('/', 1)[1]) for url, _, _ in self.calls
+                      if url.rsplit('/', 2)[1] == 'pulls' and url.rsplit('/', 1)[1].isdigit())
+
+
+def synthetic_pull(number, updated_at='2024-01-03T00:00:00Z'):
+    return {'number': number, 'user': {'login': f'autor{number % 3}'},
+            'created_at': '2024-01-01T00:00:00Z', 'closed_at': '2024-01-02T00:00:00Z',
+            'merged_at': '2024-01-02T00:00:00Z' if number % 2 else None, 'updated_at': updated_at}
+
+
+def fake_collector(prs):
+    collector = GitHubPRCollector('token-de-teste')
+    collector.session = FakeGitHub(prs)
+    collector._sleep = lambda seconds: None
+    return collector
+
+
+def check_pipeline_recovery():
+    """Coleta em pipeline retomada de uma fila interrompida (itens transbordados em disco); fila alheia recusada."""
+    prs = [synthetic_pull(number) for number in range(1, 7)]
+    with tempfile.TemporaryDirectory() as state_dir:
+        # Execução "interrompida": listagem concluída, 2 de 6 PRs enriquecidos fora de ordem,
+        # só 2 itens em memória (o resto no journal) e uma linha final incompleta
+        collector = fake_collector(prs)
+        work = WorkQueue(state_dir, memory_items=2)
+        work.state['repos'] = {'test/repo': {'page': 2, 'done': True}}
+        work.save_state()
+        for pr in prs:
+            work.put(f"test/repo#{pr['number']}",
+                     collector._queue_item('test', 'repo', pr, pr['merged_at'] is not None,
+                                           1704067200, 1704153600))
+        for seq in (2, 0):
+            pr = prs[seq]
+            record = collector._enrich_pr('test', 'repo', pr, pr['merged_at'] is not None,
+                                          1704067200, 1704153600)
+            work.done(seq, record.to_dict())
+        work.queue_writer.write(b'{"seq": 6, "key": "test/re')
+        work.queue_writer.flush()
+        
+        collector = fake_collector(prs)
+        records = collector.collect_prs_pipeline([{'owner': 'test', 'name': 'repo'}], max_prs=10,
+                                                 max_workers=2, state_dir=state_dir)
+        assert [record.pr_number for record in records] == [1, 2, 3, 4, 5, 6]
+        assert collector.session.detail_calls() == [2, 4, 5, 6], "PRs concluídos não são refeitos"
+        assert not any(url.endswith('/pulls') for url, _, _ in collector.session.calls)
+        assert not os.listdir(state_dir), "fila concluída é removida"
+        
+        # Fila de outra execução (outros repositórios) não é retomada
+        work = WorkQueue(state_dir)
+        work.state['run'] = {'repos': ['test/other'], 'max_prs': 10}
+        work.save_state()
+        work.put('test/other#1', {})
+        work.release()
+        collector = fake_collector(prs)
+        try:
+            collector.collect_prs_pipeline([{'owner': 'test', 'name': 'repo'}], max_prs=10,
+                                           state_dir=state_dir)
+            assert False, "fila de outra execução deve ser recusada"
+        except ValueError:
+            pass
+        assert collector.session.calls == []
+    print("✓ Coleta em pipeline: retomada da fila em disco sem repetir PRs")
+
+
+def check_sync_state():
+    """Sincronização incremental: marca d'água e ETag no arquivo de estado, 304 sem mudanças."""
+    prs = [synthetic_pull(number, f'2024-01-0{number}T00:00:00Z') for number in range(1, 6)]
+    repos = [{'owner': 'test', 'name': 'repo'}]
+    with tempfile.TemporaryDirectory() as tmp:
+        state_file = os.path.join(tmp, 'sync_state.json')
+        collector = fake_collector(prs)
+        assert len(collector.sync_repositories(repos, state_file)) == 5
+        with open(state_file, encoding='utf-8') as f:
+            state = json.load(f)['test/repo']
+        assert state['watermark'] == '2024-01-05T00:00:00Z' and state['etag']
+        assert len(state['prs']) == 5
+        
+        collector = fake_collector(prs)
+        assert collector.sync_repositories(repos, state_file) == []
+        assert len(collector.session.calls) == 1, "repositório inalterado: só o pedido condicional"
+        assert collector.session.calls[0][2]['If-None-Match'] == state['etag']
+        
+        prs[2]['updated_at'] = '2024-01-09T00:00:00Z'
+        collector = fake_collector(prs)
+        assert [record.pr_number for record in collector.sync_repositories(repos, state_file)] == [3]
+        assert collector.session.detail_calls() == [3]
+        with open(state_file, encoding='utf-8') as f:
+            state = json.load(f)['test/repo']
+        assert state['watermark'] == '2024-01-09T00:00:00Z'
+    print("✓ Sincronização: marca d'água, ETag e PRs alterados")
+
+
+def check_sync_failures():
+    """Falhas na listagem ou no enriquecimento não avançam a marca d'água nem o ETag."""
+    prs = [synthetic_pull(number, f'2024-01-{1 + number // 10:02d}T{number % 10:02d}:00:00Z')
+           for number in range(1, 151)]
+    repo_state = {}
+    collector = fake_collector(prs)
+    collector.session.failing_pages = {2}
+    assert len(collector.sync_prs_from_repo('test', 'repo', repo_state)) == 100
+    assert 'watermark' not in repo_state and 'etag' not in repo_state
+    
+    collector = fake_collector(prs)
+    assert len(collector.sync_prs_from_repo('test', 'repo', repo_state)) == 50
+    assert len(collector.session.detail_calls()) == 50, "PRs da página 1 já estavam sincronizados"
+    assert repo_state['watermark'] == '2024-01-16T00:00:00Z' and repo_state['etag']
+    
+    # PR 7 falha no detalhe: a marca fica no seu updated_at e ele volta na próxima passada
+    prs[6]['updated_at'], prs[7]['updated_at'] = '2024-02-01T00:00:00Z', '2024-02-02T00:00:00Z'
+    collector = fake_collector(prs)
+    collector.session.failing_prs = {7}
+    assert [record.pr_number for record in collector.sync_prs_from_repo('test', 'repo', repo_state)] == [8]
+    assert repo_state['watermark'] == '2024-02-01T00:00:00Z'
+    assert len(collector.ledger.pending()) == 1
+    
+    collector = fake_collector(prs)
+    assert [record.pr_number for record in collector.sync_prs_from_repo('test', 'repo', repo_state)] == [7]
+    assert repo_state['watermark'] == '2024-02-02T00:00:00Z'
+    print("✓ Sincronização: páginas e PRs com falha são retomados")
+
+
+def check_retry_failures():
+    """Página relistada que falha de novo ganha nova tentativa; ordenações distintas não se misturam."""
+    prs = [synthetic_pull(number) for number in range(1, 4)]
+    collector = fake_collector(prs)
+    collector.session.failing_pages = {1}
+    collector._list_prs('test', 'repo', 1, sort='created')
+    collector._list_prs('test', 'repo', 1, sort='updated')
+    assert sorted(entry['sort'] for entry in collector.ledger.pending()) == ['created', 'updated']
+    
+    collector.retry_failures()
+    pending = collector.ledger.pending()
+    assert len(pending) == 2 and all(entry['attempt'] == 2 for entry in pending)
+    
+    collector.session.failing_pages = set()
+    assert len(collector.retry_failures()) == 6
+    assert collector.ledger.pending() == []
+    print("✓ Reprocessamento: tentativas contadas por página e ordenação")
+
+
+def check_dataset_merger():
+    """Duplicatas: vence o último arquivo da lista (não o mtime) ou o maior updated_at."""
+    with tempfile.TemporaryDirectory() as tmp:
+        old, new = generate_synthetic_dataset(30), generate_synthetic_dataset(30)
+        new['num_reviews'] = 99
+        paths = [os.path.join(tmp, name) for name in ('dataset_1.csv', 'dataset_2.csv', 'extra.csv')]
+        new.iloc[10:].to_csv(paths[1], index=False)
+        old.iloc[:20].to_csv(paths[0], index=False)
+        os.utime(paths[1], (0, 0))
+        
+        merger = DatasetMerger(num_partitions=4, chunksize=7)
+        output_file = os.path.join(tmp, 'merged.csv')
+        assert merger.merge(paths[:2], output_file) == 30
+        merged = pd.read_csv(output_file).set_index('pr_number')['num_reviews'].sort_index()
+        assert (merged.loc[11:30] == 99).all() and (merged.loc[1:10] != 99).all()
+        
+        # Com updated_at, a linha atualizada por último vence mesmo vindo antes na lista
+        old.assign(updated_at='2024-02-01T00:00:00Z').iloc[:20].to_csv(paths[2], index=False)
+        merger.merge([paths[2], paths[1]], output_file)
+        merged = pd.read_csv(output_file).set_index('pr_number')['num_reviews'].sort_index()
+        assert (merged.loc[1:20] != 99).all() and (merged.loc[21:30] == 99).all()
+    print("✓ Consolidação: precedência de duplicatas pela ordem e por updated_at")
+
+
+def check_incremental_state():
+    """Estado incremental: lote reaplicado não conta duas vezes; PR alterado é só detectado."""
+    df = generate_synthetic_dataset(300, num_repos=6, heavy_tailed=True)
+    state = PRStatsState().update(df)
+    moments = {metric: table.copy() for metric, table in state.moments.items()}
+    joint = {pair: table.copy() for pair, table in state.joint.items()}
+    state.update(df)
+    assert state.num_prs == len(df) and state.last_update['skipped'] == len(df)
+    
+    updated = df.copy()
+    updated.loc[:9, 'num_reviews'] += 5
+    state.update(updated.iloc[:50])
+    assert state.num_prs == len(df) and state.last_update == {'new': 0, 'updated': 10, 'skipped': 40}
+    assert all(np.array_equal(moments[metric], state.moments[metric]) for metric in moments)
+    assert all(np.array_equal(joint[pair], state.joint[pair]) for pair in joint)
+    
+    # Lotes disjuntos mesclados equivalem ao estado do dataset inteiro
+    merged = PRStatsState().update(df.iloc[:120]).merge(PRStatsState().update(df.iloc[120:]))
+    assert merged.num_prs == len(df) and np.array_equal(merged.key_hashes, state.key_hashes)
+    assert all(np.allclose(moments[metric], merged.moments[metric]) for metric in moments)
+    try:
+        merged.merge(PRStatsState().update(df.iloc[:10]))
+        assert False, "PRs em comum devem impedir a mescla"
+    except ValueError:
+        pass
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        state.save(os.path.join(tmp, 'state.npz'))
+        restored = PRStatsState.load(os.path.join(tmp, 'state.npz')).update(df)
+    assert restored.num_prs == len(df) and restored.last_update['skipped'] == len(df)
+    print("✓ Estado incremental: lotes repetidos, PRs alterados e mescla")
+
+
+def check_stratified():
+    """Resultados por repositório iguais às RQs rodadas no subconjunto de cada um."""
+    df = generate_synthetic_dataset(600, num_repos=4, heavy_tailed=True)
+    analyzer = PRAnalyzer.from_dataframe(df)
+    stratified = analyzer.run_stratified_analyses(min_prs=10, max_workers=2)
+    assert stratified['groups'] and stratified['meta']
+    
+    for repo, results in stratified['groups'].items():
+        owner, name = repo.split('/', 1)
+        subset = df[(df['repo_owner'] == owner) & (df['repo_name'] == name)].reset_index(drop=True)
+        expected = PRAnalyzer.from_dataframe(subset)
+        for rq in range(1, 9):
+            getattr(expected, f'analyze_rq{rq:02d}')()
+        got = {(rq, key): corr for rq, key, corr in iter_correlations(results)}
+        want = {(rq, key): corr for rq, key, corr in iter_correlations(expected.results)}
+        assert got.keys() == want.keys(), repo
+        for pair, corr in want.items():
+            assert np.isclose(got[pair]['correlation'], corr['correlation'], equal_nan=True), (repo, pair)
+            assert np.isclose(got[pair]['p_value'], corr['p_value'], equal_nan=True), (repo, pair)
+    print(f"✓ Análises estratificadas: {len(stratified['groups'])} repositórios conferidos")
+
+
+def check_token_pool():
+    """Rodízio pela maior cota restante e afastamento de tokens limitados até o reset."""
+    now = time.time()
+    pool = TokenPool(['token-a', 'token-b', 'token-a'])
+    assert pool.tokens == ['token-a', 'token-b']
+    
+    # Tokens ainda não medidos vêm primeiro; depois vence a maior cota restante
+    first, _ = pool.acquire()
+    pool.update(first, FakeResponse(200, None, {'X-RateLimit-Remaining': '10',
+                                                'X-RateLimit-Reset': str(now + 600)}))
+    second, _ = pool.acquire()
+    assert second != first
+    pool.update(second, FakeResponse(200, None, {'X-RateLimit-Remaining': '50',
+                                                 'X-RateLimit-Reset': str(now + 600)}))
+    assert pool.acquire() == (second, 0)
+    
+    # 403 com Retry-After (limite secundário) afasta o token mesmo com cota restante
+    assert pool.update(second, FakeResponse(403, None, {'Retry-After': '30'}))
+    assert not pool.update(first, FakeResponse(404, None))
+    assert pool.acquire() == (first, 0)
+    assert pool.acquire('search')[0] in pool.tokens, "cotas separadas por recurso"
+    
+    # Todos esgotados: espera até o reset mais próximo
+    assert pool.update(first, FakeResponse(403, None, {'X-RateLimit-Remaining': '0',
+                                                       'X-RateLimit-Reset': str(now + 120)}))
+    token, delay = pool.acquire()
+    assert token is None and 110 <= delay <= 121
+    
+    # Reset vencido: o token volta com cota desconhecida
+    pool.budget[(second, 'core')][1] = now - 1
+    assert pool.acquire() == (second, 0)
+    print("✓ Pool de tokens: rodízio, limites e espera pelo reset")
+
+
+def check_interaction_kinds():
+    """Quem revisou e comentou mantém as duas arestas, sem contar o PR duas vezes."""
+    review = {'user': {'login': 'ana'}, 'submitted_at': '2024-01-01T05:00:00Z'}
+    record = GitHubPRCollector._build_record(
+        'test', 'repo', dict(synthetic_pull(1), changed_files=1, additions=1, deletions=0, body=''),
+        [review, dict(review, user={'login': 'bia'})],
+        [{'user': {'login': 'ana'}}, {'user': {'login': 'ana'}}, {'user': {'login': 'caio'}}],
+        True, 1704067200, 1704153600, keep_interactions=True)
+    assert record.interactions == [('ana', 'review', 1), ('ana', 'comment', 2),
+                                   ('bia', 'review', 1), ('caio', 'comment', 1)]
+    
+    edges = PRRecord.interactions_to_dataframe([record])
+    graph = ReviewerGraph.from_dataframe(edges)
+    graph.run_graph_analysis()
+    participants = graph.results['participants'].set_index('user')
+    assert participants.loc['ana', ['prs_participated', 'prs_reviewed', 'prs_commented']].tolist() == [1, 1, 1]
+    assert participants.loc['caio', 'prs_commented'] == 1
+    pr = graph.results['pull_requests'].iloc[0]
+    assert pr['graph_participants'] == 3 and pr['graph_reviewers'] == 2
+    
+    commenters = ReviewerGraph.from_dataframe(edges, kinds=['comment']).participants()
+    assert sorted(commenters.loc[commenters['prs_participated'] > 0, 'user']) == ['ana', 'caio']
+    print("✓ Grafo de revisão: arestas por tipo de interação")
+
+
+def check_timestamps():
+    """Variantes ISO-8601 da API viram o mesmo instante, sem avisos; vazios e lixo viram NaT."""
+    expected = np.datetime64('2024-01-01T10:00:00')
+    variants = ['2024-01-01T10:00:00Z', '2024-01-01T10:00:00.123Z', '2024-01-01T10:00:00+00:00',
+                '2024-01-01T12:00:00+02:00', '2024-01-01T10:00Z']
+    with warnings.catch_warnings():
+        warnings.simplefilter('error')
+        for value in variants:
+            assert parse_timestamps([value])[0] == expected, value
+            assert parse_timestamps([value, None])[0] == expected, value
+        parsed = parse_timestamps(variants + [None, '', 'lixo'])
+    assert (parsed[:len(variants)] == expected).all()
+    assert np.isnat(parsed[len(variants):]).all()
+    print("✓ Datas ISO-8601: frações de segundo, offsets e precisão de minutos")
+
+
+def check_trends():
+    """Tendências sem colunas de repositório, semanas iniciando na segunda e datas inválidas."""
+    df = generate_synthetic_dataset(2000, heavy_tailed=True).drop(columns=['repo_owner', 'repo_name'])
+    trends = TrendAnalyzer.from_dataframe(df)
+    weekly = trends.bucketed('W')
+    assert (weekly.index.dayofweek == 0).all(), "semanas devem começar na segunda-feira"
+    assert weekly['count'].sum() == len(df)
+    assert trends.bucketed_by_repo().empty
+    
+    df['created_at'] = 'inválido'
+    assert TrendAnalyzer.from_dataframe(df).bucketed().empty
+    print("✓ Tendências: semanas, datasets sem repositório e datas inválidas")
+
+
+def check_result_cache():
+    """Chaves do cache mudam com dataset, parâmetros e código-fonte; entradas voltam intactas."""
+    with tempfile.TemporaryDirectory() as tmp:
+        dataset_file = os.path.join(tmp, 'dataset.csv')
+        generate_synthetic_dataset(50).to_csv(dataset_file, index=False)
+        cache = ResultCache(os.path.join(tmp, 'cache'))
+        
+        key = cache.key('analysis', dataset_file, {'method': 'spearman'})
+        assert cache.get(key) is None
+        cache.put(key, {'rq': 1}, {'report.txt': dataset_file})
+        assert cache.key('analysis', dataset_file, {'method': 'spearman'}) == key
+        assert cache.get(key) == {'results': {'rq': 1}, 'artifacts': ['report.txt']}
+        assert cache.key('analysis', dataset_file, {'method': 'pearson'}) != key
+        
+        generate_synthetic_dataset(50, seed=7).to_csv(dataset_file, index=False)
+        assert cache.key('analysis', dataset_file, {'method': 'spearman'}) != key
+        
+        source_dir = os.path.join(tmp, 'src')
+        os.makedirs(source_dir)
+        with open(os.path.join(source_dir, 'Module.py'), 'w') as f:
+            f.write('X = 1\n')
+        version = ResultCache.source_version(source_dir)
+        with open(os.path.join(source_dir, 'Module.py'), 'a') as f:
+            f.write('Y = 2\n')
+        assert ResultCache.source_version(source_dir) != version
+    print("✓ Cache de resultados: invalidação por dataset, parâmetros e código")
+
+
+def main():
+    print("=" * 80)
+    print("LAB03 - TESTE RÁPIDO (Dados Sintéticos)")
+    print("=" * 80)
+    
+    # 1. GERAR DADOS
+    print("\n[1/3] Gerando dados sintéticos...")
+    
+    os.makedirs('test_output', exist_ok=True)
+    
+    df = generate_synthetic_dataset(500)
     
     dataset_file = 'test_output/synthetic_dataset.csv'
     df.to_csv(dataset_file, index=False)
@@ -55,13 +528,32 @@ def main():
     
     analyzer = PRAnalyzer(dataset_file)
     results = analyzer.run_all_analyses()
+    analyzer.run_merge_model()
     analyzer.generate_report('test_output/analysis.txt')
     
+    check_timestamps()
+    check_trends()
+    check_result_cache()
+    check_pipeline_recovery()
+    check_dataset_merger()
+    check_sync_state()
+    check_sync_failures()
+    check_retry_failures()
+    check_incremental_state()
+    check_stratified()
+    check_token_pool()
+    
+    graph = ReviewerGraph.from_dataframe(generate_synthetic_interactions(df))
+    graph.run_graph_analysis()
+    graph.save('test_output', prefix='reviewer_graph')
+    check_interaction_kinds()
+    
     # 3. VISUALIZAÇÕES
     print("\n[3/3] Gerando gráficos...")
     
     visualizer = PRVisualizer(dataset_file)
     visualizer.generate_all_plots('test_output/plots')
+    visualizer.export_interactive('test_output/interactive')
     
     # RESULTADO
     print("\n" + "=" * 80)
@@ -70,7 +562,9 @@ def main():
     print("\n📁 Arquivos gerados:")
     print("   • test_output/synthetic_dataset.csv")
     print("   • test_output/analysis.txt")
+    print("   • test_output/reviewer_graph_*.csv")
     print("   • test_output/plots/")
+    print("   • test_output/interactive/dashboard.html")
     print("\n✅ Tudo funcionando! Agora você pode executar main.py com dados reais.")
     print("=" * 80 + "\n")
 